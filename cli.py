@@ -1,7 +1,7 @@
 import click
 import os
 from cwmspy import CWMS
-import pandas as pd
+from cwmspy.broker import serve
 import logging
 
 
@@ -32,5 +32,14 @@ def loc(verbose, name, loc, d):
     cwms.close()
 
 
+@cli.command("broker")
+@click.option("--verbose", is_flag=True)
+@click.option("--name", default=None)
+@click.option("--socket", "path", default=None)
+@click.option("--pool-max", default=4)
+def broker(verbose, name, path, pool_max):
+    serve(path=path, verbose=verbose, name=name, pool_max=pool_max)
+
+
 if __name__ == "__main__":
     cli()
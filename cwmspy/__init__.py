@@ -7,7 +7,7 @@ built keeping simplicity in mind.
 
 ## Guiding principles
 
-- **User Friendly.**  `cwmspy` is meant to make CWMS database maintenance easy.  
+- **User Friendly.**  `cwmspy` is meant to make CWMS database maintenance easy.
 CWMS methods are a combination of low-level Python wrappers around HEC-CWMS API
 functions and procedures and high-level Python methods when procedures or functions
 are not user friendly or do not exist.
@@ -26,11 +26,11 @@ pip install git+"https://github.com/jetilton/cwmspy.git"
 .. note::
     <span style="color:#bf2419">**IMPORTANT**</span>
 
-    The python package `cx_Oracle` is a `cwmspy` dependency.  If you have not used it 
+    The python package `cx_Oracle` is a `cwmspy` dependency.  If you have not used it
         before chances are you do not have the required [**Oracle Instant Client Package - Basic**](https://www.oracle.com/database/technologies/instant-client/winx64-64-downloads.html)
         installed within your `PYTHONPATH`.  Download the appropriate [**Oracle Instant Client Package - Basic**](https://www.oracle.com/database/technologies/instant-client/winx64-64-downloads.html)
-        for your Oracle database.  `cwmspy` is tested with version `12.1.0.2.0`.  
-        Unzip the downloaded directory and copy the contents of `instantclient_xx_x` into your 
+        for your Oracle database.  `cwmspy` is tested with version `12.1.0.2.0`.
+        Unzip the downloaded directory and copy the contents of `instantclient_xx_x` into your
         `PYTHONPATH`.  Use the below code to find your `PYTHONPATH` if you are unsure.
 
 ```python
@@ -38,7 +38,7 @@ pip install git+"https://github.com/jetilton/cwmspy.git"
 >>> print(sys.path)
 ```
 
-You can paste the `instantclient_xx_x` contents into any of the directories listed in the 
+You can paste the `instantclient_xx_x` contents into any of the directories listed in the
 above output.
 
 ## Getting Started
@@ -54,25 +54,42 @@ Lets start with connecting to the database:
 True
 ```
 
-`cwmspy` has multiple ways to connect to the database.  Environment variables have been set 
-in the above example for quick connection.  You will have to manually set these on windows or 
-place them in `.bashrc` for linux if you want to be able to connect without always providing your 
+`cwmspy` has multiple ways to connect to the database.  Environment variables have been set
+in the above example for quick connection.  You will have to manually set these on windows or
+place them in `.bashrc` for linux if you want to be able to connect without always providing your
 username and password.
 
 Other methods include:
 
 - Pass a cx_Oracle connection to the CWMS object on instantiation
 - Pass the user, password, service_name, and host, as arguments to the connect method.
+- Pass `pool=True` to the connect method to create a `cx_Oracle.SessionPool`.
+Each method then borrows a session for the duration of the call.
+- Pass the `name` of a profile in a YAML file to the connect method, see
+`cwmspy.config`.  One file can hold profiles for several databases and offices.
+- Pass `broker=True` to the connect method to forward calls to a local
+`cwmspy.broker` process holding a warm session pool.
+- Pass `standby=[...]` to the connect method to run methods that only read
+on read-only standby databases, falling back to the primary.
+- Pass `cache=True` or a directory to the CWMS object to answer `retrieve_ts`
+and `get_por` from a disk cache, or a `cwmspy.cache.MemoryCache` to keep the windows
+read in memory, see `cwmspy.cache`.
+- Call `retrieve_ts_changes` with `cwmspy.watermarks.HighWaterMarks` to poll
+many series for the values stored since the last pull.
+- Call `get_ts_metadata` to look many time series ids up with one query, kept
+in `CWMS.catalog` for later lookups and `get_ts_code`, see `cwmspy.catalog`.
+- Call `get_time_grids` for the times many regular series have in a window,
+computed locally, see `cwmspy.timegrid`.
 
 
 ```python
 >>> c = CWMS(conn=my_connection)
 
 >>> cwms.connect(host='my_host',
->>>              user='my_user', 
->>>              password='my_password',   
+>>>              user='my_user',
+>>>              password='my_password',
 >>>              service_name='my_serv')
-                          
+
 ```
 
 Now a simple example
@@ -92,16 +109,29 @@ Now a simple example
 
 Method parameters that begin with a `p_` are passed directly to a CWMS function or
 procedure.  Other parameters either need to be transformed before being passed
-or are not passed at all and only used in the method.  
+or are not passed at all and only used in the method.
 
 In the above example `p_cwms_ts_id` is passed directly to the `Retrieve_Ts` procedure
-of the `Cwms_Ts` package.  `start_time` and `end_time` parameters are converted to 
-type `datetime.datetime` before being passed to `Retrieve_Ts`, `df` is used in the 
+of the `Cwms_Ts` package.  `start_time` and `end_time` parameters are converted to
+type `datetime.datetime` before being passed to `Retrieve_Ts`, `df` is used in the
 `retrieve_ts` as an option to return a `pandas.core.DataFrame`
 and is not passed to the `Retrieve_Ts` procedure.
 
 That's it.
 
+## asyncio
+
+`AsyncCWMS` exposes the same methods as coroutines, running them on a
+bounded thread pool over pooled sessions.
+
+```python
+>>> from cwmspy import AsyncCWMS
+>>> cwms = AsyncCWMS()
+>>> await cwms.connect(pool_max=8)
+>>> dfs = await asyncio.gather(*[cwms.retrieve_ts(ts_id, '2019/1/1', '2019/9/1')
+                                 for ts_id in ts_ids])
+```
+
 ## Sub-modules
 
 Sub-modules are broken up into different mixin classes with the same naming
@@ -110,7 +140,7 @@ packages.
 
 ## Methods
 
-Methods will be added when time permits and when needed.  Want a new method?  
+Methods will be added when time permits and when needed.  Want a new method?
 [Open an issue](https://github.com/jetilton/cwmspy/issues). Or, better yet,
 [fork it](https://github.com/login?return_to=%2Fjetilton%2Fcwmspy) and put in a
 [pull request](https://github.com/jetilton/cwmspy/pulls).
@@ -118,3 +148,12 @@ Methods will be added when time permits and when needed.  Want a new method?
 """
 
 from .core import CWMS
+
+
+def __getattr__(name):
+    # asyncio is only imported by code that asks for it
+    if name == "AsyncCWMS":
+        from .aio import AsyncCWMS
+
+        return AsyncCWMS
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
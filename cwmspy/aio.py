@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio facade over the `CWMS` methods
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .core import CWMS
+
+# CWMS methods exposed as coroutines by AsyncCWMS
+METHODS = [
+    "get_ts_code",
+    "get_ts_max_date",
+    "get_ts_min_date",
+    "get_extents",
+    "get_por",
+    "retrieve_ts",
+    "retrieve_time_series",
+    "retrieve_multi_ts",
+    "store_ts",
+    "store_by_df",
+    "delete_ts",
+    "delete_ts_values",
+    "delete_by_df",
+    "store_location",
+    "delete_location",
+    "retrieve_location",
+    "retrieve_location_level_values",
+    "retrieve_location_levels",
+]
+
+
+class _Call:
+    """A CWMS method call that can be cancelled from the event loop."""
+
+    def __init__(self, function, args, kwargs):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.thread_id = None
+        self.cancelled = False
+
+    def __call__(self):
+        if self.cancelled:
+            return None
+        self.thread_id = threading.get_ident()
+        try:
+            return self.function(*self.args, **self.kwargs)
+        finally:
+            self.thread_id = None
+
+    def cancel(self, cwms):
+        self.cancelled = True
+        thread_id = self.thread_id
+        if thread_id is not None:
+            cwms.cancel(thread_id)
+
+
+class AsyncCWMS:
+    """Run `CWMS` methods as coroutines on a bounded thread pool.
+
+    Every method listed in `METHODS` is available as a coroutine taking the
+    same arguments as its `CWMS` counterpart.  Calls run on at most
+    `max_workers` threads, each borrowing a session from the `CWMS`
+    session pool, so many requests can be in flight at once with
+    `asyncio.gather`.  Cancelling a coroutine, directly or through
+    `asyncio.wait_for`, interrupts the database call it is waiting on.
+
+    Parameters
+    ----------
+    cwms : CWMS
+        The object to run methods on (the default is None, create one
+        with `kwargs`).
+    max_workers : int
+        Threads running calls (the default is None, use `pool_max` when
+        connecting).
+    kwargs
+        Passed to `CWMS` when `cwms` is None.
+
+    Examples
+    -------
+    ```python
+    >>> import asyncio
+    >>> from cwmspy import AsyncCWMS
+    >>> async def main():
+    >>>     async with AsyncCWMS() as cwms:
+    >>>         await cwms.connect(pool_max=8)
+    >>>         return await asyncio.gather(
+    >>>             cwms.retrieve_ts("Some.Fully.Qualified.Ts.Id", "2019/1/1", "2019/9/1"),
+    >>>             cwms.retrieve_ts("Another.Fully.Qualified.Ts.Id", "2019/1/1", "2019/9/1"),
+    >>>         )
+    >>> dfs = asyncio.run(main())
+    ```
+    """
+
+    def __init__(self, cwms=None, max_workers=None, **kwargs):
+        self.cwms = cwms if cwms is not None else CWMS(**kwargs)
+        self.max_workers = max_workers
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            max_workers = self.max_workers
+            if max_workers is None and self.cwms.pool is not None:
+                max_workers = self.cwms.pool.max
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="cwmspy"
+            )
+        return self._executor
+
+    async def _run(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        call = _Call(function, args, kwargs)
+        try:
+            return await loop.run_in_executor(self._get_executor(), call)
+        except asyncio.CancelledError:
+            call.cancel(self.cwms)
+            raise
+
+    async def connect(self, pool=True, **kwargs):
+        """Coroutine version of `CWMS.connect`, using a session pool by default.
+
+        The pool's maximum size, from `pool_max` or the connection profile,
+        is used as `max_workers` when it is not set.
+
+        Parameters
+        ----------
+        pool : bool
+            Create a session pool (the default is True).
+        kwargs
+            Passed to `CWMS.connect`.
+
+        Returns
+        -------
+        bool
+            True for success, False otherwise.
+
+        """
+        loop = asyncio.get_running_loop()
+        # the default executor, so ours can be sized from the new pool
+        return await loop.run_in_executor(
+            None, partial(self.cwms.connect, pool=pool, **kwargs)
+        )
+
+    async def close(self):
+        """Close the connection and shut down the thread pool."""
+        result = await self._run(self.cwms.close)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        return result
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+def _coroutine(name):
+    async def method(self, *args, **kwargs):
+        return await self._run(getattr(self.cwms, name), *args, **kwargs)
+
+    method.__name__ = name
+    method.__qualname__ = f"AsyncCWMS.{name}"
+    method.__doc__ = f"Coroutine version of `CWMS.{name}`."
+    return method
+
+
+for _name in METHODS:
+    setattr(AsyncCWMS, _name, _coroutine(_name))
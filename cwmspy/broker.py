@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+Local connection broker for short-lived processes
+
+A broker is a long-running process holding a `CWMS` session pool.  Other
+processes on the same machine connect to it over a Unix domain socket with
+`CWMS.connect(broker=...)` and have their method calls run by the broker,
+so a short script skips the Oracle logon entirely and the database only
+sees the broker's sessions.
+
+Requests and results are sent as length-prefixed pickles.  Pickles can run
+code when loaded, so the socket is only readable and writable by the user
+who started the broker, in a directory only that user can write to, and
+both ends check that the other runs as the same user before loading
+anything.
+
+Start a broker with the `cwms broker` command or from Python:
+
+```python
+>>> from cwmspy.broker import serve
+>>> serve(name="prod", pool_max=8)
+```
+"""
+
+import os
+import logging
+import pickle
+import socket
+import socketserver
+import stat
+import struct
+import tempfile
+import threading
+
+from .utils import log_decorator
+
+LOGGER = logging.getLogger(__name__)
+LD = log_decorator(LOGGER)
+
+# CWMS methods that act on the local object and are never forwarded
+LOCAL_METHODS = {
+    "connect",
+    "close",
+    "acquire",
+    "cancel",
+    "reconnect",
+    "ping",
+    "is_open",
+    "is_closed",
+    "start_keepalive",
+    "stop_keepalive",
+    "add_env",
+}
+
+_HEADER = struct.Struct("!I")
+# pid, uid and gid of SO_PEERCRED
+_CREDS = struct.Struct("3i")
+
+
+def default_path():
+    """The socket used when none is given.
+
+    Returns
+    -------
+    str
+        `CWMSPY_BROKER` if set to a path, otherwise a socket in
+        `XDG_RUNTIME_DIR` or, without one, in a per-user directory of the
+        temporary directory.
+
+    Raises
+    ------
+    PermissionError
+        The per-user directory is not private to the current user.
+
+    """
+    path = os.getenv("CWMSPY_BROKER")
+    if path and path not in ("1", "true", "True"):
+        return path
+    runtime = os.getenv("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        directory = runtime
+    else:
+        directory = os.path.join(tempfile.gettempdir(), f"cwmspy-{os.getuid()}")
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    _check_private(directory, stat.S_ISDIR)
+    return os.path.join(directory, "cwmspy-broker.sock")
+
+
+def _check_private(path, is_type=stat.S_ISSOCK):
+    """Raise PermissionError unless `path` belongs to the current user and
+    no one else can read or write it."""
+    st = os.lstat(path)
+    if not is_type(st.st_mode):
+        raise PermissionError(f"{path} is not a socket or directory")
+    if st.st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by another user")
+    if stat.S_IMODE(st.st_mode) & 0o077:
+        raise PermissionError(f"{path} is accessible to other users")
+
+
+def _check_peer(sock):
+    """Raise PermissionError unless the other end of `sock` runs as the
+    current user, where the platform tells."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _CREDS.size)
+    _, uid, _ = _CREDS.unpack(creds)
+    if uid != os.getuid():
+        raise PermissionError(f"Broker peer runs as another user ({uid})")
+
+
+def _send(sock, obj):
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exactly(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("Broker connection closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def _recv(sock):
+    (n,) = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+    return pickle.loads(_recv_exactly(sock, n))
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        cwms = self.server.cwms
+        try:
+            _check_peer(self.request)
+        except PermissionError as e:
+            LOGGER.warning(e)
+            return
+        while True:
+            try:
+                name, args, kwargs, timeout = _recv(self.request)
+            except ConnectionError:
+                return
+            try:
+                if name == "ping":
+                    result = cwms.is_open()
+                elif name.startswith("_") or name in LOCAL_METHODS:
+                    raise ValueError(f"{name} can not be called through the broker")
+                else:
+                    with cwms.deadline(timeout):
+                        result = getattr(cwms, name)(*args, **kwargs)
+                response = (True, result)
+            except Exception as e:
+                response = (False, e.__str__())
+            _send(self.request, response)
+
+
+class Broker(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serve the methods of a connected `CWMS` object on a Unix socket.
+
+    Every client connection gets a thread, and every call borrows a session
+    from `cwms` for its duration, so `cwms` should be connected with
+    `pool=True`.
+
+    Parameters
+    ----------
+    cwms : CWMS
+        The connected object calls are run on.
+    path : str
+        Socket path (the default is None, see `default_path`).
+
+    Examples
+    -------
+    ```python
+    >>> cwms = CWMS()
+    >>> cwms.connect(name="prod", pool=True)
+    >>> with Broker(cwms) as broker:
+    >>>     broker.serve_forever()
+    ```
+    """
+
+    daemon_threads = True
+
+    def __init__(self, cwms, path=None):
+        self.cwms = cwms
+        path = path or default_path()
+        if os.path.exists(path):
+            if BrokerClient(path).ping():
+                raise ValueError(f"A broker is already listening on {path}")
+            # left behind by a broker that did not shut down cleanly
+            os.remove(path)
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(umask)
+        LOGGER.info(f"Broker listening on {path}")
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
+
+
+class BrokerClient:
+    """Forward `CWMS` method calls to a `Broker`.
+
+    Each thread keeps its own socket so calls from several threads run
+    concurrently in the broker.
+
+    Parameters
+    ----------
+    path : str
+        Socket path (the default is None, see `default_path`).
+
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        self._local = threading.local()
+        self._socks = []
+        self._lock = threading.Lock()
+
+    def _socket(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            # another user's socket could answer with any pickle
+            _check_private(self.path)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.path)
+                _check_peer(sock)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+            with self._lock:
+                self._socks.append(sock)
+        return sock
+
+    def call(self, name, args=(), kwargs=None, timeout=None):
+        """Run `CWMS.<name>(*args, **kwargs)` in the broker.
+
+        Parameters
+        ----------
+        name : str
+            Method name.
+        args : tuple
+            Positional arguments.
+        kwargs : dict
+            Keyword arguments.
+        timeout : float
+            Seconds the call may take, applied as a `CWMS.deadline` in the
+            broker (the default is None, no limit).
+
+        Raises
+        ------
+        ValueError
+            The error raised by the method, or the broker being unreachable.
+
+        """
+        try:
+            sock = self._socket()
+            # a little slack for the broker to report its own timeout
+            sock.settimeout(None if timeout is None else timeout + 1)
+            _send(sock, (name, tuple(args), kwargs or {}, timeout))
+            ok, result = _recv(sock)
+        except (OSError, EOFError, pickle.PickleError) as e:
+            # the socket may still get the answer to this call, do not reuse it
+            self._drop_socket()
+            raise ValueError(f"Broker at {self.path} is unreachable: {e}")
+        if not ok:
+            raise ValueError(result)
+        return result
+
+    def _drop_socket(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            with self._lock:
+                if sock in self._socks:
+                    self._socks.remove(sock)
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def ping(self):
+        """Whether the broker answers and its database connection is usable."""
+        try:
+            return bool(self.call("ping"))
+        except ValueError as e:
+            LOGGER.debug(e)
+            return False
+
+    def close(self):
+        """Close the sockets of all threads."""
+        with self._lock:
+            socks, self._socks = self._socks, []
+        for sock in socks:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._local = threading.local()
+
+
+@LD
+def serve(path=None, verbose=False, **kwargs):
+    """Connect a pooled `CWMS` and serve it until interrupted.
+
+    Parameters
+    ----------
+    path : str
+        Socket path (the default is None, see `default_path`).
+    verbose : bool
+        Log at debug level (the default is False).
+    kwargs
+        Passed to `CWMS.connect`, `pool` defaults to True.
+
+    """
+    from .core import CWMS
+
+    kwargs.setdefault("pool", True)
+    # the broker itself always logs on
+    kwargs["broker"] = False
+    cwms = CWMS(verbose=verbose)
+    if not cwms.connect(**kwargs):
+        raise ValueError("Broker failed to connect to the database")
+    cwms.start_keepalive()
+    broker = Broker(cwms, path)
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        LOGGER.info("Broker interrupted")
+    finally:
+        broker.server_close()
+        cwms.close()
@@ -0,0 +1,623 @@
+# -*- coding: utf-8 -*-
+"""
+Read-through caches of time series
+
+`MemoryCache` keeps the windows read in this process, see below.
+`DiskCache` keeps each series on disk from its first value up to a
+high-water mark, the last time fetched.  A read is answered from disk,
+after fetching only the values stored since the high-water mark, found
+with `cwms_ts.get_ts_max_date` at most once every `max_age` seconds.
+Storing or deleting a series through the same `CWMS` object drops its
+cached copy, as does `DiskCache.invalidate`.  Values changed by other
+writers before the high-water mark are only seen once the series is
+invalidated.
+
+Series are saved as NumPy `.npz` files, one per year, under a directory
+per time series id and per combination of units, time zone, office and
+version:
+
+    <path>/<ts_id>/<key>/meta.json
+    <path>/<ts_id>/<key>/2019.npz
+
+```python
+>>> from cwmspy import CWMS
+>>> cwms = CWMS(cache="~/.cache/cwmspy")
+>>> cwms.connect()
+>>> df = cwms.get_por("Some.Fully.Qualified.Ts.Id")  # from disk next time
+```
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import quote
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, where refreshes are only serialized within a process
+    fcntl = None
+
+from . import results
+from .timezones import to_utc, utc_to_local
+from .utils import LazyModule
+
+np = LazyModule("numpy")
+
+
+LOGGER = logging.getLogger(__name__)
+
+NON_VERSIONED = "1111/11/11"
+# coverage bounds of a series known to hold nothing before or after
+BEGINNING = datetime.datetime.min
+END = datetime.datetime.max
+
+
+def default_path():
+    """Cache directory, `CWMSPY_CACHE` or `~/.cache/cwmspy`."""
+    return os.getenv("CWMSPY_CACHE", os.path.join("~", ".cache", "cwmspy"))
+
+
+@contextmanager
+def _file_lock(path):
+    """Hold an exclusive lock on `path`, shared by every process."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class DiskCache:
+    """Time series kept on disk and refreshed from their high-water mark.
+
+    Parameters
+    ----------
+    path : str
+        Directory holding the cache (the default is None, see
+        `default_path`).
+    max_age : float
+        Seconds a series is served without checking the database for newer
+        values (the default is 60).
+
+    """
+
+    def __init__(self, path=None, max_age=60):
+        self.path = os.path.expanduser(path or default_path())
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        # one lock per cached series, so different series update at once
+        self._locks = {}
+
+    def _series_lock(self, directory):
+        with self._lock:
+            return self._locks.setdefault(directory, threading.Lock())
+
+    def _series_path(self, p_cwms_ts_id):
+        # time series ids are not case sensitive
+        return os.path.join(self.path, quote(p_cwms_ts_id.upper(), safe=""))
+
+    def _directory(self, p_cwms_ts_id, key):
+        digest = hashlib.sha1(json.dumps(key).encode()).hexdigest()[:16]
+        return os.path.join(self._series_path(p_cwms_ts_id), digest)
+
+    def retrieve(
+        self,
+        cwms,
+        p_cwms_ts_id,
+        p_start_time=None,
+        p_end_time=None,
+        p_units=None,
+        p_timezone="UTC",
+        p_trim="F",
+        p_start_inclusive="T",
+        p_end_inclusive="T",
+        p_previous="T",
+        p_next="F",
+        version_date=None,
+        p_max_version="T",
+        p_office_id=None,
+        return_type="df",
+    ):
+        """`CWMS.retrieve_ts_window` answered from the cache.
+
+        Parameters
+        ----------
+        cwms : CWMS
+            Connection used to fill and refresh the cache.
+        p_start_time, p_end_time : datetime
+            The time window (the default is None, the whole period of
+            record).
+        kwargs
+            As for `CWMS.retrieve_ts_window`.
+
+        """
+        version_date = version_date or NON_VERSIONED
+        key = [p_units, p_timezone, version_date, p_max_version, p_office_id]
+        directory = self._directory(p_cwms_ts_id, key)
+        # other processes sharing the cache refresh it too
+        with self._series_lock(directory), _file_lock(directory + ".lock"):
+            meta = self._refresh(cwms, directory, p_cwms_ts_id, key)
+        if meta["end"] is None:
+            times, values, qualities = _empty()
+        else:
+            times, values, qualities = self._window(
+                directory, meta, p_start_time, p_end_time
+            )
+
+        return results.series(
+            return_type,
+            *_select(
+                times,
+                values,
+                qualities,
+                p_start_time,
+                p_end_time,
+                p_trim,
+                p_start_inclusive,
+                p_end_inclusive,
+                p_previous,
+                p_next,
+            ),
+            p_cwms_ts_id,
+            p_timezone,
+            p_units,
+        )
+
+    def _refresh(self, cwms, directory, p_cwms_ts_id, key):
+        """Fetch what is missing from the cache, return its metadata."""
+        p_units, p_timezone, version_date, p_max_version, p_office_id = key
+        meta = self._meta(directory)
+        if meta is not None and time.time() - meta["checked"] < self.max_age:
+            return meta
+
+        latest = cwms.get_ts_max_date(
+            p_cwms_ts_id,
+            p_time_zone=p_timezone,
+            version_date=version_date,
+            p_office_id=p_office_id,
+        )
+        if meta is None or meta["end"] is None:
+            start = cwms.get_ts_min_date(
+                p_cwms_ts_id,
+                p_time_zone=p_timezone,
+                version_date=version_date,
+                p_office_id=p_office_id,
+            )
+            meta = {"key": key, "end": None}
+            p_start_inclusive = "T"
+            # values left from a copy whose metadata was lost
+            shutil.rmtree(directory, ignore_errors=True)
+        else:
+            start = datetime.datetime.fromisoformat(meta["end"])
+            p_start_inclusive = "F"
+
+        if latest is not None and (meta["end"] is None or latest > start):
+            block = cwms.retrieve_ts_window(
+                p_cwms_ts_id,
+                start,
+                latest,
+                p_units=p_units,
+                p_timezone=p_timezone,
+                p_start_inclusive=p_start_inclusive,
+                p_previous="F",
+                p_next="F",
+                version_date=version_date,
+                p_max_version=p_max_version,
+                p_office_id=p_office_id,
+                return_type="dict",
+            )
+            self._append(directory, block)
+            LOGGER.info(f"Cached {len(block['date_time'])} values of {p_cwms_ts_id}")
+            meta["end"] = latest.isoformat()
+        meta["checked"] = time.time()
+        self._write_meta(directory, meta)
+        return meta
+
+    def _window(self, directory, meta, p_start_time, p_end_time):
+        """Cached values of the years overlapping the window, widened a year
+        at a time until the values before and after it are included."""
+        years = self._years(directory)
+        if not years:
+            return _empty()
+        first = p_start_time.year if p_start_time else years[0]
+        last = p_end_time.year if p_end_time else years[-1]
+        blocks = {y: self._load(directory, y) for y in years if first <= y <= last}
+        earlier = [y for y in years if y < first]
+        later = [y for y in years if y > last]
+
+        def loaded():
+            ordered = [blocks[y] for y in sorted(blocks)] or [_empty()]
+            return tuple(np.concatenate([b[i] for b in ordered]) for i in range(3))
+
+        times = loaded()[0]
+        start = None if p_start_time is None else np.datetime64(p_start_time, "ns")
+        while earlier and (not len(times) or times[0] >= start):
+            year = earlier.pop()
+            blocks[year] = self._load(directory, year)
+            times = loaded()[0]
+        end = None if p_end_time is None else np.datetime64(p_end_time, "ns")
+        while later and (not len(times) or times[-1] <= end):
+            year = later.pop(0)
+            blocks[year] = self._load(directory, year)
+            times = loaded()[0]
+        return loaded()
+
+    def _years(self, directory):
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        return sorted(int(n[:-4]) for n in names if n.endswith(".npz"))
+
+    def _load(self, directory, year):
+        with np.load(os.path.join(directory, f"{year}.npz")) as data:
+            return data["date_time"], data["value"], data["quality_code"]
+
+    def _append(self, directory, block):
+        """Add fetched values, rewriting only the years they fall in."""
+        times = block["date_time"]
+        if not len(times):
+            return
+        os.makedirs(directory, exist_ok=True)
+        years = times.astype("datetime64[Y]").astype(int) + 1970
+        existing = set(self._years(directory))
+        for year in np.unique(years):
+            mask = years == year
+            arrays = [times[mask], block["value"][mask], block["quality_code"][mask]]
+            if year in existing:
+                old = self._load(directory, year)
+                arrays = [np.concatenate([o, a]) for o, a in zip(old, arrays)]
+                # a time fetched twice keeps its latest value
+                _, last = np.unique(arrays[0][::-1], return_index=True)
+                keep = len(arrays[0]) - 1 - last
+                arrays = [a[keep] for a in arrays]
+            self._save(directory, int(year), *arrays)
+
+    def _save(self, directory, year, times, values, qualities):
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, date_time=times, value=values, quality_code=qualities)
+        os.replace(tmp, os.path.join(directory, f"{year}.npz"))
+
+    def _meta(self, directory):
+        try:
+            with open(os.path.join(directory, "meta.json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_meta(self, directory, meta):
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(directory, "meta.json"))
+
+    def invalidate(self, p_cwms_ts_id):
+        """Drop every cached copy of a time series."""
+        directory = self._series_path(p_cwms_ts_id)
+        with self._lock:
+            shutil.rmtree(directory, ignore_errors=True)
+            for name in [d for d in self._locks if d.startswith(directory + os.sep)]:
+                del self._locks[name]
+        LOGGER.info(f"Dropped cached {p_cwms_ts_id}")
+
+    def clear(self):
+        """Drop the whole cache."""
+        with self._lock:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self._locks.clear()
+
+
+class _Series:
+    """Cached values of one series and the time intervals they cover."""
+
+    def __init__(self):
+        self.times, self.values, self.qualities = _empty()
+        # sorted, disjoint (start, end) UTC datetimes known to hold every
+        # value, from BEGINNING or to END when none is before or after
+        self.coverage = []
+
+    @property
+    def nbytes(self):
+        return self.times.nbytes + self.values.nbytes + self.qualities.nbytes
+
+    def gaps(self, start, end):
+        """Parts of `start` to `end` not covered yet."""
+        gaps = []
+        for a, b in self.coverage:
+            if b < start:
+                continue
+            if a > end:
+                break
+            if a > start:
+                gaps.append((start, a))
+            start = max(start, b)
+        if start < end or not self.covers(start):
+            gaps.append((start, end))
+        return gaps
+
+    def covers(self, t):
+        return any(a <= t <= b for a, b in self.coverage)
+
+    def add(self, start, end, block):
+        """Merge fetched values covering `start` to `end`."""
+        times = np.concatenate([self.times, block["date_time"]])
+        values = np.concatenate([self.values, block["value"]])
+        qualities = np.concatenate([self.qualities, block["quality_code"]])
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+        # the last fetched of values at the same time wins
+        last = np.append(times[1:] != times[:-1], True)
+        self.times = times[last]
+        self.values = values[order][last]
+        self.qualities = qualities[order][last]
+
+        merged = []
+        for a, b in sorted(self.coverage + [(start, end)]):
+            if merged and a <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+            else:
+                merged.append((a, b))
+        self.coverage = merged
+
+    def known_before(self, t):
+        """Whether the last value before `t`, if any, is held."""
+        i = np.searchsorted(self.times, np.datetime64(t, "ns"), "left")
+        for a, b in self.coverage:
+            if a <= t <= b:
+                # coverage from the beginning of time: there is none before
+                return a == BEGINNING or (
+                    i > 0 and self.times[i - 1] >= np.datetime64(a, "ns")
+                )
+        return False
+
+    def known_after(self, t):
+        """Whether the first value after `t`, if any, is held."""
+        i = np.searchsorted(self.times, np.datetime64(t, "ns"), "right")
+        for a, b in self.coverage:
+            if a <= t <= b:
+                return b == END or (
+                    i < len(self.times) and self.times[i] <= np.datetime64(b, "ns")
+                )
+        return False
+
+
+class MemoryCache:
+    """Time series windows kept in memory, fetching only what is missing.
+
+    Each series, per units, office and version, keeps the values fetched
+    so far and the time intervals they cover in UTC, converted to the
+    time zone of each request on the way out.  A request only fetches
+    the parts of its window not covered yet, so overlapping or scrolling
+    windows cost a fraction of the round trips.  Series least recently
+    used are dropped once the cache holds more than `max_bytes`.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Memory allowed for cached values (the default is 256 MiB).
+
+    Examples
+    -------
+    ```python
+    >>> cwms = CWMS(cache=MemoryCache(max_bytes=64 * 2**20))
+    >>> cwms.connect()
+    >>> df = cwms.retrieve_ts(ts_id, "2019/1/1", "2019/2/1")
+    >>> df = cwms.retrieve_ts(ts_id, "2019/1/15", "2019/2/15")  # fetches 2/1-2/15
+    >>> cwms.cache.stats()["misses"]
+    2
+    ```
+    """
+
+    def __init__(self, max_bytes=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._series = OrderedDict()
+        self._lock = threading.RLock()
+
+    def retrieve(
+        self,
+        cwms,
+        p_cwms_ts_id,
+        p_start_time=None,
+        p_end_time=None,
+        p_units=None,
+        p_timezone="UTC",
+        p_trim="F",
+        p_start_inclusive="T",
+        p_end_inclusive="T",
+        p_previous="T",
+        p_next="F",
+        version_date=None,
+        p_max_version="T",
+        p_office_id=None,
+        return_type="df",
+    ):
+        """`CWMS.retrieve_ts_window` answered from memory, see
+        `DiskCache.retrieve`."""
+        version_date = version_date or NON_VERSIONED
+        kwargs = dict(
+            p_units=p_units,
+            p_timezone="UTC",
+            version_date=version_date,
+            p_max_version=p_max_version,
+            p_office_id=p_office_id,
+        )
+        extents = dict(
+            p_time_zone=p_timezone, version_date=version_date, p_office_id=p_office_id
+        )
+        if p_start_time is None:
+            p_start_time = cwms.get_ts_min_date(p_cwms_ts_id, **extents)
+        if p_end_time is None:
+            p_end_time = cwms.get_ts_max_date(p_cwms_ts_id, **extents)
+        if p_start_time is None or p_end_time is None:
+            # a series without values
+            return results.series(
+                return_type, *_empty(), p_cwms_ts_id, p_timezone, p_units
+            )
+        # kept in UTC, where times are unique and intervals unambiguous
+        key = (p_cwms_ts_id.upper(), p_units, version_date, p_max_version)
+        key += (p_office_id,)
+        first = to_utc(p_start_time, p_timezone)
+        last = to_utc(p_end_time, p_timezone)
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+            self._series.move_to_end(key)
+            gaps = series.gaps(first, last)
+        fetched = bool(gaps)
+
+        def fetch(start, end, **flags):
+            return cwms.retrieve_ts_window(
+                p_cwms_ts_id, start, end, return_type="dict", **flags, **kwargs
+            )
+
+        for start, end in gaps:
+            block = fetch(start, end, p_previous="F", p_next="F")
+            with self._lock:
+                series.add(start, end, block)
+        if p_previous == "T" and not series.known_before(first):
+            block = fetch(first, first, p_previous="T", p_next="F")
+            before = block["date_time"] < np.datetime64(first, "ns")
+            start = BEGINNING
+            if before.any():
+                start = block["date_time"][0].astype("datetime64[us]").item()
+            with self._lock:
+                series.add(start, first, block)
+            fetched = True
+        if p_next == "T" and not series.known_after(last):
+            block = fetch(last, last, p_previous="F", p_next="T")
+            after = block["date_time"] > np.datetime64(last, "ns")
+            end = END
+            if after.any():
+                end = block["date_time"][-1].astype("datetime64[us]").item()
+            with self._lock:
+                series.add(last, end, block)
+            fetched = True
+
+        with self._lock:
+            if fetched:
+                self.misses += 1
+            else:
+                self.hits += 1
+            times = series.times
+            lo = np.searchsorted(times, np.datetime64(first, "ns"), "left")
+            hi = np.searchsorted(times, np.datetime64(last, "ns"), "right")
+            # with the values just before and after the window
+            lo, hi = max(lo - 1, 0), hi + 1
+            rows = times[lo:hi], series.values[lo:hi], series.qualities[lo:hi]
+            self._evict()
+        times, values, qualities = _select(
+            *rows,
+            first,
+            last,
+            p_trim,
+            p_start_inclusive,
+            p_end_inclusive,
+            p_previous,
+            p_next,
+        )
+        if p_timezone.upper() != "UTC":
+            times = utc_to_local(times, p_timezone)
+        return results.series(
+            return_type, times, values, qualities, p_cwms_ts_id, p_timezone, p_units
+        )
+
+    @property
+    def nbytes(self):
+        """Memory held by cached values."""
+        with self._lock:
+            return sum(s.nbytes for s in self._series.values())
+
+    def _evict(self):
+        total = self.nbytes
+        while total > self.max_bytes and self._series:
+            _, series = self._series.popitem(last=False)
+            total -= series.nbytes
+            self.evictions += 1
+
+    def stats(self):
+        """Hits, misses and evictions so far, series and bytes held."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "series": len(self._series),
+                "bytes": self.nbytes,
+            }
+
+    def invalidate(self, p_cwms_ts_id):
+        """Drop every cached copy of a time series."""
+        with self._lock:
+            ts_id = p_cwms_ts_id.upper()
+            for key in [k for k in self._series if k[0] == ts_id]:
+                del self._series[key]
+
+    def clear(self):
+        """Drop the whole cache."""
+        with self._lock:
+            self._series.clear()
+
+
+def _empty():
+    return (
+        np.empty(0, dtype="datetime64[ns]"),
+        np.empty(0, dtype="float64"),
+        np.empty(0, dtype="int64"),
+    )
+
+
+def _select(
+    times,
+    values,
+    qualities,
+    p_start_time,
+    p_end_time,
+    p_trim,
+    p_start_inclusive,
+    p_end_inclusive,
+    p_previous,
+    p_next,
+):
+    """The rows `cwms_ts.retrieve_ts` returns for a window, out of sorted
+    rows covering it and the values around it."""
+    after_start = np.ones(len(times), dtype=bool)
+    before_end = np.ones(len(times), dtype=bool)
+    if p_start_time is not None:
+        start = np.datetime64(p_start_time, "ns")
+        after_start = (times > start) | ((times == start) & (p_start_inclusive == "T"))
+    if p_end_time is not None:
+        end = np.datetime64(p_end_time, "ns")
+        before_end = (times < end) | ((times == end) & (p_end_inclusive == "T"))
+    inside = after_start & before_end
+    keep = inside.copy()
+    if p_trim == "T":
+        found = np.flatnonzero(inside & ~np.isnan(values))
+        keep[:] = False
+        if len(found):
+            keep[found[0] : found[-1] + 1] = True
+    if p_previous == "T" and (~after_start).any():
+        keep[np.flatnonzero(~after_start)[-1]] = True
+    if p_next == "T" and (~before_end).any():
+        keep[np.flatnonzero(~before_end)[0]] = True
+    return times[keep], values[keep], qualities[keep]
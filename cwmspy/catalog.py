@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Time series metadata cache
+
+`CWMS.get_ts_metadata` looks many time series ids up in `cwms_v_ts_id`
+with one query and keeps what it finds, and what it does not, in the
+`CWMS.catalog`: ts_code, interval, interval offset, units, active flag
+and time zone of each series.  `CWMS.get_ts_code` is answered from it.
+Entries expire after `ttl` seconds, unknown ids after `negative_ttl`
+seconds, and creating, renaming, storing or deleting a series through the
+same `CWMS` object drops its entry.
+
+```python
+>>> meta = cwms.get_ts_metadata(manifest_ts_ids)  # one query
+>>> unknown = [ts_id for ts_id, m in meta.items() if m is None]
+>>> cwms.get_ts_code(manifest_ts_ids[0])  # no query
+```
+"""
+import threading
+import time
+
+# Columns of cwms_v_ts_id kept per series
+COLUMNS = (
+    "office_id",
+    "cwms_ts_id",
+    "ts_code",
+    "interval_id",
+    "interval_utc_offset",
+    "unit_id",
+    "active_flag",
+    "time_zone_id",
+)
+
+
+class TsCatalog:
+    """Metadata of time series ids, by office.
+
+    Parameters
+    ----------
+    ttl : float
+        Seconds metadata is trusted (the default is an hour).
+    negative_ttl : float
+        Seconds an id not found is trusted to not exist (the default is
+        five minutes).
+
+    """
+
+    def __init__(self, ttl=3600, negative_ttl=300):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(p_office_id, p_cwms_ts_id):
+        # time series ids are not case sensitive
+        return p_office_id and p_office_id.upper(), p_cwms_ts_id.upper()
+
+    def lookup(self, p_office_id, p_cwms_ts_id_list):
+        """Metadata of the ids still cached, None for ids known not to exist.
+
+        Returns
+        -------
+        dict
+            Metadata by time series id, leaving out ids not cached.
+
+        """
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for ts_id in p_cwms_ts_id_list:
+                entry = self._entries.get(self._key(p_office_id, ts_id))
+                if entry is not None and entry[0] > now:
+                    found[ts_id] = entry[1]
+        return found
+
+    def put(self, p_office_id, p_cwms_ts_id, meta):
+        """Cache the metadata of an id, None if it does not exist."""
+        ttl = self.ttl if meta is not None else self.negative_ttl
+        with self._lock:
+            self._entries[self._key(p_office_id, p_cwms_ts_id)] = (
+                time.monotonic() + ttl,
+                meta,
+            )
+
+    def invalidate(self, p_cwms_ts_id):
+        """Drop an id from the cache, for every office."""
+        ts_id = p_cwms_ts_id.upper()
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == ts_id]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drop the whole cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
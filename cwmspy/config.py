@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Connection profiles read from a YAML file
+
+A profile names a database and the options used to connect to it.  The file
+may hold a list of profiles, each with a `name` key, or a mapping from name
+to profile:
+
+```yaml
+prod:
+  host: cwms-db.example.com
+  service_name: CWMSPROD
+  user: cwms_user
+  password: secret
+  office: NWDP
+  pool: true
+  pool_max: 8
+  call_timeout: 30000
+  standby:
+    - cwms-standby.example.com/CWMSPROD
+test:
+  dsn: CWMSTEST
+  user: cwms_user
+  password: secret
+  office: NWDM
+  driver: oracledb
+```
+
+Files are parsed once and kept until their modification time or size
+changes, so `CWMS.connect(name=...)` can be called repeatedly without
+re-reading the file.
+"""
+
+import os
+import logging
+import threading
+import time
+
+from .utils import LazyModule
+
+yaml = LazyModule("yaml")
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Profile keys understood by `CWMS.connect`.
+PROFILE_KEYS = {
+    "host",
+    "service_name",
+    "port",
+    "user",
+    "password",
+    "dsn",
+    "office",
+    "pool",
+    "pool_min",
+    "pool_max",
+    "pool_increment",
+    "pool_timeout",
+    "call_timeout",
+    "stmtcachesize",
+    "standby",
+    "driver",
+}
+
+# Seconds a loaded file is trusted before checking its modification time again.
+CHECK_INTERVAL = 1.0
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def default_path():
+    """The profile file used when none is given.
+
+    Returns
+    -------
+    str
+        `CWMSPY_CONFIG` if set, otherwise `.env` in the working directory.
+
+    """
+    return os.getenv("CWMSPY_CONFIG", ".env")
+
+
+def _parse(path):
+    with open(path, "r") as stream:
+        try:
+            config = yaml.safe_load(stream)
+        except yaml.YAMLError as e:
+            LOGGER.error("Error loading config")
+            raise (e)
+
+    if config is None:
+        return {}
+    if isinstance(config, list):
+        items = []
+        for d in config:
+            d = dict(d)
+            items.append((d.pop("name"), d))
+    elif isinstance(config, dict):
+        items = [(name, dict(d)) for name, d in config.items()]
+    else:
+        raise ValueError(f"{path} must hold a list or mapping of profiles")
+
+    profiles = {}
+    for name, profile in items:
+        unknown = set(profile) - PROFILE_KEYS
+        if unknown:
+            LOGGER.warning(f"Ignoring unknown keys in profile {name}: {unknown}")
+            for key in unknown:
+                del profile[key]
+        profiles[str(name)] = profile
+    return profiles
+
+
+def load_profiles(path=None):
+    """All profiles in `path`, parsed once per change to the file.
+
+    Parameters
+    ----------
+    path : str
+        The profile file (the default is None, see `default_path`).
+
+    Returns
+    -------
+    dict
+        Profiles keyed by name.  The dictionaries are shared, copy them
+        before changing anything.
+
+    """
+    path = os.path.abspath(path or default_path())
+    now = time.monotonic()
+    entry = _cache.get(path)
+    if entry is not None and now - entry["checked"] < CHECK_INTERVAL:
+        return entry["profiles"]
+
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        entry = _cache.get(path)
+        if entry is None or entry["key"] != key:
+            LOGGER.info(f"Loading profiles from {path}")
+            entry = {"key": key, "profiles": _parse(path)}
+            _cache[path] = entry
+        entry["checked"] = now
+    return entry["profiles"]
+
+
+def get_profile(name, path=None):
+    """The profile called `name`.
+
+    Parameters
+    ----------
+    name : str
+        Profile name.
+    path : str
+        The profile file (the default is None, see `default_path`).
+
+    Returns
+    -------
+    dict
+        A copy of the profile.
+
+    Examples
+    -------
+    ```python
+    >>> from cwmspy.config import get_profile
+    >>> get_profile("prod")["office"]
+    'NWDP'
+    ```
+    """
+    profiles = load_profiles(path)
+    try:
+        return dict(profiles[name])
+    except KeyError:
+        msg = f"No profile named {name}"
+        LOGGER.error(msg)
+        raise ValueError(msg)
+
+
+def clear_cache():
+    """Forget every loaded file."""
+    with _lock:
+        _cache.clear()
@@ -1,28 +1,124 @@
 # -*- coding: utf-8 -*-
 
 import sys
-import cx_Oracle
 import os
 from os.path import join, dirname
 import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
 from shutil import copyfile
 
-import yaml
-
 from .cwms_ts import CwmsTsMixin
 from .cwms_loc import CwmsLocMixin
 from .cwms_level import CwmsLevelMixin
-from .utils import log_decorator
-
+from .broker import BrokerClient
+from .cache import DiskCache
+from .catalog import TsCatalog
+from .config import get_profile
+from .drivers import get_driver, driver_for
+from .registry import ConnectionRegistry
+from .utils import log_decorator, is_disconnect, is_recoverable
 
 LOGGER = logging.getLogger(__name__)
 LD = log_decorator(LOGGER)
 FORMAT = "%(levelname)s - %(asctime)s - %(name)s - %(message)s"
 
+# Applied to every new session, pooled or not.
+SESSION_SETTINGS = [
+    "ALTER SESSION SET NLS_DATE_FORMAT = 'YYYY-MM-DD HH24:MI:SS'",
+    "ALTER SESSION SET NLS_TIMESTAMP_FORMAT = 'YYYY-MM-DD HH24:MI:SS.FF'",
+]
+
+
+def init_session(conn, requested_tag=None, office=None):
+    """Session callback applying `SESSION_SETTINGS` to a new session.
+
+    Parameters
+    ----------
+    conn : Connection
+        The newly created session.
+    requested_tag : str
+        Tag requested when acquiring from a session pool (unused).
+    office : str
+        Office made the session default with `cwms_env.set_session_office_id`
+        (the default is None, keep the user's default office).
+
+    """
+    cur = conn.cursor()
+    try:
+        for sql in SESSION_SETTINGS:
+            cur.execute(sql)
+        if office:
+            cur.callproc("cwms_env.set_session_office_id", [office])
+    finally:
+        cur.close()
+
 
 class CWMS(CwmsLocMixin, CwmsTsMixin, CwmsLevelMixin):
-    def __init__(self, conn=None, verbose=False):
+    def __init__(
+        self,
+        conn=None,
+        verbose=False,
+        pool=None,
+        health_ttl=60,
+        retries=5,
+        retry_backoff=0.5,
+        retry_max_backoff=10,
+        standby=None,
+        driver=None,
+        cache=None,
+        catalog=True,
+    ):
         self.conn = conn
+        self.pool = pool
+        if driver is None and (conn is not None or pool is not None):
+            driver = driver_for(conn if conn is not None else pool)
+        # DB-API module used to connect, see cwmspy.drivers
+        self.driver = get_driver(driver)
+        # read-through time series cache, see cwmspy.cache
+        if cache is True or isinstance(cache, str):
+            cache = DiskCache(None if cache is True else cache)
+        self.cache = cache
+        # time series metadata, see cwmspy.catalog
+        if catalog is True:
+            catalog = TsCatalog()
+        self.catalog = catalog if catalog is not False else None
+        # session pools on read-only standby databases
+        self.standby = list(standby or [])
+        # monotonic time until which a failed standby is skipped, by index
+        self._standby_down = {}
+        # connect arguments of each standby, for worker processes
+        self._standby_args = []
+        self.host = None
+        # session default office and call timeout (ms) from the last connect
+        self.office = None
+        self.call_timeout = None
+        # forwards calls to a local broker process when set
+        self.broker = None
+        # worker processes started by process_pool
+        self._process_pool = None
+        # arguments of the last connect, kept to reconnect
+        self._conn_dict = None
+        self._generation = 0
+        # reconnect and retry a call this many times on a recoverable error
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.retry_max_backoff = retry_max_backoff
+        # seconds a successful call or ping vouches for the connection
+        self.health_ttl = health_ttl
+        self._healthy = None
+        self._checked = 0
+        self._keepalive = None
+        # serializes use of self.conn when not pooled
+        self._lock = threading.RLock()
+        # connection leased by the current thread
+        self._local = threading.local()
+        # connections in use, by thread id
+        self._leases = {}
+        # cursors and object types cached per connection
+        self.registry = ConnectionRegistry()
         if verbose:
             logging.basicConfig(stream=sys.stderr, level=logging.DEBUG, format=FORMAT)
         else:
@@ -34,34 +130,96 @@ class CWMS(CwmsLocMixin, CwmsTsMixin, CwmsLevelMixin):
         name=None,
         host=None,
         service_name=None,
-        port=1521,
+        port=None,
         user=None,
         password=None,
         dsn=None,
+        office=None,
+        pool=None,
+        pool_min=None,
+        pool_max=None,
+        pool_increment=None,
+        pool_timeout=None,
+        call_timeout=None,
+        stmtcachesize=None,
+        config_file=None,
+        broker=None,
+        standby=None,
+        driver=None,
     ):
         """Make connection to Oracle CWMS database. Oracle connections are
             expensive, so it is best to have a class connection for all methods.
-            There are 4 ways to create a connection to the database.  
-            Creating CWMSPY_USER, CWMSPY_PASSWORD, CWMSPY_HOST, CWMSPY_SERVICE_NAME 
-            environment variables is the most convenient for fast easy connection.  
-            You can also pass `user`, `password`, `host`, and `service_name` as arguments 
-            to the connect method.  You can establish a connection to a database and 
-            pass that connection when you instantiate.  Finally, you can use a dsn string 
+            There are 4 ways to create a connection to the database.
+            Creating CWMSPY_USER, CWMSPY_PASSWORD, CWMSPY_HOST, CWMSPY_SERVICE_NAME
+            environment variables is the most convenient for fast easy connection.
+            You can also pass `user`, `password`, `host`, and `service_name` as arguments
+            to the connect method.  You can establish a connection to a database and
+            pass that connection when you instantiate.  Finally, you can use a dsn string
             if you have a tnsnames.ora file.
 
+            Arguments left as None are taken from the profile `name`, see
+            `cwmspy.config`, then from the environment variables.
+
         Parameters
         ----------
+        name : str
+            Profile to connect with (the default is None, no profile).
         host : (str):
             Host to connect to.
         service_name : str
             SID alias.
         port : int
-            Oracle SQL*Net Listener port (the default is 1521).
+            Oracle SQL*Net Listener port (the default is None, `CWMSPY_PORT` or 1521).
         user : str
             DB username.
         password : str
             User password.
-
+        dsn : str
+            Data source name, used instead of `host`, `service_name` and
+            `port`.
+        office : str
+            Office used as the session default, e.g. for `p_office_id`
+            arguments left as None (the default is None, the user's default
+            office).
+        pool : bool
+            Create a session pool instead of a single connection
+            (the default is False).  Every method borrows a session from the
+            pool for the duration of the call, see `CWMS.acquire`.
+        pool_min : int
+            Number of sessions opened when the pool is created
+            (the default is 1).
+        pool_max : int
+            Maximum number of sessions in the pool (the default is 4).
+        pool_increment : int
+            Number of sessions opened when the pool needs to grow
+            (the default is 1).
+        pool_timeout : int
+            Seconds an idle pooled session is kept open (the default is
+            None, never closed).
+        call_timeout : int
+            Milliseconds a single database round trip may take before it is
+            abandoned (the default is None, no limit).
+        stmtcachesize : int
+            Number of statements cached per session (the default is None,
+            the driver default of 20).  Raise it when calling many different
+            procedures in a loop.
+        config_file : str
+            File holding the profile `name` (the default is None, see
+            `cwmspy.config.default_path`).
+        broker : bool or str
+            Forward calls to the `cwmspy.broker` listening on this socket,
+            or on the default socket if True, instead of logging on (the
+            default is None, True when `CWMSPY_BROKER` is set).  Falls back
+            to a direct connection when no broker answers.
+        standby : list
+            Read-only standby databases, as dsn strings or dictionaries of
+            `dsn`, `user` and `password` (the default is None, no standby).
+            A session pool of up to `pool_max` sessions is opened on each.
+            Methods that only read run on the first available standby and
+            fall back to the primary, see `CWMS.acquire`.
+        driver : str or Driver
+            Driver to connect with, see `cwmspy.drivers` (the default is
+            None, keep the driver given to `CWMS`).
 
         Returns
         -------
@@ -77,7 +235,7 @@ class CWMS(CwmsLocMixin, CwmsTsMixin, CwmsLevelMixin):
         cwms.connect()
         `True`
 
-        # passing connection  
+        # passing connection
         import CWMS
         import cx_Oracle
         ...
@@ -98,27 +256,79 @@ class CWMS(CwmsLocMixin, CwmsTsMixin, CwmsLevelMixin):
         cwms.connect(dsn='dns_string', user='user',password='password')
         `True`
 
+        # session pool
+        import CWMS
+        cwms = CWMS()
+        cwms.connect(pool=True, pool_min=2, pool_max=8)
+        `True`
+
+        # profile
+        import CWMS
+        cwms = CWMS()
+        cwms.connect(name='prod')
+        `True`
+
+        # through a running broker, see cwmspy.broker
+        import CWMS
+        cwms = CWMS()
+        cwms.connect(broker=True)
+        `True`
+
+        # python-oracledb thin mode, no Oracle Instant Client
+        import CWMS
+        cwms = CWMS()
+        cwms.connect(name='prod', driver='oracledb')
+        `True`
+
         ```
 
         """
-        if name:
-            with open(".env", "r") as stream:
-                try:
-                    config = yaml.safe_load(stream)
-                except yaml.YAMLError as e:
-                    LOGGER.error("Error loading config")
-                    raise (e)
+        if broker is None and os.getenv("CWMSPY_BROKER"):
+            broker = True
+        if broker:
+            client = BrokerClient(None if broker is True else broker)
+            if client.ping():
+                if self.is_open():
+                    self.close()
+                self.broker = client
+                self.host = f"broker {client.path}"
+                self._set_health(True)
+                LOGGER.info(f"Connected to {self.host}")
+                return True
+            LOGGER.warning(f"No broker at {client.path}, connecting directly")
 
-            config = [d for d in config if d["name"] == name][0]
-            del config["name"]
+        if name:
+            config = get_profile(name, config_file)
+            dsn = dsn or config.get("dsn")
         else:
             config = None
 
+        def option(value, key, default=None):
+            if value is not None:
+                return value
+            if config and config.get(key) is not None:
+                return config[key]
+            return default
+
+        driver = option(driver, "driver")
+        if driver is not None:
+            self.driver = get_driver(driver)
+        office = option(office, "office")
+        pool = option(pool, "pool", False)
+        pool_min = option(pool_min, "pool_min", 1)
+        pool_max = option(pool_max, "pool_max", 4)
+        pool_increment = option(pool_increment, "pool_increment", 1)
+        pool_timeout = option(pool_timeout, "pool_timeout", 0)
+        call_timeout = option(call_timeout, "call_timeout")
+        standby = option(standby, "standby", [])
+        stmtcachesize = option(stmtcachesize, "stmtcachesize")
+        port = option(port, "port", os.getenv("CWMSPY_PORT", 1521))
+
         if not dsn:
             dsn_dict = {}
             if host:
                 dsn_dict.update({"host": host})
-            elif config:
+            elif config and config.get("host"):
                 host = config["host"]
                 dsn_dict.update({"host": host})
             elif os.getenv("CWMSPY_HOST"):
@@ -131,7 +341,7 @@ class CWMS(CwmsLocMixin, CwmsTsMixin, CwmsLevelMixin):
             LOGGER.info(f"Host: {host}")
             if service_name:
                 dsn_dict.update({"service_name": service_name})
-            elif config:
+            elif config and config.get("service_name"):
                 service_name = config["service_name"]
                 dsn_dict.update({"service_name": service_name})
             elif os.getenv("CWMSPY_SERVICE_NAME"):
@@ -144,49 +354,409 @@ class CWMS(CwmsLocMixin, CwmsTsMixin, CwmsLevelMixin):
             LOGGER.info(f"service_name: {service_name}")
             if port:
                 dsn_dict.update({"port": port})
-            elif os.getenv("CWMSPY_PORT"):
-                dsn_dict.update({"port": os.getenv("CWMSPY_PORT")})
             else:
                 msg = "Missing port"
                 LOGGER.error(msg)
                 raise ValueError(msg)
             LOGGER.info(f"port: {port}")
             self.host = dsn_dict["host"]
-            dsn = cx_Oracle.makedsn(**dsn_dict)
+            dsn = self.driver.makedsn(**dsn_dict)
+        else:
+            self.host = dsn
 
         conn_dict = {"dsn": dsn}
 
         if user:
             conn_dict.update({"user": user})
-        elif config:
+        elif config and config.get("user"):
             conn_dict.update({"user": config["user"]})
         elif os.getenv("CWMSPY_USER"):
             conn_dict.update({"user": os.getenv("CWMSPY_USER")})
         if password:
             conn_dict.update({"password": password})
-        elif config:
+        elif config and config.get("password"):
             conn_dict.update({"password": config["password"]})
         elif os.getenv("CWMSPY_PASSWORD"):
             conn_dict.update({"password": os.getenv("CWMSPY_PASSWORD")})
 
         # close any current open connection to minimize # of connections to DB
-        if self.is_open:
+        if self.is_open():
             self.close()
+        self._conn_dict = conn_dict
+        self.office = office
+        self.call_timeout = call_timeout
 
         try:
-            self.conn = cx_Oracle.connect(**conn_dict)
-            msg = "Connected to {host}".format(**dsn_dict)
-            LOGGER.info(msg)
-            return True
+            if pool:
+                self.pool = self.driver.create_pool(
+                    min=pool_min,
+                    max=pool_max,
+                    increment=pool_increment,
+                    session_callback=partial(init_session, office=office),
+                    **conn_dict,
+                )
+                self.pool.timeout = pool_timeout
+                if stmtcachesize is not None:
+                    self.pool.stmtcachesize = stmtcachesize
+                LOGGER.info(
+                    f"Created session pool ({pool_min}-{pool_max}) on {self.host}"
+                )
+            else:
+                self.conn = self.driver.connect(**conn_dict)
+                if stmtcachesize is not None:
+                    self.conn.stmtcachesize = stmtcachesize
+                init_session(self.conn, office=office)
+                LOGGER.info(f"Connected to {self.host}")
+            self._set_health(True)
         except Exception as e:
-            msg = "Failed to connect to {host}".format(**dsn_dict)
+            msg = f"Failed to connect to {self.host}"
             LOGGER.error(msg)
             LOGGER.error(e)
             return False
 
+        self._close_standby()
+        for target in standby:
+            args = dict(conn_dict)
+            if isinstance(target, dict):
+                args.update(target)
+            else:
+                args["dsn"] = target
+            self._standby_args.append(args)
+            try:
+                self.standby.append(
+                    self.driver.create_pool(
+                        min=1,
+                        max=pool_max,
+                        increment=pool_increment,
+                        session_callback=partial(init_session, office=office),
+                        **args,
+                    )
+                )
+                LOGGER.info(f"Created standby session pool on {args['dsn']}")
+            except Exception as e:
+                # reads go to the primary until the standby is back
+                LOGGER.warning(f"Failed to connect to standby {args['dsn']}: {e}")
+        return True
+
+    @contextmanager
+    def acquire(self, readonly=None):
+        """Borrow a connection for the duration of a `with` block.
+
+        When connected with `pool=True` a session is acquired from the
+        session pool and released back to it when the block exits, otherwise
+        `self.conn` is leased under a lock so only one thread uses it at a
+        time.  All `CWMS` methods go through `acquire`, so one `CWMS` object
+        can be shared by many threads.  Nested calls on the same thread
+        reuse the connection already leased by that thread.
+
+        Read-only leases are taken from the first available standby.  A
+        standby that can not hand out a session, or loses one, is skipped
+        for `health_ttl` seconds and reads go to the primary meanwhile.
+
+        Parameters
+        ----------
+        readonly : bool
+            The block only reads (the default is None, True inside methods
+            that only read, see `CWMS.primary` to opt out).
+
+        Yields
+        ------
+        Connection
+            The borrowed connection.
+
+        Examples
+        -------
+        ```python
+        >>> with cwms.acquire() as conn:
+        >>>     cur = conn.cursor()
+        >>>     cur.execute("select sysdate from dual")
+        ```
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+
+        if readonly is None:
+            readonly = getattr(self._local, "readonly", False)
+        remaining = self._remaining()
+        standby = None
+        if readonly:
+            standby, conn = self._acquire_standby()
+        if standby is not None:
+            pool = self.standby[standby]
+        else:
+            pool = self.pool
+            if pool is None:
+                timeout = -1 if remaining is None else remaining
+                if not self._lock.acquire(timeout=timeout):
+                    raise ValueError("Deadline exceeded waiting for the connection")
+                conn = self.conn
+            else:
+                conn = pool.acquire()
+        call_timeout = self._call_timeout(remaining)
+        if call_timeout is not None:
+            conn.callTimeout = call_timeout
+        self._local.conn = conn
+        thread_id = threading.get_ident()
+        self._leases[thread_id] = conn
+        dropped = False
+        try:
+            yield conn
+        except Exception as e:
+            lost = is_disconnect(e)
+            # any other error still came back over a working connection
+            if standby is None:
+                self._set_health(not lost)
+            elif lost:
+                self._standby_failed(standby, e)
+            if lost:
+                self.registry.discard(conn)
+            if lost and pool is not None:
+                # do not hand a dead session to the next caller
+                try:
+                    pool.drop(conn)
+                    dropped = True
+                except Exception as drop_error:
+                    LOGGER.error(drop_error)
+            raise
+        else:
+            if standby is None:
+                self._set_health(True)
+        finally:
+            self._local.conn = None
+            self._leases.pop(thread_id, None)
+            if remaining is not None and not dropped:
+                # the deadline only applies to this lease
+                conn.callTimeout = self.call_timeout or 0
+            if pool is None:
+                self._lock.release()
+            elif not dropped:
+                # the next acquire returns a new connection object
+                self.registry.discard(conn)
+                pool.release(conn)
+
+    def _acquire_standby(self):
+        """A session from the first available standby, (None, None) if none."""
+        if getattr(self._local, "primary", False):
+            return None, None
+        now = time.monotonic()
+        for i, pool in enumerate(self.standby):
+            if self._standby_down.get(i, 0) > now:
+                continue
+            try:
+                return i, pool.acquire()
+            except Exception as e:
+                self._standby_failed(i, e)
+        return None, None
+
+    def _standby_failed(self, index, error):
+        LOGGER.warning(f"Standby {index} unavailable, reading from primary: {error}")
+        self._standby_down[index] = time.monotonic() + self.health_ttl
+        # the caller's retry should not reconnect the primary
+        self._local.standby_failed = True
+
+    @contextmanager
+    def primary(self):
+        """Run the reads made in a `with` block on the primary database.
+
+        Use it when a read must see writes that may not have reached the
+        standby yet.
+
+        Examples
+        -------
+        ```python
+        >>> with cwms.primary():
+        >>>     df = cwms.retrieve_ts("Some.Fully.Qualified.Ts.Id", "2019/1/1", "2019/9/1")
+        ```
+        """
+        outer = getattr(self._local, "primary", False)
+        self._local.primary = True
+        try:
+            yield
+        finally:
+            self._local.primary = outer
+
+    @contextmanager
+    def deadline(self, seconds):
+        """Bound the time taken by all calls made in a `with` block.
+
+        Each database round trip gets the time left as its `callTimeout`, so
+        a call running past the deadline is interrupted with DPI-1067
+        (DPY-4024 in python-oracledb thin mode), and calls started after it
+        raise ValueError.  Retries stop at the deadline too.  Deadlines only
+        apply to the current thread, nested deadlines can shorten but not
+        extend the outer one.
+
+        Parameters
+        ----------
+        seconds : float
+            Time allowed from now (None for no deadline).
+
+        Examples
+        -------
+        ```python
+        >>> with cwms.deadline(30):
+        >>>     df = cwms.retrieve_ts("Some.Fully.Qualified.Ts.Id", "2019/1/1", "2019/9/1")
+        ```
+        """
+        outer = getattr(self._local, "deadline", None)
+        if seconds is None:
+            yield
+            return
+        deadline = time.monotonic() + seconds
+        if outer is not None:
+            deadline = min(deadline, outer)
+        self._local.deadline = deadline
+        try:
+            yield
+        finally:
+            self._local.deadline = outer
+
+    def _remaining(self):
+        """Seconds left before the current thread's deadline, None if unset."""
+        deadline = getattr(self._local, "deadline", None)
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise ValueError("Deadline exceeded")
+        return remaining
+
+    def _call_timeout(self, remaining):
+        """The `callTimeout` in ms for a call with `remaining` seconds left."""
+        if remaining is None:
+            return self.call_timeout
+        timeout = max(1, int(remaining * 1000))
+        if self.call_timeout:
+            timeout = min(timeout, self.call_timeout)
+        return timeout
+
+    def cancel(self, thread_id=None):
+        """Cancel database calls running on other threads.
+
+        The interrupted call raises ORA-01013 in its own thread.
+
+        Parameters
+        ----------
+        thread_id : int
+            Only cancel the call made by this thread, as returned by
+            `threading.get_ident` (the default is None, cancel all calls).
+
+        Returns
+        -------
+        int
+            The number of calls cancelled.
+
+        """
+        cancelled = 0
+        for ident, conn in list(self._leases.items()):
+            if thread_id is not None and ident != thread_id:
+                continue
+            try:
+                conn.cancel()
+                cancelled += 1
+            except Exception as e:
+                LOGGER.error(f"Error cancelling call on thread {ident}")
+                LOGGER.error(e)
+        return cancelled
+
+    @LD
+    def reconnect(self):
+        """Replace a lost connection using the arguments of the last connect.
+
+        Session pools replace dropped sessions on their own, so this only
+        applies to single connections.
+
+        Returns
+        -------
+        bool
+            True for success.
+
+        """
+        if self.pool is not None:
+            return True
+        if self._conn_dict is None:
+            raise ValueError("Cannot reconnect a connection passed to CWMS")
+        with self._lock:
+            self.registry.discard(self.conn)
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = self.driver.connect(**self._conn_dict)
+            init_session(self.conn, office=self.office)
+            self._generation += 1
+            self._set_health(True)
+        LOGGER.info(f"Reconnected to {self.host}")
+        return True
+
+    def _execute(self, function, *args, **kwargs):
+        """Call `function`, reconnecting and retrying on recoverable errors.
+
+        Only the failed call is retried, so a batch that loops over calls
+        picks up where it stopped.  Calls made while the thread already holds
+        a connection from `CWMS.acquire` are not retried here, the
+        outermost call is.  Methods marked with `read_call` lease read-only
+        connections.
+
+        """
+        if self.broker is not None:
+            # args[0] is self, the broker calls its own CWMS
+            return self.broker.call(
+                function.__name__, args[1:], kwargs, timeout=self._remaining()
+            )
+        if getattr(self._local, "conn", None) is not None:
+            return function(*args, **kwargs)
+
+        outer = getattr(self._local, "readonly", False)
+        self._local.readonly = getattr(function, "readonly", False)
+        try:
+            return self._retry(function, *args, **kwargs)
+        finally:
+            self._local.readonly = outer
+
+    def _retry(self, function, *args, **kwargs):
+        attempt = 0
+        while True:
+            generation = self._generation
+            self._local.standby_failed = False
+            try:
+                return function(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.retries or not is_recoverable(e):
+                    raise
+                if is_disconnect(e) and not getattr(function, "idempotent", True):
+                    # the call may have committed before the connection went
+                    raise
+                if self._local.standby_failed:
+                    # the primary is fine, read from it right away
+                    attempt += 1
+                    continue
+                delay = min(self.retry_backoff * 2**attempt, self.retry_max_backoff)
+                deadline = getattr(self._local, "deadline", None)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+                attempt += 1
+                name = function.__name__
+                LOGGER.warning(
+                    f"{name} failed, retrying in {delay}s "
+                    f"({attempt}/{self.retries}): {e}"
+                )
+                time.sleep(delay)
+                try:
+                    with self._lock:
+                        # another thread may have reconnected already
+                        if generation == self._generation:
+                            self.reconnect()
+                except Exception as reconnect_error:
+                    LOGGER.warning(f"Reconnect failed: {reconnect_error}")
+                    if not is_recoverable(reconnect_error):
+                        raise e
+
     @LD
     def close(self):
-        """Close self.conn
+        """Close self.conn, or the session pool if connected with `pool=True`.
 
         Args:
             self
@@ -196,6 +766,28 @@ class CWMS(CwmsLocMixin, CwmsTsMixin, CwmsLevelMixin):
 
         """
         host = self.host
+        self.stop_keepalive()
+        self.registry.clear()
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+            self._process_pool = None
+        self._close_standby()
+        if self.broker is not None:
+            self.broker.close()
+            self.broker = None
+            self._set_health(False)
+            LOGGER.info(f"Disconnected from {host}.")
+            return True
+        if self.pool is not None:
+            try:
+                self.pool.close()
+                LOGGER.info(f"Closed session pool on {host}.")
+            except Exception as e:
+                LOGGER.error(f"Error closing session pool on {host}")
+                LOGGER.error(e)
+            self.pool = None
+            self._set_health(False)
+            return True
         if self.is_closed():
             LOGGER.info(f"Already disconnectd from {host}.")
             return True
@@ -207,21 +799,172 @@ class CWMS(CwmsLocMixin, CwmsTsMixin, CwmsLevelMixin):
         except Exception as e:
             LOGGER.error(f"Error disconnecting from {host}")
             LOGGER.error(e)
+        self._set_health(False)
         return True
 
+    def _close_standby(self):
+        for standby in self.standby:
+            try:
+                standby.close()
+            except Exception as e:
+                LOGGER.error("Error closing standby session pool")
+                LOGGER.error(e)
+        self.standby = []
+        self._standby_args = []
+        self._standby_down = {}
+
+    def _worker_connect_kwargs(self):
+        """`CWMS.connect` arguments giving a worker process its own connection."""
+        if self.broker is not None:
+            return {"broker": self.broker.path}
+        if self._conn_dict is None:
+            raise ValueError("Connect with CWMS.connect before starting workers")
+        kwargs = dict(self._conn_dict)
+        kwargs.update(
+            {
+                "office": self.office,
+                "call_timeout": self.call_timeout,
+                "broker": False,
+                "standby": self._standby_args,
+                "driver": self.driver.name,
+            }
+        )
+        return kwargs
+
+    def process_pool(self, processes=None, **kwargs):
+        """Worker processes running methods on connections of their own.
+
+        The pool is kept until `CWMS.close` and reused by later calls asking
+        for the same number of processes, see `cwmspy.parallel.ProcessPool`.
+
+        Parameters
+        ----------
+        processes : int
+            Number of worker processes (the default is None, one per CPU).
+        kwargs
+            Passed to `cwmspy.parallel.ProcessPool`.
+
+        Returns
+        -------
+        cwmspy.parallel.ProcessPool
+            The pool.
+
+        Examples
+        -------
+        ```python
+        >>> pp = cwms.process_pool(8)
+        >>> dfs = pp.retrieve_multi_ts(ts_ids, "2019/1/1", "2019/9/1")
+        ```
+        """
+        from .parallel import ProcessPool
+
+        pp = self._process_pool
+        if pp is not None and pp.closed:
+            pp = None
+        if pp is not None and (processes is None or pp.processes == processes):
+            return pp
+        if pp is not None:
+            pp.shutdown()
+        self._process_pool = ProcessPool(self, processes=processes, **kwargs)
+        return self._process_pool
+
+    def _set_health(self, healthy):
+        self._healthy = healthy
+        self._checked = time.monotonic()
+
     @LD
-    def is_open(self):
+    def ping(self):
+        """Check the connection with a round trip to the database.
+
+        Returns
+        -------
+        bool
+            True if the database answered, False otherwise.
+
+        """
+        if self.broker is not None:
+            healthy = self.broker.ping()
+            self._set_health(healthy)
+            return healthy
+        if self.conn is None and self.pool is None:
+            return False
         try:
-            return self.conn.ping() is None
-        except:
+            with self.acquire() as conn:
+                conn.ping()
+        except Exception as e:
+            LOGGER.info(f"Ping to {self.host} failed: {e}")
+            self._set_health(False)
             return False
+        return True
 
     @LD
-    def is_closed(self):
-        try:
-            return self.conn.ping() is not None
-        except:
-            return True
+    def is_open(self, ttl=None):
+        """Whether the connection is usable.
+
+        The outcome of the last call or ping is trusted for `ttl` seconds,
+        so checking before every call does not cost a round trip.  Only an
+        expired or unknown state is confirmed with `CWMS.ping`.
+
+        Parameters
+        ----------
+        ttl : float
+            Seconds the cached state is trusted (the default is
+            `self.health_ttl`).  Use 0 to always ping.
+
+        Returns
+        -------
+        bool
+            True if the connection is usable, False otherwise.
+
+        """
+        if self.conn is None and self.pool is None and self.broker is None:
+            return False
+        if ttl is None:
+            ttl = self.health_ttl
+        age = time.monotonic() - self._checked
+        if self._healthy is not None and age < ttl:
+            return self._healthy
+        return self.ping()
+
+    @LD
+    def is_closed(self, ttl=None):
+        return not self.is_open(ttl=ttl)
+
+    def start_keepalive(self, interval=300):
+        """Ping the database in the background while the connection is idle.
+
+        A ping is only sent when no call has vouched for the connection in
+        the last `interval` seconds, keeping idle sessions from being
+        dropped by firewalls and keeping `CWMS.is_open` current.
+
+        Parameters
+        ----------
+        interval : float
+            Seconds between checks (the default is 300).
+
+        """
+        self.stop_keepalive()
+        stop = threading.Event()
+
+        def keepalive():
+            while not stop.wait(interval):
+                if time.monotonic() - self._checked >= interval:
+                    self.ping()
+
+        thread = threading.Thread(target=keepalive, name="cwmspy-keepalive")
+        thread.daemon = True
+        self._keepalive = (thread, stop)
+        thread.start()
+
+    def stop_keepalive(self):
+        """Stop the thread started by `CWMS.start_keepalive`."""
+        if self._keepalive is None:
+            return
+        thread, stop = self._keepalive
+        self._keepalive = None
+        stop.set()
+        if thread is not threading.current_thread():
+            thread.join()
 
     @staticmethod
     def add_env(filename):
@@ -7,13 +7,12 @@ from datetime import timedelta
 import json
 from json import JSONDecodeError
 
-import cx_Oracle
-import inspect
-import pandas as pd
 import logging
 import sys
 
-from .utils import log_decorator
+from .utils import log_decorator, read_call, LazyModule
+
+pd = LazyModule("pandas")
 
 
 LOGGER = logging.getLogger(__name__)
@@ -22,6 +21,7 @@ LD = log_decorator(LOGGER)
 
 class CwmsLevelMixin:
     @LD
+    @read_call
     def retrieve_location_level_values(
         self,
         p_location_level_id,
@@ -87,37 +87,36 @@ class CwmsLevelMixin:
         p_start_time = pd.to_datetime(p_start_time).to_pydatetime().strftime("%Y-%m-%d")
         p_end_time = pd.to_datetime(p_end_time).to_pydatetime().strftime("%Y-%m-%d")
 
-        try:
-            cur = self.conn.cursor()
-
-            bind_vars = {
-                "p_location_level_id": p_location_level_id,
-                "p_level_units": p_level_units,
-                "p_start_time": p_start_time,
-                "p_end_time": p_end_time,
-                "p_timezone_id": p_timezone_id,
-                "p_office_id": p_office_id,
-            }
-
-            LOGGER.info("Start retrieve_location_level_values.")
-            cur.execute(
-                """
-                select * from table( cwms_level.retrieve_location_level_values(
-                p_location_level_id =>:p_location_level_id,
-                p_level_units       =>:p_level_units,
-                p_start_time        =>to_date( :p_start_time, 'yyyy-mm-dd' ),
-                p_end_time          =>to_date( :p_end_time, 'yyyy-mm-dd' ),
-                p_timezone_id       =>:p_timezone_id,
-                p_office_id         =>:p_office_id ) )""",
-                bind_vars,
-            )
-            records = cur.fetchall()
-            cur.close()
-        except Exception as e:
-            LOGGER.error("Error in retrieve_location_level_values.")
-            cur.close()
-            # print bind_vars
-            raise ValueError(e.__str__())
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            try:
+
+                bind_vars = {
+                    "p_location_level_id": p_location_level_id,
+                    "p_level_units": p_level_units,
+                    "p_start_time": p_start_time,
+                    "p_end_time": p_end_time,
+                    "p_timezone_id": p_timezone_id,
+                    "p_office_id": p_office_id,
+                }
+
+                LOGGER.info("Start retrieve_location_level_values.")
+                cur.execute(
+                    """
+                    select * from table( cwms_level.retrieve_location_level_values(
+                    p_location_level_id =>:p_location_level_id,
+                    p_level_units       =>:p_level_units,
+                    p_start_time        =>to_date( :p_start_time, 'yyyy-mm-dd' ),
+                    p_end_time          =>to_date( :p_end_time, 'yyyy-mm-dd' ),
+                    p_timezone_id       =>:p_timezone_id,
+                    p_office_id         =>:p_office_id ) )""",
+                    bind_vars,
+                )
+                records = cur.fetchall()
+            except Exception as e:
+                LOGGER.error("Error in retrieve_location_level_values.")
+                # print bind_vars
+                raise ValueError(e.__str__())
         result = []
         # The following code deals with the hacky location level API call that HEC
         # Implemented. The quality flag is an interpolation flag, meaning 0 is not
@@ -140,6 +139,7 @@ class CwmsLevelMixin:
         return result
 
     @LD
+    @read_call
     def retrieve_location_levels(
         self,
         p_names=None,
@@ -157,14 +157,6 @@ class CwmsLevelMixin:
         if p_units:
             p_units = "|".join(p_units)
 
-        cur = self.conn.cursor()
-
-        p_results = cur.var(cx_Oracle.CLOB)
-        p_date_time = cur.var(cx_Oracle.DATETIME)
-        p_query_time = cur.var(int)
-        p_format_time = cur.var(int)
-        p_count = cur.var(int)
-
         if p_start:
             p_start = pd.to_datetime(p_start).strftime("%Y-%m-%d")
         if p_end:
@@ -173,34 +165,43 @@ class CwmsLevelMixin:
                 "%Y-%m-%d"
             )
 
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+
+            p_results = cur.var(self.driver.CLOB)
+            p_date_time = cur.var(self.driver.DATETIME)
+            p_query_time = cur.var(int)
+            p_format_time = cur.var(int)
+            p_count = cur.var(int)
+
+            try:
+
+                clob = cur.callproc(
+                    "cwms_level.retrieve_location_levels",
+                    [
+                        p_results,
+                        p_date_time,
+                        p_query_time,
+                        p_format_time,
+                        p_count,
+                        p_names,
+                        p_format,
+                        p_units,
+                        p_datums,
+                        p_start,
+                        p_end,
+                        p_timezone,
+                        p_office_id,
+                    ],
+                )
+                # the LOB locator is only valid while the session is held
+                clob = clob[0].read()
+
+            except Exception as e:
+                LOGGER.error("Error in retrieving time series")
+                raise ValueError(e)
         try:
-
-            clob = cur.callproc(
-                "cwms_level.retrieve_location_levels",
-                [
-                    p_results,
-                    p_date_time,
-                    p_query_time,
-                    p_format_time,
-                    p_count,
-                    p_names,
-                    p_format,
-                    p_units,
-                    p_datums,
-                    p_start,
-                    p_end,
-                    p_timezone,
-                    p_office_id,
-                ],
-            )
-
-        except Exception as e:
-            LOGGER.error("Error in retrieving time series")
-            cur.close()
-            raise ValueError(e)
-        cur.close()
-        try:
-            result = json.loads(clob[0].read())
+            result = json.loads(clob)
             if as_json:
                 return result
         except JSONDecodeError as e:
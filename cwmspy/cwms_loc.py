@@ -3,9 +3,9 @@
 Facilities for working with locations in the CWMS database
 """
 import logging
-from .utils import log_decorator
-import cx_Oracle
-import pandas as pd
+from .utils import log_decorator, db_call, read_call, LazyModule
+
+pd = LazyModule("pandas")
 
 LOGGER = logging.getLogger(__name__)
 LD = log_decorator(LOGGER)
@@ -13,6 +13,7 @@ LD = log_decorator(LOGGER)
 
 class CwmsLocMixin:
     @LD
+    @db_call(idempotent=False)
     def store_location(
         self,
         p_location_id,
@@ -94,39 +95,39 @@ class CwmsLocMixin:
         ```
 
         """
-        cur = self.conn.cursor()
         LOGGER.info("Start store_location.")
-        try:
-            cur.callproc(
-                "cwms_loc.store_location",
-                [
-                    p_location_id,
-                    p_location_type,
-                    p_elevation,
-                    p_elev_unit_id,
-                    p_vertical_datum,
-                    p_latitude,
-                    p_longitude,
-                    p_horizontal_datum,
-                    p_public_name,
-                    p_long_name,
-                    p_description,
-                    p_time_zone_id,
-                    p_country_name,
-                    p_state_initial,
-                    p_active,
-                    p_ignorenulls,
-                    p_db_office_id,
-                ],
-            )
-        except Exception as e:
-            LOGGER.error("Error in store location.")
-            cur.close()
-            raise ValueError(e)
-        cur.close()
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            try:
+                cur.callproc(
+                    "cwms_loc.store_location",
+                    [
+                        p_location_id,
+                        p_location_type,
+                        p_elevation,
+                        p_elev_unit_id,
+                        p_vertical_datum,
+                        p_latitude,
+                        p_longitude,
+                        p_horizontal_datum,
+                        p_public_name,
+                        p_long_name,
+                        p_description,
+                        p_time_zone_id,
+                        p_country_name,
+                        p_state_initial,
+                        p_active,
+                        p_ignorenulls,
+                        p_db_office_id,
+                    ],
+                )
+            except Exception as e:
+                LOGGER.error("Error in store location.")
+                raise ValueError(e)
         return True
 
     @LD
+    @db_call(idempotent=False)
     def delete_location(
         self, p_location_id, p_delete_action="DELETE LOC", p_db_office_id=None
     ):
@@ -183,20 +184,20 @@ class CwmsLocMixin:
 
         """
         LOGGER.info("Start delete_location")
-        cur = self.conn.cursor()
-        try:
-            cur.callproc(
-                "cwms_loc.delete_location",
-                [p_location_id, p_delete_action, p_db_office_id],
-            )
-        except Exception as e:
-            LOGGER.error(e)
-            cur.close()
-        cur.close()
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            try:
+                cur.callproc(
+                    "cwms_loc.delete_location",
+                    [p_location_id, p_delete_action, p_db_office_id],
+                )
+            except Exception as e:
+                LOGGER.error(e)
         LOGGER.info("End delete_location")
         return True
 
     @LD
+    @read_call
     def retrieve_location(
         self, p_location_id, p_elev_unit_id="m", p_db_office_id=None, return_df=True
     ):
@@ -231,57 +232,59 @@ class CwmsLocMixin:
 
         LOGGER.info("Start retrieve_location")
 
-        cur = self.conn.cursor()
-        # The below are out parameters.  You need to pass in out parameters to the
-        # procedure if they are listed of the correct type.
-        p_location_type = cur.var(cx_Oracle.STRING)
-        p_elevation = cur.var(cx_Oracle.NUMBER)
-        p_vertical_datum = cur.var(cx_Oracle.STRING)
-        p_latitude = cur.var(cx_Oracle.NUMBER)
-        p_longitude = cur.var(cx_Oracle.NUMBER)
-        p_horizontal_datum = cur.var(cx_Oracle.STRING)
-        p_public_name = cur.var(cx_Oracle.STRING)
-        p_long_name = cur.var(cx_Oracle.STRING)
-        p_description = cur.var(cx_Oracle.STRING)
-        p_time_zone_id = cur.var(cx_Oracle.STRING)
-        p_county_name = cur.var(cx_Oracle.STRING)
-        p_state_initial = cur.var(cx_Oracle.STRING)
-        p_active = cur.var(cx_Oracle.STRING)
-        p_alias_cursor = cur.var(cx_Oracle.CURSOR)
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            # The below are out parameters.  You need to pass in out parameters to the
+            # procedure if they are listed of the correct type.
+            p_location_type = cur.var(self.driver.STRING)
+            p_elevation = cur.var(self.driver.NUMBER)
+            p_vertical_datum = cur.var(self.driver.STRING)
+            p_latitude = cur.var(self.driver.NUMBER)
+            p_longitude = cur.var(self.driver.NUMBER)
+            p_horizontal_datum = cur.var(self.driver.STRING)
+            p_public_name = cur.var(self.driver.STRING)
+            p_long_name = cur.var(self.driver.STRING)
+            p_description = cur.var(self.driver.STRING)
+            p_time_zone_id = cur.var(self.driver.STRING)
+            p_county_name = cur.var(self.driver.STRING)
+            p_state_initial = cur.var(self.driver.STRING)
+            p_active = cur.var(self.driver.STRING)
+            p_alias_cursor = cur.var(self.driver.CURSOR)
 
-        # These are all of the out parameters that will be returned
-        out_list = [
-            p_location_id,
-            p_location_type,
-            p_elevation,
-            p_vertical_datum,
-            p_latitude,
-            p_longitude,
-            p_horizontal_datum,
-            p_public_name,
-            p_long_name,
-            p_description,
-            p_time_zone_id,
-            p_county_name,
-            p_state_initial,
-            p_active,
-            p_alias_cursor,
-        ]
+            # These are all of the out parameters that will be returned
+            out_list = [
+                p_location_id,
+                p_location_type,
+                p_elevation,
+                p_vertical_datum,
+                p_latitude,
+                p_longitude,
+                p_horizontal_datum,
+                p_public_name,
+                p_long_name,
+                p_description,
+                p_time_zone_id,
+                p_county_name,
+                p_state_initial,
+                p_active,
+                p_alias_cursor,
+            ]
 
-        try:
-            in_list = out_list.copy()
-            in_list.insert(1, p_elev_unit_id)
-            in_list += [p_db_office_id]
-            cur.callproc(
-                "cwms_loc.retrieve_location", in_list,
-            )
-        except ValueError as e:
-            LOGGER.error("Error in retrieve_location.")
-            cur.close()
-            raise ValueError(e)
-        cur.close()
+            try:
+                in_list = out_list.copy()
+                in_list.insert(1, p_elev_unit_id)
+                in_list += [p_db_office_id]
+                cur.callproc(
+                    "cwms_loc.retrieve_location",
+                    in_list,
+                )
+            except ValueError as e:
+                LOGGER.error("Error in retrieve_location.")
+                raise ValueError(e)
+            alias_cursor = p_alias_cursor.getvalue()
+            alias = [r for r in alias_cursor]
+            alias_cursor.close()
         LOGGER.info("End retrieve_location")
-        alias = [r for r in p_alias_cursor.getvalue()]
 
         out_dict = [
             {
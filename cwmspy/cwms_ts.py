@@ -2,29 +2,223 @@
 """
 Facilities for working with time series
 """
-import cx_Oracle
+
 import datetime
-import pandas as pd
-from dateutil import tz
-import pytz
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from itertools import combinations
-import numpy as np
 import json
 from json import JSONDecodeError
 
-from .utils import log_decorator
+from .fetch import fetch_arrays, fetch_size, tune_cursor
+from .intervals import expected_rows, interval_seconds, regular_seconds, ts_interval
+from . import results
+from .catalog import COLUMNS
+from .timegrid import computed, time_grids
+from .timezones import to_utc, utc_to_local
+from .utils import log_decorator, db_call, read_call, LazyModule
+
+pd = LazyModule("pandas")
+np = LazyModule("numpy")
+pytz = LazyModule("pytz")
+
+# cwms_ts.retrieve_ts as a query, for drivers fetching straight into Arrow
+RETRIEVE_TS_SQL = """
+select date_time, value, quality_code
+  from table(cwms_ts.retrieve_ts_out_tab(
+         p_cwms_ts_id => :p_cwms_ts_id,
+         p_units => :p_units,
+         p_start_time => :p_start_time,
+         p_end_time => :p_end_time,
+         p_time_zone => :p_time_zone,
+         p_trim => :p_trim,
+         p_start_inclusive => :p_start_inclusive,
+         p_end_inclusive => :p_end_inclusive,
+         p_previous => :p_previous,
+         p_next => :p_next,
+         p_version_date => :p_version_date,
+         p_max_version => :p_max_version,
+         p_office_id => :p_office_id))
+"""
+
+# values of many series stored since their high-water marks, one clause each
+CHANGES_SQL = """
+select v.cwms_ts_id, v.date_time, v.value, v.quality_code, v.data_entry_date
+  from cwms_v_tsv_dqu v
+ where v.office_id = nvl(:p_office_id, cwms_util.user_office_id)
+   and v.version_date = :p_version_date
+   and ({clauses})
+ order by v.cwms_ts_id, v.date_time
+"""
+CHANGES_CLAUSE = """(v.ts_code = :ts_code{i}
+        and v.unit_id = :units{i}
+        and v.date_time >= :since{i}
+        and (v.data_entry_date > :entered{i}
+             or v.data_entry_date is null and v.date_time > :date_time{i}))"""
+
+# value time bound of the changes of a series without a look-back window
+EARLIEST = datetime.datetime(1, 1, 1)
+
+# cwms_ts.retrieve_ts in UTC with only the times of the first two and last
+# two rows, for regular series whose other times follow from the interval;
+# the first and last may be the values before and after the window, off it
+VALUES_ONLY_SQL = """
+select case when rownum <= 2 or rownum >= count(*) over () - 1 then date_time end,
+       value, quality_code
+  from table(cwms_ts.retrieve_ts_out_tab(
+         p_cwms_ts_id => :p_cwms_ts_id,
+         p_units => :p_units,
+         p_start_time => :p_start_time,
+         p_end_time => :p_end_time,
+         p_time_zone => 'UTC',
+         p_trim => :p_trim,
+         p_start_inclusive => :p_start_inclusive,
+         p_end_inclusive => :p_end_inclusive,
+         p_previous => :p_previous,
+         p_next => :p_next,
+         p_version_date => :p_version_date,
+         p_max_version => :p_max_version,
+         p_office_id => :p_office_id))
+"""
+# metadata of many time series ids, see cwmspy.catalog
+CATALOG_SQL = """
+select db_office_id, cwms_ts_id, ts_code, interval_id, interval_utc_offset,
+       unit_id, ts_active_flag, time_zone_id
+  from cwms_v_ts_id
+ where db_office_id = nvl(:p_office_id, cwms_util.user_office_id)
+   and upper(cwms_ts_id) in ({ids})
+"""
+# ids per catalog query, Oracle's limit on an in list
+CATALOG_BATCH = 1000
 
 
 LOGGER = logging.getLogger(__name__)
 LD = log_decorator(LOGGER)
 
 
+def _window(start_time, end_time):
+    """`retrieve_ts` window of two dates, to 24:00 of `end_time`."""
+    p_start_time = pd.to_datetime(start_time).to_pydatetime()
+    # add one day to make it inclusive to 24:00
+    p_end_time = (pd.to_datetime(end_time) + datetime.timedelta(days=1)).to_pydatetime()
+    return p_start_time, p_end_time
+
+
+def _json_arrays(data, p_timezone):
+    """Times, values, quality codes and units of a series in the
+    `cwms_ts.retrieve_time_series` JSON format."""
+    riv = data.get("regular-interval-values")
+    if riv:
+        units = riv["unit"].split(" ")[0]
+        times = [
+            pd.date_range(s["first-time"], s["last-time"], s["value-count"])
+            for s in riv["segments"]
+        ]
+        times = times[0].append(times[1:]) if times else pd.DatetimeIndex([])
+        rows = [v for s in riv["segments"] for v in s["values"]]
+    else:
+        iiv = data["irregular-interval-values"]
+        units = iiv["unit"].split(" ")[0]
+        times = pd.to_datetime([v[0] for v in iiv["values"]])
+        rows = [v[1:] for v in iiv["values"]]
+    if times.tz is not None:
+        times = times.tz_convert(p_timezone).tz_localize(None)
+    values = np.array([r[0] for r in rows], dtype="float64")
+    qualities = np.array([r[1] or 0 for r in rows], dtype="int64")
+    return times.to_numpy("datetime64[ns]"), values, qualities, units
+
+
+def _concat(first, second, return_df):
+    if return_df:
+        return pd.concat([first, second], ignore_index=True)
+    return first + second
+
+
+def _inside(times, start, end, start_inclusive="T", end_inclusive="T"):
+    """Mask of the times inside a window, its bounds included or not as
+    `cwms_ts.retrieve_ts` includes them."""
+    times = np.asarray(times, dtype="datetime64[ns]")
+    start, end = np.datetime64(start, "ns"), np.datetime64(end, "ns")
+    after = times >= start if start_inclusive == "T" else times > start
+    before = times <= end if end_inclusive == "T" else times < end
+    return after & before
+
+
+def _trim(times, values, start, end, start_inclusive="T", end_inclusive="T"):
+    """Mask of the rows `p_trim` keeps: missing values at the start and end
+    of the window are dropped, the previous and next values are kept."""
+    inside = _inside(times, start, end, start_inclusive, end_inclusive)
+    found = np.flatnonzero(inside & ~np.isnan(values))
+    keep = ~inside
+    if len(found):
+        keep[found[0] : found[-1] + 1] = True
+    return keep
+
+
+def _parts(
+    p_start_time,
+    p_end_time,
+    parts,
+    p_start_inclusive="T",
+    p_end_inclusive="T",
+    p_previous="T",
+    p_next="F",
+):
+    """`retrieve_ts_window` arguments of `parts` sub-windows of a window.
+
+    Sub-windows meet without overlap, so no boundary row comes back twice,
+    only the first gets the previous value and only the last the next
+    one.  They are not trimmed, see `_stitch`.
+    """
+    step = (p_end_time - p_start_time) / parts
+    bounds = [p_start_time + step * i for i in range(parts)] + [p_end_time]
+    last = parts - 1
+    return [
+        dict(
+            p_start_time=bounds[i],
+            p_end_time=bounds[i + 1],
+            p_trim="F",
+            p_start_inclusive=p_start_inclusive if i == 0 else "T",
+            p_end_inclusive=p_end_inclusive if i == last else "F",
+            p_previous=p_previous if i == 0 else "F",
+            p_next=p_next if i == last else "F",
+        )
+        for i in range(parts)
+    ]
+
+
+def _stitch(
+    blocks,
+    p_start_time,
+    p_end_time,
+    p_trim="F",
+    p_start_inclusive="T",
+    p_end_inclusive="T",
+):
+    """Times, values and quality codes of the `_parts` of a window, each
+    retrieved as a "dict", trimmed as one window."""
+    times, values, qualities = (
+        np.concatenate([b[key] for b in blocks])
+        for key in ("date_time", "value", "quality_code")
+    )
+    if p_trim == "T":
+        keep = _trim(
+            times, values, p_start_time, p_end_time, p_start_inclusive, p_end_inclusive
+        )
+        times, values, qualities = times[keep], values[keep], qualities[keep]
+    return times, values, qualities
+
+
 class CwmsTsMixin:
     @LD
+    @read_call
     def get_ts_code(self, p_cwms_ts_id, p_db_office_code=None):
         """Get the CWMS TS Code of a given pathname.
 
+        The code is read from `CWMS.catalog` when there is one and no
+        office code is given, see `CWMS.get_ts_metadata`.
+
         Parameters
         ----------
         p_cwms_ts_id : str
@@ -51,25 +245,104 @@ class CwmsTsMixin:
 
         ```
         """
+        if self.catalog is not None and p_db_office_code is None:
+            meta = self._ts_metadata([p_cwms_ts_id])[p_cwms_ts_id]
+            if meta is None:
+                LOGGER.error("Error retrieving ts_code")
+                raise ValueError(
+                    f'TS_ID_NOT_FOUND: The timeseries identifier "{p_cwms_ts_id}" '
+                    "was not found"
+                )
+            LOGGER.info(f"get_ts_code returned {meta['ts_code']}")
+            return str(meta["ts_code"])
 
-        cur = self.conn.cursor()
-        try:
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            try:
 
-            ts_code = cur.callfunc(
-                "cwms_ts.get_ts_code",
-                cx_Oracle.STRING,
-                [p_cwms_ts_id, p_db_office_code],
-            )
-        except Exception as e:
-            LOGGER.error("Error retrieving ts_code")
-            cur.close()
-            raise ValueError(e.__str__())
-        LOGGER.info(f"get_ts_code returned {ts_code}")
-        cur.close()
+                ts_code = cur.callfunc(
+                    "cwms_ts.get_ts_code",
+                    self.driver.STRING,
+                    [p_cwms_ts_id, p_db_office_code],
+                )
+            except Exception as e:
+                LOGGER.error("Error retrieving ts_code")
+                raise ValueError(e.__str__())
+            LOGGER.info(f"get_ts_code returned {ts_code}")
 
         return ts_code
 
     @LD
+    @read_call
+    def get_ts_metadata(self, p_cwms_ts_id_list, p_office_id=None, refresh=False):
+        """Get the metadata of many time series ids with one query.
+
+        Ids are looked up in `CWMS.catalog` first, the rest in
+        `cwms_v_ts_id`, `CATALOG_BATCH` ids per query.  What is found, and
+        which ids do not exist, is kept in the catalog.
+
+        Parameters
+        ----------
+        p_cwms_ts_id_list : list
+            Time series identifiers, in any case.
+        p_office_id : str
+            The office that owns the time series (the default is None, the
+            session user's office).
+        refresh : bool
+            Query every id, even those cached.
+
+        Returns
+        -------
+        dict
+            By id, a dictionary of office_id, cwms_ts_id, ts_code,
+            interval_id, interval_utc_offset, unit_id, active_flag and
+            time_zone_id, or None when the id does not exist.
+
+        Examples
+        -------
+        ```python
+        >>> meta = cwms.get_ts_metadata(["Some.Fully.Qualified.Ts.Id"])
+        >>> meta["Some.Fully.Qualified.Ts.Id"]["interval_id"]
+            '1Hour'
+        ```
+        """
+        return self._ts_metadata(p_cwms_ts_id_list, p_office_id, refresh)
+
+    def _ts_metadata(self, p_cwms_ts_id_list, p_office_id=None, refresh=False):
+        ts_ids = list(p_cwms_ts_id_list)
+        found = {}
+        if self.catalog is not None and not refresh:
+            found = self.catalog.lookup(p_office_id, ts_ids)
+        missing = list(dict.fromkeys(t for t in ts_ids if t not in found))
+        for first in range(0, len(missing), CATALOG_BATCH):
+            batch = missing[first : first + CATALOG_BATCH]
+            rows = self._ts_catalog(batch, p_office_id)
+            by_id = {row[1].upper(): dict(zip(COLUMNS, row)) for row in rows}
+            for ts_id in batch:
+                found[ts_id] = by_id.get(ts_id.upper())
+                if self.catalog is not None:
+                    self.catalog.put(p_office_id, ts_id, found[ts_id])
+        LOGGER.info(f"Looked up {len(missing)} of {len(ts_ids)} ts ids.")
+        return {ts_id: found[ts_id] for ts_id in ts_ids}
+
+    def _ts_catalog(self, p_cwms_ts_id_list, p_office_id):
+        """Rows of `CATALOG_SQL` for up to `CATALOG_BATCH` ids."""
+        parameters = {"p_office_id": p_office_id}
+        for i, ts_id in enumerate(p_cwms_ts_id_list):
+            parameters[f"id{i}"] = ts_id.upper()
+        ids = ", ".join(f":id{i}" for i in range(len(p_cwms_ts_id_list)))
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            cur.arraysize = fetch_size(len(p_cwms_ts_id_list))
+            try:
+                cur.execute(CATALOG_SQL.format(ids=ids), parameters)
+                return cur.fetchall()
+            except Exception as e:
+                LOGGER.error("Error retrieving time series metadata.")
+                raise ValueError(e.__str__())
+
+    @LD
+    @read_call
     def get_ts_max_date(
         self,
         p_cwms_ts_id,
@@ -109,24 +382,24 @@ class CwmsTsMixin:
         ```
         """
         p_version_date = datetime.datetime.strptime(version_date, "%Y/%m/%d")
-        cur = self.conn.cursor()
-        try:
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            try:
 
-            max_date = cur.callfunc(
-                "cwms_ts.get_ts_max_date",
-                cx_Oracle.DATETIME,
-                [p_cwms_ts_id, p_time_zone, p_version_date, p_office_id],
-            )
-        except Exception as e:
-            cur.close()
-            LOGGER.error("Error retrieving get_ts_max_date")
-            raise ValueError(e.__str__())
-        LOGGER.info(f"max_date returned {max_date}")
-        cur.close()
+                max_date = cur.callfunc(
+                    "cwms_ts.get_ts_max_date",
+                    self.driver.DATETIME,
+                    [p_cwms_ts_id, p_time_zone, p_version_date, p_office_id],
+                )
+            except Exception as e:
+                LOGGER.error("Error retrieving get_ts_max_date")
+                raise ValueError(e.__str__())
+            LOGGER.info(f"max_date returned {max_date}")
 
         return max_date
 
     @LD
+    @read_call
     def get_ts_min_date(
         self,
         p_cwms_ts_id,
@@ -170,49 +443,164 @@ class CwmsTsMixin:
         """
 
         p_version_date = datetime.datetime.strptime(version_date, "%Y/%m/%d")
-        cur = self.conn.cursor()
-        try:
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            try:
 
-            min_date = cur.callfunc(
-                "cwms_ts.get_ts_min_date",
-                cx_Oracle.DATETIME,
-                [p_cwms_ts_id, p_time_zone, p_version_date, p_office_id],
-            )
-        except Exception as e:
-            LOGGER.error("Error in retrieving get_ts_min_date")
-            cur.close()
-            raise ValueError(e.__str__())
-        LOGGER.info(f"get_ts_min_date returned {min_date}")
-        cur.close()
+                min_date = cur.callfunc(
+                    "cwms_ts.get_ts_min_date",
+                    self.driver.DATETIME,
+                    [p_cwms_ts_id, p_time_zone, p_version_date, p_office_id],
+                )
+            except Exception as e:
+                LOGGER.error("Error in retrieving get_ts_min_date")
+                raise ValueError(e.__str__())
+            LOGGER.info(f"get_ts_min_date returned {min_date}")
 
         return min_date
 
     @LD
+    @read_call
     def get_times_for_time_window(
-        self, start_time, end_time, p_ts_id, p_time_zone, p_office_id=None
+        self, start_time, end_time, p_ts_id, p_time_zone, p_office_id=None, local=False
     ):
+        """Times a regular time series has in a time window.
+
+        Parameters
+        ----------
+        start_time, end_time : str or datetime
+            The time window, both ends included.
+        p_ts_id : str
+            The time series identifier.
+        p_time_zone : str
+            The time zone of the window and the times returned.
+        p_office_id : str
+            The office that owns the time series.
+        local : bool
+            Compute the times with `cwmspy.timegrid` from the series'
+            metadata, see `CWMS.get_ts_metadata`, instead of calling
+            `cwms_ts.get_times_for_time_window`, but for intervals of 2 to
+            6 days (the default is False).
 
+        Returns
+        -------
+        DATE_TABLE_TYPE or numpy.ndarray
+            The database's collection of dates, or `datetime64[ns]` times
+            when `local`.
+
+        Examples
+        -------
+        ```python
+        >>> cwms.get_times_for_time_window("2019/1/1", "2019/1/2",
+                                           "Some.Fully.Qualified.Ts.Id", "UTC")
+        >>> cwms.get_times_for_time_window("2019/1/1", "2019/1/2",
+                                           "Some.Fully.Qualified.Ts.Id", "UTC",
+                                           local=True)
+        ```
+        """
         p_start_time = pd.to_datetime(start_time).to_pydatetime()
         p_end_time = pd.to_datetime(end_time).to_pydatetime()
+        if local:
+            return self._time_grids(
+                [p_ts_id], p_start_time, p_end_time, p_time_zone, p_office_id
+            )[p_ts_id]
+        return self._times_for_time_window(
+            p_start_time, p_end_time, p_ts_id, p_time_zone, p_office_id
+        )
+
+    def _times_for_time_window(
+        self, p_start_time, p_end_time, p_ts_id, p_time_zone, p_office_id
+    ):
         # FUNCTION DATE TIME EXAMPLE
-        cur = self.conn.cursor()
-        date_table_type = self.conn.gettype("CWMS_20.DATE_TABLE_TYPE")
-        try:
-            date_table_time = cur.callfunc(
-                "cwms_ts.get_times_for_time_window",
-                date_table_type,
-                [p_start_time, p_end_time, p_ts_id, p_time_zone, p_office_id],
-            )
-            cur.close()
-            return date_table_time
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            date_table_type = self.registry.gettype(conn, "CWMS_20.DATE_TABLE_TYPE")
+            try:
+                date_table_time = cur.callfunc(
+                    "cwms_ts.get_times_for_time_window",
+                    date_table_type,
+                    [p_start_time, p_end_time, p_ts_id, p_time_zone, p_office_id],
+                )
+                return date_table_time
 
-        except Exception as e:
-            LOGGER.error(f"Error retrieving ts_code {e}")
-            cur.close()
-            raise ValueError(e.__str__())
+            except Exception as e:
+                LOGGER.error(f"Error retrieving ts_code {e}")
+                raise ValueError(e.__str__())
         return 0
 
     @LD
+    @read_call
+    def get_time_grids(
+        self,
+        p_cwms_ts_id_list,
+        start_time,
+        end_time,
+        p_time_zone="UTC",
+        p_office_id=None,
+    ):
+        """Times many regular time series have in a time window.
+
+        The series' intervals, offsets and time zones are looked up with
+        one query, see `CWMS.get_ts_metadata`, and each distinct grid of
+        times is computed once, see `cwmspy.timegrid`.  The times of
+        series with intervals of 2 to 6 days come from
+        `cwms_ts.get_times_for_time_window`, one call each.
+
+        Parameters
+        ----------
+        p_cwms_ts_id_list : list
+            List of time series identifiers.
+        start_time, end_time : str or datetime
+            The time window, both ends included.
+        p_time_zone : str
+            The time zone of the window and the times returned.
+        p_office_id : str
+            The office that owns the time series.
+
+        Returns
+        -------
+        dict
+            `datetime64[ns]` times by time series id.
+
+        Examples
+        -------
+        ```python
+        >>> grids = cwms.get_time_grids(p_cwms_ts_id_list, "2019/1/1", "2019/2/1")
+        >>> missing = {ts_id: len(times) for ts_id, times in grids.items()}
+        ```
+        """
+        p_start_time = pd.to_datetime(start_time).to_pydatetime()
+        p_end_time = pd.to_datetime(end_time).to_pydatetime()
+        return self._time_grids(
+            p_cwms_ts_id_list, p_start_time, p_end_time, p_time_zone, p_office_id
+        )
+
+    def _time_grids(self, ts_ids, start_time, end_time, p_time_zone, p_office_id):
+        meta = self._ts_metadata(ts_ids, p_office_id)
+        for ts_id, m in meta.items():
+            if m is None:
+                LOGGER.error("Error retrieving time series metadata.")
+                raise ValueError(
+                    f'TS_ID_NOT_FOUND: The timeseries identifier "{ts_id}" '
+                    "was not found"
+                )
+        # times the database counts from an origin not checked locally
+        server = [t for t in ts_ids if not computed(meta[t]["interval_id"])]
+        grids = time_grids(
+            {t: m for t, m in meta.items() if t not in server},
+            start_time,
+            end_time,
+            p_time_zone,
+        )
+        for ts_id in server:
+            times = self._times_for_time_window(
+                start_time, end_time, ts_id, p_time_zone, p_office_id
+            )
+            grids[ts_id] = np.array(times.aslist(), dtype="datetime64[ns]")
+        return {ts_id: grids[ts_id] for ts_id in ts_ids}
+
+    @LD
+    @read_call
     def retrieve_time_series(
         self,
         ts_ids,
@@ -223,15 +611,16 @@ class CwmsTsMixin:
         p_timezone="UTC",
         p_office_id=None,
         as_json=False,
+        return_type=None,
     ):
-        """Retreives time series in a number of formats for a combination 
-        time window, timezone, formats, and vertical datums 
+        """Retreives time series in a number of formats for a combination
+        time window, timezone, formats, and vertical datums
 
         Parameters
         ----------
         ts_ids : list
             The names (time series identifers) of the time series to retrieve.
-            Can use sql wildcard for single time series identifier, 
+            Can use sql wildcard for single time series identifier,
             example: ts_ids =["Some.*.fully.?.path"]
         units : list
 
@@ -244,9 +633,9 @@ class CwmsTsMixin:
             - <span>actual unit of parameter</span>
             -- (e.g. "ft", "cfs")
 
-            If the P_Units variable has fewer positions than the p_name 
-            variable, the last unit position is used for all remaning names. 
-            If the units are unspecified or NULL, the NATIVE units will be 
+            If the P_Units variable has fewer positions than the p_name
+            variable, the last unit position is used for all remaning names.
+            If the units are unspecified or NULL, the NATIVE units will be
             used for all time series.
 
         p_datums : str
@@ -257,27 +646,32 @@ class CwmsTsMixin:
             - <span style="color:#bf2419">`"NAVD88"`</span>
 
         p_start : str
-            The start of the time window to retrieve time series for. 
-            No time series values earlier this time will be retrieved. 
-            If unspecified or NULL, a value of 24 hours prior to the specified 
-            or default end of the time window will be used. for the start of 
+            The start of the time window to retrieve time series for.
+            No time series values earlier this time will be retrieved.
+            If unspecified or NULL, a value of 24 hours prior to the specified
+            or default end of the time window will be used. for the start of
             the time window.
 
         p_end : str
-            The end of the time window to retrieve time series for. 
-            No time series values later this time will be retrieved. 
-            If unspecified or NULL, the current time will be used for the end 
+            The end of the time window to retrieve time series for.
+            No time series values later this time will be retrieved.
+            If unspecified or NULL, the current time will be used for the end
             of the time window.
 
         p_timezone : type
-            The time zone to retrieve the time series in. 
-            The P_Start and P_End parameters - if used - are also interpreted 
-            according to this time zone. If unspecified or NULL, the UTC time 
+            The time zone to retrieve the time series in.
+            The P_Start and P_End parameters - if used - are also interpreted
+            according to this time zone. If unspecified or NULL, the UTC time
             zone is used.
         p_office_id : type
-            The office to retrieve time series for. 
-            If unspecified or NULL, time series for all offices in the database 
+            The office to retrieve time series for.
+            If unspecified or NULL, time series for all offices in the database
             that match the other criteria will be retrieved.
+        return_type : str
+            "df", "list", "numpy", "dict" or "arrow", see `cwmspy.results`
+            (the default is None, "df").  Other than "df", series come back
+            as a list, or dictionary by ts id, of one result per series, or
+            as one Arrow table.
 
         Returns
         -------
@@ -294,7 +688,7 @@ class CwmsTsMixin:
         >>> now = datetme.datetime.utcnow()
         >>> start = (now - datetime.timedelta(10)).strftime('%Y-%m-%d')
         >>> end = now.strftime('%Y-%m-%d')
-        >>> cwms.retrieve_time_series(ts_ids=['Some.Fully.Qualified.Cwms.Ts.ID', 
+        >>> cwms.retrieve_time_series(ts_ids=['Some.Fully.Qualified.Cwms.Ts.ID',
                                        'Another.Fully.Qualified.Cwms.Ts.ID'],
                                        p_start=start,
                                        p_end = end)
@@ -306,15 +700,6 @@ class CwmsTsMixin:
         p_names = "|".join(ts_ids)
         p_units = "|".join(units)
 
-        cur = self.conn.cursor()
-
-        p_results = cur.var(cx_Oracle.CLOB)
-        p_date_time = cur.var(cx_Oracle.DATETIME)
-        p_query_time = cur.var(int)
-        p_format_time = cur.var(int)
-        p_ts_count = cur.var(int)
-        p_value_count = cur.var(int)
-
         p_format = "JSON"
         if p_start:
             p_start = pd.to_datetime(p_start).strftime("%Y-%m-%d")
@@ -324,46 +709,79 @@ class CwmsTsMixin:
                 "%Y-%m-%d"
             )
 
-        try:
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
 
-            clob = cur.callproc(
-                "cwms_ts.retrieve_time_series",
-                [
-                    p_results,
-                    p_date_time,
-                    p_query_time,
-                    p_format_time,
-                    p_ts_count,
-                    p_value_count,
-                    p_names,
-                    p_format,
-                    p_units,
-                    p_datums,
-                    p_start,
-                    p_end,
-                    p_timezone,
-                    p_office_id,
-                ],
-            )
+            p_results = cur.var(self.driver.CLOB)
+            p_date_time = cur.var(self.driver.DATETIME)
+            p_query_time = cur.var(int)
+            p_format_time = cur.var(int)
+            p_ts_count = cur.var(int)
+            p_value_count = cur.var(int)
+
+            try:
 
-        except Exception as e:
-            LOGGER.error("Error in retrieving time series")
-            cur.close()
-            raise ValueError(e.__str__())
-        cur.close()
+                clob = cur.callproc(
+                    "cwms_ts.retrieve_time_series",
+                    [
+                        p_results,
+                        p_date_time,
+                        p_query_time,
+                        p_format_time,
+                        p_ts_count,
+                        p_value_count,
+                        p_names,
+                        p_format,
+                        p_units,
+                        p_datums,
+                        p_start,
+                        p_end,
+                        p_timezone,
+                        p_office_id,
+                    ],
+                )
+                # the LOB locator is only valid while the session is held
+                clob = clob[0].read()
+
+            except Exception as e:
+                LOGGER.error("Error in retrieving time series")
+                raise ValueError(e.__str__())
+        return_type = results.resolve(return_type)
+        empty = (
+            pd.DataFrame
+            if return_type == "df"
+            else (lambda: results.combine(return_type, [], []))
+        )
         try:
-            result = json.loads(clob[0].read())
+            result = json.loads(clob)
             if as_json:
                 return result
         except JSONDecodeError as e:
             LOGGER.info("No data for the requested pathnames and dates.")
-            return pd.DataFrame()
+            return empty()
 
         try:
             ts = result["time-series"]["time-series"]
         except KeyError:
             LOGGER.warning("No data found")
-            return pd.DataFrame()
+            return empty()
+
+        if return_type != "df":
+            output = []
+            for data in ts:
+                times, values, qualities, units = _json_arrays(data, p_timezone)
+                output.append(
+                    results.series(
+                        return_type,
+                        times,
+                        values,
+                        qualities,
+                        data["name"],
+                        p_timezone,
+                        units,
+                    )
+                )
+            return results.combine(return_type, output, [d["name"] for d in ts])
 
         df_list = []
         for data in ts:
@@ -426,6 +844,9 @@ class CwmsTsMixin:
         p_max_version="T",
         p_office_id=None,
         return_df=True,
+        return_type=None,
+        parts=None,
+        values_only=False,
     ):
         """Retrieves time series data for a specified time series and
             time window.
@@ -466,11 +887,28 @@ class CwmsTsMixin:
         p_office_id : str
             The office that owns the time series.
         return_df : bool
-            Return result as pandas df.
+            Return result as pandas df.  Its columns are filled straight
+            from the fetched rows, or from Arrow data with drivers that
+            support it (see `cwmspy.drivers`), without first building a
+            list of all rows.
+        return_type : str
+            "df", "list", "numpy", "dict" or "arrow", see `cwmspy.results`
+            (the default is None, "df" or "list" from `return_df`).
+        parts : int
+            Split the window into this many sub-windows retrieved at once on
+            sessions of the pool (the default is None, one call).  Without a
+            session pool the sub-windows are retrieved one after another.
+        values_only : bool
+            For series of a regular interval, transfer only values and
+            quality codes and compute the times, see
+            `CWMS.retrieve_ts_window` (the default is False).
+
+        Reads are answered from `CWMS.cache` when one is set, except inside
+        `CWMS.primary`.
 
         Returns
         -------
-        list or pandas df
+        list, pandas df, numpy array, dict or pyarrow Table
             Time series data, date_time, value, quality_code.
 
 
@@ -493,64 +931,456 @@ class CwmsTsMixin:
             4 2019-01-04 08:00:00  560.673563             0
         ```
         """
-        p_start_time = pd.to_datetime(start_time).to_pydatetime()
-        # add one day to make it inclusive to 24:00
-        p_end_time = (
-            pd.to_datetime(end_time) + datetime.timedelta(days=1)
-        ).to_pydatetime()
+        p_start_time, p_end_time = _window(start_time, end_time)
+        kwargs = dict(
+            p_units=p_units,
+            p_timezone=p_timezone,
+            p_trim=p_trim,
+            p_start_inclusive=p_start_inclusive,
+            p_end_inclusive=p_end_inclusive,
+            p_previous=p_previous,
+            p_next=p_next,
+            version_date=version_date,
+            p_max_version=p_max_version,
+            p_office_id=p_office_id,
+            return_type=results.resolve(return_type, return_df),
+        )
+        if self.cache is not None and not getattr(self._local, "primary", False):
+            return self.cache.retrieve(
+                self, p_cwms_ts_id, p_start_time, p_end_time, **kwargs
+            )
+        kwargs["values_only"] = values_only
+        if parts and parts > 1:
+            return self._retrieve_ts_parts(
+                p_cwms_ts_id, p_start_time, p_end_time, parts, **kwargs
+            )
+        return self.retrieve_ts_window(p_cwms_ts_id, p_start_time, p_end_time, **kwargs)
 
-        if not version_date:
-            version_date = "1111/11/11"
-            p_version_date = datetime.datetime.strptime(version_date, "%Y/%m/%d")
+    def _retrieve_ts_parts(
+        self,
+        p_cwms_ts_id,
+        p_start_time,
+        p_end_time,
+        parts,
+        p_trim="F",
+        p_start_inclusive="T",
+        p_end_inclusive="T",
+        p_previous="T",
+        p_next="F",
+        return_type="df",
+        **kwargs,
+    ):
+        """`retrieve_ts_window` over `parts` sub-windows at once, stitched.
+
+        Sub-windows meet without overlap, so no boundary row comes back
+        twice, and trimming is applied to the stitched series.
+        """
+        windows = _parts(
+            p_start_time,
+            p_end_time,
+            parts,
+            p_start_inclusive,
+            p_end_inclusive,
+            p_previous,
+            p_next,
+        )
+        # the calling thread's deadline and primary flag apply to the parts
+        remaining = self._remaining()
+        primary = getattr(self._local, "primary", False)
+
+        def fetch(window):
+            with ExitStack() as stack:
+                stack.enter_context(self.deadline(remaining))
+                if primary:
+                    stack.enter_context(self.primary())
+                return self.retrieve_ts_window(
+                    p_cwms_ts_id, return_type="dict", **window, **kwargs
+                )
+
+        # a thread holding the only connection would block the others
+        if self.pool is not None and getattr(self._local, "conn", None) is None:
+            with ThreadPoolExecutor(max_workers=parts) as executor:
+                blocks = list(executor.map(fetch, windows))
         else:
-            p_version_date = pd.to_datetime(version_date).to_pydatetime()
+            blocks = [fetch(window) for window in windows]
 
-        cur = self.conn.cursor()
-        p_at_tsv_rc = self.conn.cursor().var(cx_Oracle.CURSOR)
-        try:
+        times, values, qualities = _stitch(
+            blocks,
+            p_start_time,
+            p_end_time,
+            p_trim,
+            p_start_inclusive,
+            p_end_inclusive,
+        )
+        LOGGER.info(f"Found {len(times)} records in {parts} parts.")
+        return results.series(
+            return_type,
+            times,
+            values,
+            qualities,
+            p_cwms_ts_id,
+            kwargs["p_timezone"],
+            kwargs["p_units"],
+        )
 
-            cur.callproc(
-                "cwms_ts.retrieve_ts",
-                [
-                    p_at_tsv_rc,
-                    p_cwms_ts_id,
-                    p_units,
-                    p_start_time,
-                    p_end_time,
-                    p_timezone,
-                    p_trim,
-                    p_start_inclusive,
-                    p_end_inclusive,
-                    p_previous,
-                    p_next,
-                    p_version_date,
-                    p_max_version,
-                    p_office_id,
-                ],
-            )
+    @LD
+    @read_call
+    def retrieve_ts_window(
+        self,
+        p_cwms_ts_id,
+        p_start_time,
+        p_end_time,
+        p_units=None,
+        p_timezone="UTC",
+        p_trim="F",
+        p_start_inclusive="T",
+        p_end_inclusive="T",
+        p_previous="T",
+        p_next="F",
+        version_date=None,
+        p_max_version="T",
+        p_office_id=None,
+        return_df=True,
+        return_type=None,
+        values_only=False,
+    ):
+        """`CWMS.retrieve_ts` for an exact time window.
+
+        Unlike `retrieve_ts`, `p_end_time` is not extended to the end of
+        its day, so adjacent windows can be retrieved without overlap.
+
+        With `values_only`, series whose interval is a fixed number of
+        minutes, hours, days or weeks are retrieved in UTC with only their
+        first and last times.  The other times are computed from the
+        interval and converted to `p_timezone` on the client.  When the
+        rows do not fill the interval's grid, e.g. a previous value from
+        long before the window, the series is retrieved again in full.
+
+        Parameters
+        ----------
+        p_cwms_ts_id : str
+            The time series identifier to retrieve data for.
+        p_start_time : datetime
+            The start of the time window, in `p_timezone`.
+        p_end_time : datetime
+            The end of the time window, in `p_timezone`.
+        values_only : bool
+            Transfer only values and quality codes of regular series.
+        kwargs
+            As for `CWMS.retrieve_ts`.
 
-        except Exception as e:
-            LOGGER.error("Error in retrieving time series.")
-            cur.close()
-            raise ValueError(e.__str__())
-        cur.close()
+        Returns
+        -------
+        list or pandas df
+            Time series data, date_time, value, quality_code.
 
-        output = [r for r in p_at_tsv_rc.getvalue()]
-        output_len = len(output)
-        LOGGER.info(f"Found {output_len} records.")
+        Examples
+        -------
+        ```python
+        >>> import datetime
+        >>> df = cwms.retrieve_ts_window('Some.Fully.Qualified.Ts.Id',
+                                         datetime.datetime(2019, 1, 1, 6),
+                                         datetime.datetime(2019, 1, 1, 18),
+                                         p_previous='F')
+        ```
+        """
+        # 1111/11/11 is the non-versioned date, too early for pandas
+        if not version_date or version_date == "1111/11/11":
+            version_date = "1111/11/11"
+            p_version_date = datetime.datetime.strptime(version_date, "%Y/%m/%d")
+        else:
+            p_version_date = pd.to_datetime(version_date).to_pydatetime()
 
-        if return_df:
-            output = pd.DataFrame(
-                output, columns=["date_time", "value", "quality_code"]
+        # the window plus the values before and after it
+        rows = expected_rows(p_cwms_ts_id, p_start_time, p_end_time)
+        if rows is not None:
+            rows += 2
+
+        return_type = results.resolve(return_type, return_df)
+        step = regular_seconds(p_cwms_ts_id) if values_only else None
+        if step is not None:
+            arrays = self._retrieve_values_only(
+                step,
+                rows,
+                {
+                    "p_cwms_ts_id": p_cwms_ts_id,
+                    "p_units": p_units,
+                    "p_start_time": to_utc(p_start_time, p_timezone),
+                    "p_end_time": to_utc(p_end_time, p_timezone),
+                    "p_trim": p_trim,
+                    "p_start_inclusive": p_start_inclusive,
+                    "p_end_inclusive": p_end_inclusive,
+                    "p_previous": p_previous,
+                    "p_next": p_next,
+                    "p_version_date": p_version_date,
+                    "p_max_version": p_max_version,
+                    "p_office_id": p_office_id,
+                },
             )
+            if arrays is not None:
+                times, values, qualities = arrays
+                if p_timezone.upper() != "UTC":
+                    times = utc_to_local(times, p_timezone)
+                LOGGER.info(f"Found {len(times)} records.")
+                return results.series(
+                    return_type,
+                    times,
+                    values,
+                    qualities,
+                    p_cwms_ts_id,
+                    p_timezone,
+                    p_units,
+                )
+            LOGGER.info(f"{p_cwms_ts_id} is not on its interval, fetching times.")
+
+        if return_type == "df" and self.driver.supports_arrow:
+            parameters = {
+                "p_cwms_ts_id": p_cwms_ts_id,
+                "p_units": p_units,
+                "p_start_time": p_start_time,
+                "p_end_time": p_end_time,
+                "p_time_zone": p_timezone,
+                "p_trim": p_trim,
+                "p_start_inclusive": p_start_inclusive,
+                "p_end_inclusive": p_end_inclusive,
+                "p_previous": p_previous,
+                "p_next": p_next,
+                "p_version_date": p_version_date,
+                "p_max_version": p_max_version,
+                "p_office_id": p_office_id,
+            }
+            with self.acquire() as conn:
+                try:
+                    output = self.driver.fetch_frame(
+                        conn, RETRIEVE_TS_SQL, parameters, fetch_size(rows)
+                    )
+                except Exception as e:
+                    LOGGER.error("Error in retrieving time series.")
+                    raise ValueError(e.__str__())
+            LOGGER.info(f"Found {len(output)} records.")
+            # the dtypes of `fetch_arrays`, whatever the driver's Arrow types
+            output["date_time"] = output["date_time"].astype("datetime64[ns]")
+            output["value"] = output["value"].astype("float64")
+            output["quality_code"] = output["quality_code"].fillna(0).astype("int64")
             output["time_zone"] = p_timezone
             output["ts_id"] = p_cwms_ts_id
             if p_units:
                 output["units"] = p_units
+            return output
+
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            p_at_tsv_rc = cur.var(self.driver.CURSOR)
+            try:
+
+                cur.callproc(
+                    "cwms_ts.retrieve_ts",
+                    [
+                        p_at_tsv_rc,
+                        p_cwms_ts_id,
+                        p_units,
+                        p_start_time,
+                        p_end_time,
+                        p_timezone,
+                        p_trim,
+                        p_start_inclusive,
+                        p_end_inclusive,
+                        p_previous,
+                        p_next,
+                        p_version_date,
+                        p_max_version,
+                        p_office_id,
+                    ],
+                )
 
-        return output
+            except Exception as e:
+                LOGGER.error("Error in retrieving time series.")
+                raise ValueError(e.__str__())
+
+            rc = p_at_tsv_rc.getvalue()
+            tune_cursor(rc, rows)
+            if return_type == "list":
+                output = [r for r in rc]
+            else:
+                times, values, qualities = fetch_arrays(rc, rows)
+            rc.close()
+
+        if return_type == "list":
+            LOGGER.info(f"Found {len(output)} records.")
+            return output
+        LOGGER.info(f"Found {len(times)} records.")
+        return results.series(
+            return_type, times, values, qualities, p_cwms_ts_id, p_timezone, p_units
+        )
+
+    def _retrieve_values_only(self, step, rows, parameters):
+        """Times, values and quality codes of a regular series from
+        `VALUES_ONLY_SQL`, None when the rows but the first and last are
+        not `step` seconds apart."""
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            tune_cursor(cur, rows)
+            try:
+                cur.execute(VALUES_ONLY_SQL, parameters)
+                times, values, qualities = fetch_arrays(cur, rows)
+            except Exception as e:
+                LOGGER.error("Error in retrieving time series.")
+                raise ValueError(e.__str__())
+        times = times.astype("datetime64[ns]")
+        if len(times) <= 4:
+            # every time was returned
+            return times, values, qualities
+        step = np.timedelta64(step, "s")
+        first, last = times[1], times[-2]
+        if (last - first) != step * (len(times) - 3):
+            return None
+        times[1:-1] = first + step * np.arange(len(times) - 2)
+        return times, values, qualities
 
     @LD
+    def retrieve_ts_iter(
+        self,
+        p_cwms_ts_id,
+        start_time,
+        end_time,
+        chunk=None,
+        chunk_rows=100000,
+        p_units=None,
+        p_timezone="UTC",
+        p_trim="F",
+        p_start_inclusive="T",
+        p_end_inclusive="T",
+        p_previous="T",
+        p_next="F",
+        version_date=None,
+        p_max_version="T",
+        p_office_id=None,
+        return_df=True,
+    ):
+        """`CWMS.retrieve_ts` one block at a time.
+
+        The window is split into consecutive chunks retrieved one after the
+        other as the generator is consumed, so only one chunk is held in
+        memory.  Chunks meet without overlap: `p_previous` only applies to
+        the first chunk, `p_next` to the last, and trimming applies to the
+        whole window rather than to each chunk.  Put together, the blocks
+        hold the same rows as one `retrieve_ts` call.
+
+        Parameters
+        ----------
+        p_cwms_ts_id : str
+            The time series identifier to retrieve data for.
+        start_time : str "%Y/%m/%d"
+            The start time of the time window.
+        end_time : str "%Y/%m/%d"
+            The end time of the time window.
+        chunk : str or timedelta
+            Time span of each chunk, e.g. "365D" (the default is None,
+            sized from `chunk_rows`).
+        chunk_rows : int
+            Rows per chunk of a regular series, used when `chunk` is None.
+            Irregular series then use chunks of one year.
+        kwargs
+            As for `CWMS.retrieve_ts`.
+
+        Yields
+        ------
+        list or pandas df
+            Time series data, date_time, value, quality_code, of one chunk.
+            Chunks without data are skipped.
+
+        Examples
+        -------
+        ```python
+        >>> total = 0
+        >>> for df in cwms.retrieve_ts_iter('Some.Fully.Qualified.Ts.Id',
+                                            '1980/1/1', '2019/12/31',
+                                            chunk='365D'):
+        >>>     total += df['value'].sum()
+        ```
+        """
+        p_start_time, p_end_time = _window(start_time, end_time)
+        if chunk is not None:
+            step = pd.Timedelta(chunk).to_pytimedelta()
+        else:
+            try:
+                seconds = interval_seconds(ts_interval(p_cwms_ts_id))
+            except ValueError:
+                # an id or interval not parsed here, sized like irregular
+                seconds = None
+            if seconds is None:
+                step = datetime.timedelta(days=365)
+            else:
+                step = datetime.timedelta(seconds=seconds * chunk_rows)
+        if step <= datetime.timedelta(0):
+            raise ValueError("chunk must be positive")
+
+        trim = p_trim == "T"
+        # leading missing values are dropped until the first value, trailing
+        # ones are held back until a later value shows they are not trailing
+        started = False
+        held = None
+        chunk_start = p_start_time
+        while True:
+            chunk_end = min(chunk_start + step, p_end_time)
+            last = chunk_end >= p_end_time
+            block = self.retrieve_ts_window(
+                p_cwms_ts_id,
+                chunk_start,
+                chunk_end,
+                p_units=p_units,
+                p_timezone=p_timezone,
+                p_trim="F",
+                p_start_inclusive=(
+                    "T" if chunk_start > p_start_time else p_start_inclusive
+                ),
+                p_end_inclusive=p_end_inclusive if last else "F",
+                p_previous=p_previous if chunk_start == p_start_time else "F",
+                p_next=p_next if last else "F",
+                version_date=version_date,
+                p_max_version=p_max_version,
+                p_office_id=p_office_id,
+                return_df=return_df,
+            )
+            if trim:
+                # values before and after the window are kept as they are
+                if return_df:
+                    times = block["date_time"].to_numpy()
+                    present = block["value"].notna().to_numpy()
+                else:
+                    times = [r[0] for r in block]
+                    present = np.array([r[1] is not None for r in block], bool)
+                inside = _inside(
+                    times, p_start_time, p_end_time, p_start_inclusive, p_end_inclusive
+                )
+                lo = int(np.argmax(inside)) if inside.any() else len(block)
+                hi = lo + int(inside.sum())
+                head, body, tail = block[:lo], block[lo:hi], block[hi:]
+                found = np.flatnonzero(present[lo:hi])
+                if not started and len(found):
+                    body = body[found[0] :]
+                    found = found - found[0]
+                    started = True
+                elif not started:
+                    body = body[:0]
+                else:
+                    body = _concat(held, body, return_df)
+                    found = found + len(held)
+                if started:
+                    # trailing missing values wait for the next chunk
+                    stop = found[-1] + 1 if len(found) else 0
+                    body, held = body[:stop], body[stop:]
+                block = _concat(_concat(head, body, return_df), tail, return_df)
+            if len(block):
+                if return_df:
+                    block = block.reset_index(drop=True)
+                yield block
+            if last:
+                break
+            chunk_start = chunk_end
+
+    @LD
+    @db_call
     def store_ts(
         self,
         p_cwms_ts_id,
@@ -621,10 +1451,6 @@ class CwmsTsMixin:
         ```
         """
 
-        cur = self.conn.cursor()
-        # values.insert(0, values[0])
-        p_values = cur.arrayvar(cx_Oracle.NATIVE_FLOAT, values)
-
         ts = pd.to_datetime(
             times, infer_datetime_format=True, format=format
         ).tz_localize(timezone)
@@ -645,30 +1471,36 @@ class CwmsTsMixin:
         else:
             p_qualities = qualities
 
-        try:
-            data_len = len(values)
-            LOGGER.info(f"Loading {data_len} values for {p_cwms_ts_id}")
-
-            test = cur.callproc(
-                "cwms_ts.store_ts",
-                [
-                    p_cwms_ts_id,
-                    p_units,
-                    p_times,
-                    p_values,
-                    p_qualities,
-                    p_store_rule,
-                    p_override_prot,
-                    p_version_date,
-                    p_office_id,
-                ],
-            )
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            # values.insert(0, values[0])
+            p_values = cur.arrayvar(self.driver.NATIVE_FLOAT, values)
+            try:
+                data_len = len(values)
+                LOGGER.info(f"Loading {data_len} values for {p_cwms_ts_id}")
+
+                test = cur.callproc(
+                    "cwms_ts.store_ts",
+                    [
+                        p_cwms_ts_id,
+                        p_units,
+                        p_times,
+                        p_values,
+                        p_qualities,
+                        p_store_rule,
+                        p_override_prot,
+                        p_version_date,
+                        p_office_id,
+                    ],
+                )
 
-        except Exception as e:
-            LOGGER.error("Error in store_ts.")
-            cur.close()
-            raise ValueError(e.__str__())
-        cur.close()
+            except Exception as e:
+                LOGGER.error("Error in store_ts.")
+                raise ValueError(e.__str__())
+        if self.cache is not None:
+            self.cache.invalidate(p_cwms_ts_id)
+        if self.catalog is not None:
+            self.catalog.invalidate(p_cwms_ts_id)
         return True
 
     @LD
@@ -681,6 +1513,7 @@ class CwmsTsMixin:
         version_date=None,
         p_office_id=None,
         only_add_different=True,
+        deadline=None,
     ):
         """Stores time series data to the database with pandas.core.dataframe as input.
 
@@ -702,6 +1535,9 @@ class CwmsTsMixin:
             session user's default office is used.
         only_add_different : boolean
             Check what is currently in database and only commit changes
+        deadline : float
+            Seconds allowed for the whole store, see `CWMS.deadline`
+            (the default is None, no limit).
 
         Returns
         -------
@@ -733,96 +1569,103 @@ class CwmsTsMixin:
         ```
 
         """
-        df = df.copy()
-        if "time_zone" not in df.columns and timezone:
-            df["time_zone"] = timezone
+        with self.deadline(deadline):
+            df = df.copy()
+            if "time_zone" not in df.columns and timezone:
+                df["time_zone"] = timezone
 
-        if "quality_code" in df.columns:
-            df["quality_code"] = [int(x) for x in df["quality_code"].values]
-        else:
-            df["quality_code"] = 0
+            if "quality_code" in df.columns:
+                df["quality_code"] = [int(x) for x in df["quality_code"].values]
+            else:
+                df["quality_code"] = 0
 
-        # I want to make sure everything is the right type for cx_Oracle
-        df["date_time"] = pd.to_datetime(df["date_time"])
-        df["date_time"] = df["date_time"].dt.tz_localize(None)
-        df["value"] = df["value"].astype(float)
+            # I want to make sure everything is the right type for cx_Oracle
+            df["date_time"] = pd.to_datetime(df["date_time"])
+            df["date_time"] = df["date_time"].dt.tz_localize(None)
+            df["value"] = df["value"].astype(float)
 
-        grouped = df.groupby(["ts_id", "units", "time_zone"])
-        for g, v in grouped:
-            p_cwms_ts_id, p_units, timezone = g
+            grouped = df.groupby(["ts_id", "units", "time_zone"])
+            for g, v in grouped:
+                # errors below are logged and skipped, but not a passed deadline
+                self._remaining()
+                p_cwms_ts_id, p_units, timezone = g
 
-            # Add a little overlap to get current data
-            min_date = (v["date_time"].min() - datetime.timedelta(days=1)).strftime(
-                "%Y/%m/%d"
-            )
-            max_date = (v["date_time"].max() + datetime.timedelta(days=1)).strftime(
-                "%Y/%m/%d"
-            )
-            if only_add_different:
-                # Only want to write new data to disk
-                # Get current data, merge it for comparison
-                # Will throw an error if time series identifier does not exist
-                new_data = v.copy()
-                try:
+                # Add a little overlap to get current data
+                min_date = (v["date_time"].min() - datetime.timedelta(days=1)).strftime(
+                    "%Y/%m/%d"
+                )
+                max_date = (v["date_time"].max() + datetime.timedelta(days=1)).strftime(
+                    "%Y/%m/%d"
+                )
+                if only_add_different:
+                    # Only want to write new data to disk
+                    # Get current data, merge it for comparison
+                    # Will throw an error if time series identifier does not exist
+                    new_data = v.copy()
+                    try:
+                        # a standby may not have the latest writes yet
+                        with self.primary():
+                            current_data = self.retrieve_ts(
+                                p_cwms_ts_id=p_cwms_ts_id,
+                                start_time=min_date,
+                                end_time=max_date,
+                                p_units=p_units,
+                                p_timezone=timezone,
+                                version_date=version_date,
+                            )
+                    except Exception as e:
+                        LOGGER.error(
+                            f"Error retrieveing {p_cwms_ts_id} for comparison."
+                        )
+                        current_data = pd.DataFrame()
+
+                    if not current_data.empty:
+                        try:
+                            merged = v.merge(
+                                current_data,
+                                on=["date_time", "value"],
+                                how="outer",
+                                suffixes=["", "_"],
+                                indicator=True,
+                            )
+                            # The data to store after comparing to current data
+                            new_data = merged[merged["_merge"] == "left_only"]
+                        except:
+                            LOGGER.error(
+                                f"Failed to merge {p_cwms_ts_id} with existing data."
+                            )
+                    if new_data.empty:
+                        LOGGER.info(f"No new data to load for {p_cwms_ts_id}")
+                        # Do not want to try and load empty data so continue
+                        continue
+                else:
+                    new_data = v.copy()
+
+                new_data_len = new_data.shape[0]
+                LOGGER.info(f"Loading {new_data_len} new values")
 
-                    current_data = self.retrieve_ts(
+                try:
+                    self.store_ts(
                         p_cwms_ts_id=p_cwms_ts_id,
-                        start_time=min_date,
-                        end_time=max_date,
                         p_units=p_units,
-                        p_timezone=timezone,
+                        timezone=timezone,
+                        times=list(new_data["date_time"]),
+                        values=list(new_data["value"].astype(float)),
+                        qualities=list(new_data["quality_code"]),
+                        format=None,
+                        p_store_rule=p_store_rule,
+                        p_override_prot=p_override_prot,
                         version_date=version_date,
+                        p_office_id=p_office_id,
                     )
                 except Exception as e:
-                    LOGGER.error(f"Error retrieveing {p_cwms_ts_id} for comparison.")
-                    current_data = pd.DataFrame()
-
-                if not current_data.empty:
-                    try:
-                        merged = v.merge(
-                            current_data,
-                            on=["date_time", "value"],
-                            how="outer",
-                            suffixes=["", "_"],
-                            indicator=True,
-                        )
-                        # The data to store after comparing to current data
-                        new_data = merged[merged["_merge"] == "left_only"]
-                    except:
-                        LOGGER.error(
-                            f"Failed to merge {p_cwms_ts_id} with existing data."
-                        )
-                if new_data.empty:
-                    LOGGER.info(f"No new data to load for {p_cwms_ts_id}")
-                    # Do not want to try and load empty data so continue
+                    LOGGER.error(f"Error in store_ts for {p_cwms_ts_id}")
+                    LOGGER.error(e)
                     continue
-            else:
-                new_data = v.copy()
-
-            new_data_len = new_data.shape[0]
-            LOGGER.info(f"Loading {new_data_len} new values")
-
-            try:
-                self.store_ts(
-                    p_cwms_ts_id=p_cwms_ts_id,
-                    p_units=p_units,
-                    timezone=timezone,
-                    times=list(new_data["date_time"]),
-                    values=list(new_data["value"].astype(float)),
-                    qualities=list(new_data["quality_code"]),
-                    format=None,
-                    p_store_rule=p_store_rule,
-                    p_override_prot=p_override_prot,
-                    version_date=version_date,
-                    p_office_id=p_office_id,
-                )
-            except Exception as e:
-                LOGGER.error(f"Error in store_ts for {p_cwms_ts_id}")
-                LOGGER.error(e)
-                continue
-        return True
+            return True
 
     @LD
+    @db_call(idempotent=False)
     def delete_ts(
         self, p_cwms_ts_id, p_delete_action="DELETE TS ID", p_db_office_id=None
     ):
@@ -852,20 +1695,24 @@ class CwmsTsMixin:
         ```
         """
 
-        cur = self.conn.cursor()
-        try:
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            try:
 
-            cur.callproc(
-                "cwms_ts.delete_ts", [p_cwms_ts_id, p_delete_action, p_db_office_id]
-            )
-        except Exception as e:
-            LOGGER.error("Error in delete_ts.")
-            cur.close()
-            raise ValueError(e.__str__())
-        cur.close()
+                cur.callproc(
+                    "cwms_ts.delete_ts", [p_cwms_ts_id, p_delete_action, p_db_office_id]
+                )
+            except Exception as e:
+                LOGGER.error("Error in delete_ts.")
+                raise ValueError(e.__str__())
+        if self.cache is not None:
+            self.cache.invalidate(p_cwms_ts_id)
+        if self.catalog is not None:
+            self.catalog.invalidate(p_cwms_ts_id)
         return True
 
     @LD
+    @db_call(idempotent=False)
     def rename_ts(
         self,
         p_cwms_ts_id_old,
@@ -913,21 +1760,24 @@ class CwmsTsMixin:
         ```
         """
 
-        cur = self.conn.cursor()
-        try:
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            try:
 
-            cur.callproc(
-                "cwms_ts.rename_ts",
-                [p_cwms_ts_id_old, p_cwms_ts_id_new, p_utc_offset_new, p_office_id],
-            )
-        except Exception as e:
-            LOGGER.error("Error in rename_ts")
-            cur.close()
-            raise ValueError(e.__str__())
-        cur.close()
+                cur.callproc(
+                    "cwms_ts.rename_ts",
+                    [p_cwms_ts_id_old, p_cwms_ts_id_new, p_utc_offset_new, p_office_id],
+                )
+            except Exception as e:
+                LOGGER.error("Error in rename_ts")
+                raise ValueError(e.__str__())
+        if self.catalog is not None:
+            self.catalog.invalidate(p_cwms_ts_id_old)
+            self.catalog.invalidate(p_cwms_ts_id_new)
         return True
 
     @LD
+    @db_call
     def delete_ts_values(
         self,
         p_cwms_ts_id,
@@ -1007,25 +1857,31 @@ class CwmsTsMixin:
             p_version_date,
             p_time_zone,
         ]
-        # If date times are not null modify argument list
-        if date_times:
-            date_table_type = self.conn.gettype("CWMS_20.DATE_TABLE_TYPE")
-            p_date_times = date_table_type.newobject()
-            for time_item in date_times:
-                formatted_time = pd.to_datetime(time_item).to_pydatetime()
-                p_date_times.append(formatted_time)
-            # Append other values to arg list
-            args_list += [p_date_times, p_max_version, p_ts_item_mask, p_db_office_id]
+        with self.acquire() as conn:
+            # If date times are not null modify argument list
+            if date_times:
+                date_table_type = self.registry.gettype(conn, "CWMS_20.DATE_TABLE_TYPE")
+                p_date_times = date_table_type.newobject()
+                for time_item in date_times:
+                    formatted_time = pd.to_datetime(time_item).to_pydatetime()
+                    p_date_times.append(formatted_time)
+                # Append other values to arg list
+                args_list += [
+                    p_date_times,
+                    p_max_version,
+                    p_ts_item_mask,
+                    p_db_office_id,
+                ]
 
-        try:
-            cur = self.conn.cursor()
-            print("Attempting to delete")
-            cur.callproc("cwms_ts.delete_ts", args_list)
-        except Exception as e:
-            LOGGER.error(f"Error in delete_ts.{e}")
-            cur.close()
-            raise ValueError(e.__str__())
-        cur.close()
+            cur = self.registry.cursor(conn)
+            try:
+                print("Attempting to delete")
+                cur.callproc("cwms_ts.delete_ts", args_list)
+            except Exception as e:
+                LOGGER.error(f"Error in delete_ts.{e}")
+                raise ValueError(e.__str__())
+        if self.cache is not None:
+            self.cache.invalidate(p_cwms_ts_id)
         return True
 
     @LD
@@ -1156,6 +2012,9 @@ class CwmsTsMixin:
         p_max_version="T",
         p_office_id=None,
         return_df=True,
+        deadline=None,
+        return_type=None,
+        parts=None,
     ):
         """Short summary.
 
@@ -1192,6 +2051,15 @@ class CwmsTsMixin:
             The office that owns the time series.
         return_df : bool
             Return result as pandas df.
+        deadline : float
+            Seconds allowed for the extents and data queries together, see
+            `CWMS.deadline` (the default is None, no limit).
+        return_type : str
+            "df", "list", "numpy", "dict" or "arrow", see `cwmspy.results`
+            (the default is None, "df" or "list" from `return_df`).
+        parts : int
+            Retrieve the period of record as this many sub-windows at once,
+            see `CWMS.retrieve_ts` (the default is None, one call).
         Returns
         -------
         pd.core.frame.DataFrame or list
@@ -1214,39 +2082,57 @@ class CwmsTsMixin:
         ```
 
         """
+        with self.deadline(deadline):
+            if self.cache is not None and not getattr(self._local, "primary", False):
+                # the cache holds the whole period of record
+                return self.cache.retrieve(
+                    self,
+                    p_cwms_ts_id,
+                    p_units=p_units,
+                    p_timezone=p_timezone,
+                    p_start_inclusive=p_start_inclusive,
+                    p_end_inclusive=p_end_inclusive,
+                    p_previous=p_previous,
+                    p_next=p_next,
+                    version_date=version_date,
+                    p_max_version=p_max_version,
+                    p_office_id=p_office_id,
+                    return_type=results.resolve(return_type, return_df),
+                )
+            mn, mx = self.get_extents(
+                p_cwms_ts_id=p_cwms_ts_id,
+                p_time_zone=p_timezone,
+                version_date=version_date,
+                p_office_id=p_office_id,
+            )
 
-        mn, mx = self.get_extents(
-            p_cwms_ts_id=p_cwms_ts_id,
-            p_time_zone=p_timezone,
-            version_date=version_date,
-            p_office_id=p_office_id,
-        )
-
-        # To get a little overlap
-        mn = mn - datetime.timedelta(days=1)
-        mx = mx + datetime.timedelta(days=1)
+            # To get a little overlap
+            mn = mn - datetime.timedelta(days=1)
+            mx = mx + datetime.timedelta(days=1)
 
-        start_time = mn.strftime("%Y/%m/%d")
-        end_time = mx.strftime("%Y/%m/%d")
+            start_time = mn.strftime("%Y/%m/%d")
+            end_time = mx.strftime("%Y/%m/%d")
 
-        por = self.retrieve_ts(
-            p_cwms_ts_id,
-            start_time,
-            end_time,
-            p_units=p_units,
-            p_timezone=p_timezone,
-            p_trim="F",
-            p_start_inclusive=p_start_inclusive,
-            p_end_inclusive=p_end_inclusive,
-            p_previous=p_previous,
-            p_next=p_next,
-            version_date=version_date,
-            p_max_version=p_max_version,
-            p_office_id=p_office_id,
-            return_df=return_df,
-        )
+            por = self.retrieve_ts(
+                p_cwms_ts_id,
+                start_time,
+                end_time,
+                p_units=p_units,
+                p_timezone=p_timezone,
+                p_trim="F",
+                p_start_inclusive=p_start_inclusive,
+                p_end_inclusive=p_end_inclusive,
+                p_previous=p_previous,
+                p_next=p_next,
+                version_date=version_date,
+                p_max_version=p_max_version,
+                p_office_id=p_office_id,
+                return_df=return_df,
+                return_type=return_type,
+                parts=parts,
+            )
 
-        return por
+            return por
 
     @LD
     def retrieve_multi_ts(
@@ -1267,6 +2153,9 @@ class CwmsTsMixin:
         local_tz=False,
         por=False,
         pivot=False,
+        processes=None,
+        deadline=None,
+        return_type=None,
     ):
         """
         Retrieves time series data for a list of specified time series
@@ -1306,16 +2195,32 @@ class CwmsTsMixin:
             The office that owns the time series.
         return_df : bool
             Return result as pandas df.
-        local_tz : bool
-            Return data in local timezone.
+        local_tz : bool or str
+            Retrieve every series in UTC and return its times in the time
+            zone of its location, from `CWMS.get_ts_metadata`, or in this
+            time zone.  The window stays in `p_timezone` and results have
+            a time_zone column (the default is False, times in
+            `p_timezone`).
         por : bool
             Return period of record.
         pivot : bool
             Pivot dataframe so cwms ts id's are columns.
+        processes : int
+            Retrieve the series in this many worker processes, each with its
+            own connection, see `CWMS.process_pool` (the default is None,
+            retrieve them one after another in this process).
+        deadline : float
+            Seconds allowed for all series, see `CWMS.deadline` (the default
+            is None, no limit).
+        return_type : str
+            "df", "list", "numpy", "dict" or "arrow", see `cwmspy.results`
+            (the default is None, "df" or "list" from `return_df`).  "numpy"
+            and "dict" results come back in a dictionary by ts id, "arrow"
+            as one table with a dictionary encoded ts_id column.
 
         Returns
         -------
-        list or pandas df
+        list, pandas df, dict or pyarrow Table
             Time series data, date_time, value, quality_code.
 
         Examples
@@ -1352,50 +2257,291 @@ class CwmsTsMixin:
             2019-01-01 02:00:00                                  NaN                                     0.0
         ```
         """
-
-        l = []
-        for i, ts_id in enumerate(p_cwms_ts_id_list):
-            if p_units_list:
-                p_units = p_units_list[i]
+        return_type = results.resolve(return_type, return_df)
+        with self.deadline(deadline):
+            zones = None
+            if local_tz:
+                if local_tz is True:
+                    meta = self.get_ts_metadata(p_cwms_ts_id_list, p_office_id)
+                    zones = [
+                        (meta[ts_id] or {}).get("time_zone_id") or "UTC"
+                        for ts_id in p_cwms_ts_id_list
+                    ]
+                else:
+                    zones = [local_tz] * len(p_cwms_ts_id_list)
+                if not por:
+                    # to 24:00 of the end day in p_timezone, then in UTC, less
+                    # the day retrieve_ts adds back
+                    start_time, end_time = [
+                        to_utc(t, p_timezone) for t in _window(start_time, end_time)
+                    ]
+                    end_time -= datetime.timedelta(days=1)
+            calls = []
+            for i, ts_id in enumerate(p_cwms_ts_id_list):
+                if p_units_list:
+                    p_units = p_units_list[i]
+                else:
+                    p_units = None
+
+                kwargs = {
+                    "p_cwms_ts_id": ts_id,
+                    "p_units": p_units,
+                    "p_timezone": "UTC" if zones else p_timezone,
+                    "p_start_inclusive": p_start_inclusive,
+                    "p_end_inclusive": p_end_inclusive,
+                    "p_previous": p_previous,
+                    "p_next": p_next,
+                    "version_date": version_date,
+                    "p_max_version": p_max_version,
+                    "p_office_id": p_office_id,
+                    "return_type": "dict" if zones else return_type,
+                }
+                if not por:
+                    kwargs.update({"start_time": start_time, "end_time": end_time})
+                calls.append(kwargs)
+
+            name = "get_por" if por else "retrieve_ts"
+            if processes:
+                l = self.process_pool(processes).map(
+                    name, calls, timeout=self._remaining()
+                )
             else:
-                p_units = None
+                l = [getattr(self, name)(**kwargs) for kwargs in calls]
+
+            columns = ["date_time", "ts_id", "value", "quality_code"]
+            if zones:
+                l = [
+                    results.series(
+                        return_type,
+                        utc_to_local(rslt["date_time"], zone),
+                        rslt["value"],
+                        rslt["quality_code"],
+                        ts_id,
+                        zone,
+                        rslt.get("units"),
+                    )
+                    for ts_id, zone, rslt in zip(p_cwms_ts_id_list, zones, l)
+                ]
+                columns.append("time_zone")
 
-            arg = [
-                p_units,
-                p_timezone,
-                "F",
-                p_start_inclusive,
-                p_end_inclusive,
-                p_previous,
-                p_next,
-                version_date,
-                p_max_version,
-                p_office_id,
-                return_df,
-                local_tz,
-            ]
-
-            if por:
-                args0 = [ts_id]
-                args = args0 + arg
-                rslt = self.get_por(*args)
-            else:
-                args0 = [ts_id, start_time, end_time]
-                args = args0 + arg
-                rslt = self.retrieve_ts(*args)
+            if return_type != "df":
+                return results.combine(return_type, l, p_cwms_ts_id_list)
 
-            if return_df:
+            for ts_id, rslt in zip(p_cwms_ts_id_list, l):
                 rslt["ts_id"] = ts_id
-
-            l.append(rslt)
-
-        if return_df:
             l = pd.concat(l, ignore_index=True)
-            l = l[["date_time", "ts_id", "value", "quality_code"]]
+            l = l[columns]
             if pivot:
                 l = l.pivot(index="date_time", columns="ts_id", values="value")
 
-        return l
+            return l
+
+    @LD
+    def retrieve_ts_changes(
+        self,
+        p_cwms_ts_id_list,
+        marks,
+        since=datetime.timedelta(days=1),
+        lookback=datetime.timedelta(days=30),
+        safety_margin=datetime.timedelta(minutes=5),
+        p_units_list=None,
+        version_date="1111/11/11",
+        p_office_id=None,
+        batch=100,
+        return_df=True,
+        return_type=None,
+    ):
+        """
+        Retrieves the values stored since the last pull of each time series.
+
+        Values are selected from `cwms_v_tsv_dqu` by store time
+        (`data_entry_date`), or by value time for values stored without
+        one, after the high-water marks kept in `marks`.  Only values
+        timed up to `lookback` before the store time mark are looked at, so
+        the database reads the recent values of each series rather than its
+        whole history.  Store times are set when values are written, not
+        when they are committed, so values are read again from
+        `safety_margin` before the store time mark, and those pulled
+        before are left out.  The marks move forward to the latest values
+        returned and are saved once every series is retrieved, so a failed
+        pull is repeated in full.  Up to `batch` series are retrieved per
+        query.
+
+        Parameters
+        ----------
+        p_cwms_ts_id_list : list
+            List of time series identifiers.
+        marks : HighWaterMarks
+            High-water marks of previous pulls, see `cwmspy.watermarks`.
+        since : datetime or timedelta
+            Start of the first pull of a series, in UTC, or how long before
+            now (the default is one day).
+        lookback : timedelta
+            How far before its store time mark a value may be timed and
+            still be returned when stored or revised (the default is 30
+            days, None for the whole history).
+        safety_margin : timedelta
+            How long after its store time a value may be committed and
+            still be returned (the default is five minutes).
+        p_units_list : list
+            Unit list to retrieve the data values in (the default is None,
+            the storage units).
+        version_date : str
+            The version date of the data to retrieve.
+        p_office_id : str
+            The office that owns the time series.
+        batch : int
+            Series retrieved per query.
+        return_df : bool
+            Return result as pandas df.
+        return_type : str
+            "df", "list", "numpy", "dict" or "arrow", as for
+            `CWMS.retrieve_multi_ts`.
+
+        Returns
+        -------
+        list, pandas df, dict or pyarrow Table
+            New and changed values, date_time (UTC), value, quality_code.
+
+        Examples
+        -------
+        ```python
+        >>> from cwmspy.watermarks import HighWaterMarks
+        >>> marks = HighWaterMarks("poll.json")
+        >>> df = cwms.retrieve_ts_changes(p_cwms_ts_id_list, marks)
+        >>> df = cwms.retrieve_ts_changes(p_cwms_ts_id_list, marks)  # only new ones
+        ```
+        """
+        return_type = results.resolve(return_type, return_df)
+        if isinstance(since, datetime.timedelta):
+            now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+            since = now - since
+        ts_ids = list(p_cwms_ts_id_list)
+        units = list(p_units_list or [None] * len(ts_ids))
+        p_marks = []
+        for ts_id in ts_ids:
+            entered, date_time = marks.get(ts_id) or (None, None)
+            if entered is not None:
+                entered -= safety_margin
+            p_marks.append((entered or since, date_time or since))
+
+        rows = {ts_id: [] for ts_id in ts_ids}
+        seen = {ts_id: marks.seen(ts_id) for ts_id in ts_ids}
+        changes = self.get_ts_changes(
+            ts_ids, p_marks, units, version_date, p_office_id, batch, lookback
+        )
+        # time series ids are not case sensitive
+        by_id = {ts_id.upper(): ts_id for ts_id in ts_ids}
+        for row in changes:
+            ts_id = by_id[row[0].upper()]
+            # read again within the safety margin
+            if (row[1], row[4]) not in seen[ts_id]:
+                rows[ts_id].append(row[1:])
+
+        output = []
+        for ts_id, p_units in zip(ts_ids, units):
+            series = rows[ts_id]
+            times = np.array([r[0] for r in series], dtype="datetime64[ns]")
+            values = np.array([r[1] for r in series], dtype="float64")
+            qualities = np.array([r[2] or 0 for r in series], dtype="int64")
+            entered = [r[3] for r in series if r[3] is not None]
+            if series:
+                marks.update(
+                    ts_id, max(entered, default=None), max(r[0] for r in series)
+                )
+            elif ts_id not in marks:
+                marks.update(ts_id, since, since)
+            mark = marks.get(ts_id)[0]
+            if mark is not None:
+                pulled = seen[ts_id] | {(r[0], r[3]) for r in series if r[3]}
+                marks.remember(
+                    ts_id, {k for k in pulled if k[1] >= mark - safety_margin}
+                )
+            output.append(
+                results.series(
+                    return_type, times, values, qualities, ts_id, "UTC", p_units
+                )
+            )
+        marks.save()
+        LOGGER.info(f"Found {sum(map(len, rows.values()))} new values.")
+
+        if return_type != "df":
+            return results.combine(return_type, output, ts_ids)
+        for ts_id, rslt in zip(ts_ids, output):
+            rslt["ts_id"] = ts_id
+        output = pd.concat(output, ignore_index=True)
+        return output[["date_time", "ts_id", "value", "quality_code"]]
+
+    @LD
+    @read_call
+    def get_ts_changes(
+        self,
+        p_cwms_ts_id_list,
+        p_marks,
+        p_units_list=None,
+        version_date="1111/11/11",
+        p_office_id=None,
+        batch=100,
+        lookback=datetime.timedelta(days=30),
+    ):
+        """Get the rows stored after given marks, see
+        `CWMS.retrieve_ts_changes`.
+
+        Parameters
+        ----------
+        p_cwms_ts_id_list : list
+            List of time series identifiers.
+        p_marks : list
+            `(data_entry_date, date_time)` marks of each series, in UTC.
+        kwargs
+            As for `CWMS.retrieve_ts_changes`.
+
+        Returns
+        -------
+        list
+            `(cwms_ts_id, date_time, value, quality_code, data_entry_date)`
+            rows, by series and time.
+
+        """
+        if not version_date or version_date == "1111/11/11":
+            p_version_date = datetime.datetime(1111, 11, 11)
+        else:
+            p_version_date = pd.to_datetime(version_date).to_pydatetime()
+        ts_ids = list(p_cwms_ts_id_list)
+        units = list(p_units_list or [None] * len(ts_ids))
+        # codes and storage units bound, so the view is read by ts_code
+        meta = self._ts_metadata(ts_ids, p_office_id)
+
+        rows = []
+        for first in range(0, len(ts_ids), batch):
+            parameters = {"p_office_id": p_office_id, "p_version_date": p_version_date}
+            clauses = []
+            for j, ts_id in enumerate(ts_ids[first : first + batch], first):
+                if meta[ts_id] is None:
+                    # no such series, so no changes
+                    continue
+                i = len(clauses)
+                parameters[f"ts_code{i}"] = meta[ts_id]["ts_code"]
+                parameters[f"units{i}"] = units[j] or meta[ts_id]["unit_id"]
+                parameters[f"entered{i}"] = p_marks[j][0]
+                parameters[f"date_time{i}"] = p_marks[j][1]
+                parameters[f"since{i}"] = (
+                    p_marks[j][0] - lookback if lookback else EARLIEST
+                )
+                clauses.append(CHANGES_CLAUSE.format(i=i))
+            if not clauses:
+                continue
+            sql = CHANGES_SQL.format(clauses="\n    or ".join(clauses))
+            with self.acquire() as conn:
+                cur = self.registry.cursor(conn)
+                cur.arraysize = fetch_size(None)
+                try:
+                    cur.execute(sql, parameters)
+                    rows.extend(cur.fetchall())
+                except Exception as e:
+                    LOGGER.error("Error in retrieving time series changes.")
+                    raise ValueError(e.__str__())
+        return rows
 
     def compare_ts(
         self,
@@ -1520,6 +2666,7 @@ class CwmsTsMixin:
         return comp
 
     @LD
+    @db_call(idempotent=False)
     def update_ts_id(
         self,
         p_cwms_ts_id,
@@ -1531,29 +2678,31 @@ class CwmsTsMixin:
         p_db_officeid=None,
     ):
 
-        cur = self.conn.cursor()
-        try:
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            try:
 
-            cur.callproc(
-                "cwms_ts.update_ts_id",
-                [
-                    p_cwms_ts_id,
-                    p_interval_utc_offset,
-                    p_snap_forward_minutes,
-                    p_snap_backward_minutes,
-                    p_local_reg_time_zone_id,
-                    p_ts_active_flag,
-                    p_db_officeid,
-                ],
-            )
-        except Exception as e:
-            LOGGER.error("Error in update_ts_id.")
-            cur.close()
-            raise ValueError(e)
-        cur.close()
+                cur.callproc(
+                    "cwms_ts.update_ts_id",
+                    [
+                        p_cwms_ts_id,
+                        p_interval_utc_offset,
+                        p_snap_forward_minutes,
+                        p_snap_backward_minutes,
+                        p_local_reg_time_zone_id,
+                        p_ts_active_flag,
+                        p_db_officeid,
+                    ],
+                )
+            except Exception as e:
+                LOGGER.error("Error in update_ts_id.")
+                raise ValueError(e)
+        if self.catalog is not None:
+            self.catalog.invalidate(p_cwms_ts_id)
         return True
 
     @LD
+    @db_call(idempotent=False)
     def create_ts(
         self,
         p_cwms_ts_id,
@@ -1565,24 +2714,25 @@ class CwmsTsMixin:
         p_office_id=None,
     ):
 
-        cur = self.conn.cursor()
-        try:
+        with self.acquire() as conn:
+            cur = self.registry.cursor(conn)
+            try:
 
-            cur.callproc(
-                "cwms_ts.create_ts",
-                [
-                    p_cwms_ts_id,
-                    p_utc_offset,
-                    p_interval_forward,
-                    p_interval_backward,
-                    p_versioned,
-                    p_active_flag,
-                    p_office_id,
-                ],
-            )
-        except Exception as e:
-            LOGGER.error("Error in create_ts.")
-            cur.close()
-            raise ValueError(e.__str__())
-        cur.close()
+                cur.callproc(
+                    "cwms_ts.create_ts",
+                    [
+                        p_cwms_ts_id,
+                        p_utc_offset,
+                        p_interval_forward,
+                        p_interval_backward,
+                        p_versioned,
+                        p_active_flag,
+                        p_office_id,
+                    ],
+                )
+            except Exception as e:
+                LOGGER.error("Error in create_ts.")
+                raise ValueError(e.__str__())
+        if self.catalog is not None:
+            self.catalog.invalidate(p_cwms_ts_id)
         return True
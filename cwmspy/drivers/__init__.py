@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Database drivers used by `CWMS`
+
+A driver wraps a DB-API module: it opens connections and session pools and
+provides the type constants, such as `CURSOR` or `CLOB`, the mixins bind
+with.  Drivers that can fetch query results straight into columnar Arrow
+data also let `CWMS.retrieve_ts` skip creating a Python tuple per row.
+
+- `cx_Oracle`: the original driver, needs Oracle Instant Client.
+- `oracledb`: python-oracledb in thin mode, pure Python, no Instant Client.
+- `oracledb-thick`: python-oracledb using Instant Client.
+- `fake`: in-memory database for tests, see `cwmspy.drivers.fake`.
+
+The driver is chosen with `CWMS(driver=...)`, `CWMS.connect(driver=...)`,
+the `driver` key of a connection profile or the `CWMSPY_DRIVER`
+environment variable.  By default `cx_Oracle` is used when installed,
+otherwise `oracledb`.
+"""
+
+import os
+import importlib
+import importlib.util
+
+
+class Driver:
+    """Base class of the drivers.
+
+    Attributes missing from the driver, such as type constants, are looked
+    up on its DB-API module, which is only imported when first needed.
+    """
+
+    name = None
+    module_name = None
+    # whether fetch_frame can be used
+    supports_arrow = False
+
+    def __init__(self):
+        self._module = None
+
+    @property
+    def module(self):
+        """The DB-API module, imported on first use."""
+        if self._module is None:
+            self._module = importlib.import_module(self.module_name)
+        return self._module
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.module, attr)
+
+    def makedsn(self, host, port, service_name):
+        """Data source name for `host`, `port` and `service_name`."""
+        return self.module.makedsn(host=host, port=port, service_name=service_name)
+
+    def connect(self, **kwargs):
+        """A new standalone connection."""
+        return self.module.connect(**kwargs)
+
+    def create_pool(self, min, max, increment, session_callback, **kwargs):
+        """A new session pool that blocks when all sessions are in use."""
+        raise NotImplementedError
+
+    def fetch_frame(self, conn, sql, parameters, arraysize=None):
+        """Run a query and return its rows as a DataFrame with lower case
+        column names, without building Python objects per row.  Rows are
+        fetched `arraysize` at a time (None for the driver default).
+
+        Only called when `supports_arrow` is True.
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+
+class CxOracleDriver(Driver):
+    """`cx_Oracle`, using Oracle Instant Client."""
+
+    name = "cx_Oracle"
+    module_name = "cx_Oracle"
+
+    def create_pool(self, min, max, increment, session_callback, **kwargs):
+        return self.module.SessionPool(
+            min=min,
+            max=max,
+            increment=increment,
+            threaded=True,
+            getmode=self.module.SPOOL_ATTRVAL_WAIT,
+            session_callback=session_callback,
+            **kwargs,
+        )
+
+
+class OracledbDriver(Driver):
+    """python-oracledb, in thin mode unless `thick` is True.
+
+    Parameters
+    ----------
+    thick : bool
+        Load Oracle Instant Client (the default is False, thin mode).
+    lib_dir : str
+        Instant Client directory for thick mode (the default is None,
+        search the usual locations).
+
+    """
+
+    module_name = "oracledb"
+
+    def __init__(self, thick=False, lib_dir=None):
+        super().__init__()
+        self.thick = thick
+        self.lib_dir = lib_dir
+        self.name = "oracledb-thick" if thick else "oracledb"
+
+    @property
+    def module(self):
+        if self._module is None:
+            module = importlib.import_module(self.module_name)
+            if self.thick:
+                module.init_oracle_client(lib_dir=self.lib_dir)
+            self._module = module
+        return self._module
+
+    def create_pool(self, min, max, increment, session_callback, **kwargs):
+        return self.module.create_pool(
+            min=min,
+            max=max,
+            increment=increment,
+            getmode=self.module.POOL_GETMODE_WAIT,
+            session_callback=session_callback,
+            **kwargs,
+        )
+
+    @property
+    def supports_arrow(self):
+        # python-oracledb 3 fetches into Arrow arrays
+        return hasattr(self.module.Connection, "fetch_df_all") and (
+            importlib.util.find_spec("pyarrow") is not None
+        )
+
+    def fetch_frame(self, conn, sql, parameters, arraysize=None):
+        import pyarrow
+
+        kwargs = {} if arraysize is None else {"arraysize": arraysize}
+        odf = conn.fetch_df_all(statement=sql, parameters=parameters, **kwargs)
+        df = pyarrow.table(odf).to_pandas()
+        df.columns = [c.lower() for c in df.columns]
+        return df
+
+
+def _fake(**kwargs):
+    from .fake import FakeDriver
+
+    return FakeDriver(**kwargs)
+
+
+DRIVERS = {
+    "cx_Oracle": CxOracleDriver,
+    "oracledb": OracledbDriver,
+    "oracledb-thick": lambda: OracledbDriver(thick=True),
+    "fake": _fake,
+}
+
+
+def get_driver(driver=None):
+    """The driver called `driver`.
+
+    Parameters
+    ----------
+    driver : str or Driver
+        Name from `DRIVERS`, or a driver returned as is (the default is
+        None, `CWMSPY_DRIVER` or the first of `cx_Oracle` and `oracledb`
+        that is installed).
+
+    Returns
+    -------
+    Driver
+        The driver.
+
+    """
+    if isinstance(driver, Driver):
+        return driver
+    if driver is None:
+        driver = os.getenv("CWMSPY_DRIVER")
+    if driver is None:
+        driver = "cx_Oracle"
+        if importlib.util.find_spec("cx_Oracle") is None:
+            if importlib.util.find_spec("oracledb") is not None:
+                driver = "oracledb"
+    try:
+        return DRIVERS[driver]()
+    except KeyError:
+        raise ValueError(f"Unknown driver {driver}, use one of {list(DRIVERS)}")
+
+
+def driver_for(conn):
+    """The driver of an existing connection or session pool, None if unknown."""
+    module = type(conn).__module__
+    if module.startswith("cx_Oracle"):
+        return CxOracleDriver()
+    if module.startswith("oracledb"):
+        return OracledbDriver()
+    if module.startswith("cwmspy.drivers.fake"):
+        return _fake(db=conn.db)
+    return None
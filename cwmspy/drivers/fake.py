@@ -0,0 +1,442 @@
+# -*- coding: utf-8 -*-
+"""
+In-memory stand-in for an Oracle database, used by the tests
+
+Only the calls made by the CWMS mixins are implemented.  Time series are
+kept in memory and every connection raises if two threads use it at once.
+
+```python
+>>> from cwmspy import CWMS
+>>> from cwmspy.drivers.fake import FakeDriver
+>>> cwms = CWMS(driver=FakeDriver())
+>>> cwms.connect(host="fake", service_name="fake", pool=True)
+True
+```
+"""
+
+import datetime
+import threading
+
+from . import Driver
+
+# bind names of a `cwms_ts.retrieve_ts_out_tab` query, in `FakeDatabase.rows` order
+WINDOW_PARAMETERS = [
+    "p_cwms_ts_id",
+    "p_start_time",
+    "p_end_time",
+    "p_trim",
+    "p_start_inclusive",
+    "p_end_inclusive",
+    "p_previous",
+    "p_next",
+]
+
+
+class FakeError(Exception):
+    pass
+
+
+class FakeVar:
+    def __init__(self, value=None):
+        self.value = value
+
+    def getvalue(self, pos=0):
+        return self.value
+
+
+class FakeObjectType:
+    def __init__(self, name):
+        self.name = name
+
+    def newobject(self):
+        return []
+
+
+class FakeCollection(list):
+    def aslist(self):
+        return list(self)
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.connection = conn
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.rows = []
+
+    def var(self, typ, *args, **kwargs):
+        return FakeVar(FakeCursor(self.connection))
+
+    def arrayvar(self, typ, values):
+        return FakeVar(list(values))
+
+    def callproc(self, name, args=()):
+        with self.connection.in_use():
+            return self.connection.db.callproc(name, args)
+
+    def callfunc(self, name, return_type, args=()):
+        with self.connection.in_use():
+            return self.connection.db.callfunc(name, args)
+
+    def execute(self, statement, parameters=None, **kwargs):
+        with self.connection.in_use():
+            self.connection.db.statements.append(statement)
+            self.connection.db.raise_error()
+            self.rows = self.connection.db.query(statement, parameters or kwargs)
+        return self
+
+    def fetchmany(self, n=None):
+        n = n or self.arraysize
+        self.connection.db.fetches += 1
+        rows, self.rows = self.rows[:n], self.rows[n:]
+        return rows
+
+    def fetchall(self):
+        rows = []
+        while True:
+            batch = self.fetchmany()
+            if not batch:
+                return rows
+            rows.extend(batch)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, db, latency=0.001):
+        self.db = db
+        self.latency = latency
+        self.callTimeout = 0
+        self._busy = threading.Lock()
+        self._cancel = threading.Event()
+
+    def in_use(self):
+        conn = self
+
+        class _InUse:
+            def __enter__(self):
+                if not conn._busy.acquire(blocking=False):
+                    conn.db.collisions += 1
+                    raise FakeError("connection used by two threads at once")
+                conn._cancel.clear()
+                timeout = conn.callTimeout / 1000 if conn.callTimeout else None
+                if timeout is not None and timeout < conn.latency:
+                    cancelled = conn._cancel.wait(timeout)
+                    conn._busy.release()
+                    if cancelled:
+                        raise FakeError("ORA-01013: user requested cancel")
+                    raise FakeError(
+                        f"DPI-1067: call timeout of {conn.callTimeout} ms "
+                        "exceeded with ORA-3156"
+                    )
+                if conn._cancel.wait(conn.latency):
+                    conn._busy.release()
+                    raise FakeError("ORA-01013: user requested cancel")
+
+            def __exit__(self, *exc):
+                conn._busy.release()
+
+        return _InUse()
+
+    def cursor(self):
+        self.db.cursors += 1
+        return FakeCursor(self)
+
+    def gettype(self, name):
+        self.db.gettypes += 1
+        return FakeObjectType(name)
+
+    def ping(self):
+        self.db.pings += 1
+        self.db.raise_error()
+        return None
+
+    def cancel(self):
+        self.db.cancels += 1
+        self._cancel.set()
+
+    def close(self):
+        pass
+
+
+class FakeSessionPool:
+    def __init__(self, db, max=4, latency=0.001, session_callback=None):
+        self.db = db
+        self.max = max
+        self.latency = latency
+        self.session_callback = session_callback
+        self.opened = 0
+        # raise like an unreachable database when set
+        self.down = False
+        self.busy = 0
+        self.max_busy = 0
+        self._free = []
+        self._slots = threading.Semaphore(max)
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.down:
+            raise FakeError("ORA-12541: TNS:no listener")
+        self._slots.acquire()
+        with self._lock:
+            if self._free:
+                conn = self._free.pop()
+            else:
+                conn = None
+                self.opened += 1
+            self.busy += 1
+            self.max_busy = max(self.max_busy, self.busy)
+        if conn is None:
+            conn = FakeConnection(self.db, self.latency)
+            if self.session_callback is not None:
+                self.session_callback(conn, None)
+        return self._handle(conn)
+
+    def _handle(self, session):
+        # like real drivers, a new Connection object on every acquire
+        conn = FakeConnection(self.db, self.latency)
+        conn._busy, conn._cancel = session._busy, session._cancel
+        conn.session = session
+        return conn
+
+    def release(self, conn):
+        with self._lock:
+            self.busy -= 1
+            self._free.append(conn.session)
+        self._slots.release()
+
+    def drop(self, conn):
+        with self._lock:
+            self.busy -= 1
+            self.opened -= 1
+        self._slots.release()
+
+    def close(self, force=False):
+        pass
+
+
+class FakeDatabase:
+    """In-memory `cwms_ts.retrieve_ts`/`cwms_ts.store_ts`."""
+
+    def __init__(self):
+        self.data = {}
+        # store times by series and value time, None for values put in `data`
+        self.entered = {}
+        # location time zones by series, UTC when left out
+        self.time_zones = {}
+        # storage units by series, None when left out
+        self.units = {}
+        # times of regular series for cwms_ts.get_times_for_time_window
+        self.times = {}
+        self.collisions = 0
+        self.pings = 0
+        self.cancels = 0
+        self.cursors = 0
+        self.gettypes = 0
+        # fetch round trips
+        self.fetches = 0
+        self.calls = []
+        self.statements = []
+        # raised, in order, by the next calls
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def raise_error(self):
+        with self._lock:
+            error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            raise error
+
+    def rows(
+        self,
+        p_cwms_ts_id,
+        p_start_time,
+        p_end_time,
+        p_trim="F",
+        p_start_inclusive="T",
+        p_end_inclusive="T",
+        p_previous="F",
+        p_next="F",
+    ):
+        """`(date_time, value, quality_code)` of a series in a time window."""
+        with self._lock:
+            series = sorted(self.data.get(p_cwms_ts_id, {}).items())
+        rows = [(t, v, q) for t, (v, q) in series]
+        after_start = [
+            p_start_time < t or (p_start_inclusive == "T" and p_start_time == t)
+            for t, _, _ in rows
+        ]
+        before_end = [
+            t < p_end_time or (p_end_inclusive == "T" and t == p_end_time)
+            for t, _, _ in rows
+        ]
+        window = [r for r, a, b in zip(rows, after_start, before_end) if a and b]
+        if p_trim == "T":
+            present = [i for i, r in enumerate(window) if r[1] is not None]
+            window = window[present[0] : present[-1] + 1] if present else []
+        previous = [r for r, a in zip(rows, after_start) if not a]
+        following = [r for r, b in zip(rows, before_end) if not b]
+        if p_previous == "T" and previous:
+            window.insert(0, previous[-1])
+        if p_next == "T" and following:
+            window.append(following[0])
+        return window
+
+    def query(self, statement, parameters):
+        """Rows of a query, only values only retrieval, `cwms_v_tsv_dqu`
+        changes and `cwms_v_ts_id` lookups are implemented."""
+        if "retrieve_ts_out_tab" in statement:
+            # only the first two and last two times, as VALUES_ONLY_SQL
+            rows = self.rows(*[parameters[name] for name in WINDOW_PARAMETERS])
+            last = len(rows) - 1
+            return [
+                (t if i <= 1 or i >= last - 1 else None, v, q)
+                for i, (t, v, q) in enumerate(rows)
+            ]
+        if "cwms_v_tsv_dqu" not in statement:
+            if "cwms_v_ts_id" in statement:
+                return self.catalog(parameters)
+            return []
+        with self._lock:
+            codes = dict(enumerate(sorted(self.data), 1))
+        rows = []
+        i = 0
+        while f"ts_code{i}" in parameters:
+            ts_id = codes.get(parameters[f"ts_code{i}"])
+            with self._lock:
+                series = sorted(self.data.get(ts_id, {}).items())
+                entered = dict(self.entered.get(ts_id, {}))
+                units = self.units.get(ts_id)
+            if parameters[f"units{i}"] != units:
+                # values are only held in their storage units
+                series = []
+            for t, (v, q) in series:
+                if t < parameters[f"since{i}"]:
+                    continue
+                e = entered.get(t)
+                if e is None and t > parameters[f"date_time{i}"]:
+                    rows.append((ts_id, t, v, q, e))
+                elif e is not None and e > parameters[f"entered{i}"]:
+                    rows.append((ts_id, t, v, q, e))
+            i += 1
+        return rows
+
+    def catalog(self, parameters):
+        """`cwms_v_ts_id` rows of the series with the ids bound."""
+        ids = [v for k, v in parameters.items() if k.startswith("id")]
+        with self._lock:
+            names = sorted(self.data)
+        rows = []
+        for code, ts_id in enumerate(names, 1):
+            if ts_id.upper() in ids:
+                interval = ts_id.split(".")[3]
+                office = parameters.get("p_office_id") or "CWMSPY"
+                zone = self.time_zones.get(ts_id, "UTC")
+                units = self.units.get(ts_id)
+                rows.append((office, ts_id, code, interval, 0, units, "T", zone))
+        return rows
+
+    def callproc(self, name, args):
+        if name == "cwms_env.set_session_office_id":
+            # session setup, not counted as a call
+            return list(args)
+        self.calls.append(name)
+        self.raise_error()
+        if name == "cwms_ts.retrieve_ts":
+            rc = args[0]
+            rc.getvalue().rows = self.rows(args[1], *args[3:5], *args[6:11])
+        elif name == "cwms_ts.store_ts":
+            p_cwms_ts_id, p_units, p_times, p_values, p_qualities = args[:5]
+            epoch = datetime.datetime(1970, 1, 1)
+            now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+            with self._lock:
+                series = self.data.setdefault(p_cwms_ts_id, {})
+                entered = self.entered.setdefault(p_cwms_ts_id, {})
+                for t, v, q in zip(p_times, p_values.getvalue(), p_qualities):
+                    t = epoch + datetime.timedelta(milliseconds=t)
+                    series[t] = (v, q)
+                    entered[t] = now
+        elif name == "cwms_ts.delete_ts":
+            with self._lock:
+                self.data.pop(args[0], None)
+                self.entered.pop(args[0], None)
+        else:
+            raise FakeError(f"{name} is not implemented")
+        return list(args)
+
+    def callfunc(self, name, args):
+        self.calls.append(name)
+        self.raise_error()
+        if name in ("cwms_ts.get_ts_min_date", "cwms_ts.get_ts_max_date"):
+            with self._lock:
+                times = list(self.data.get(args[0], {}))
+            if not times:
+                raise FakeError(f"TS_ID_NOT_FOUND: {args[0]}")
+            return min(times) if name.endswith("min_date") else max(times)
+        if name == "cwms_ts.get_times_for_time_window" and args[2] in self.times:
+            start, end = args[:2]
+            return FakeCollection(t for t in self.times[args[2]] if start <= t <= end)
+        raise FakeError(f"{name} is not implemented")
+
+
+class FakeDriver(Driver):
+    """Driver opening `FakeConnection` and `FakeSessionPool` on one database.
+
+    Parameters
+    ----------
+    db : FakeDatabase
+        Database shared by every connection (the default is None, a new
+        one).
+    latency : float
+        Seconds each call takes.
+    arrow : bool
+        Serve `cwms_ts.retrieve_ts_out_tab` queries through `fetch_frame`.
+
+    """
+
+    name = "fake"
+    CURSOR = "CURSOR"
+    CLOB = "CLOB"
+    DATETIME = "DATETIME"
+    STRING = "STRING"
+    NUMBER = "NUMBER"
+    NATIVE_FLOAT = "NATIVE_FLOAT"
+
+    def __init__(self, db=None, latency=0.001, arrow=False):
+        super().__init__()
+        self.db = db if db is not None else FakeDatabase()
+        self.latency = latency
+        self.supports_arrow = arrow
+
+    def __getattr__(self, attr):
+        # no DB-API module behind the fake
+        raise AttributeError(attr)
+
+    def makedsn(self, host, port, service_name):
+        return f"{host}:{port}/{service_name}"
+
+    def connect(self, **kwargs):
+        return FakeConnection(self.db, self.latency)
+
+    def create_pool(self, min, max, increment, session_callback, **kwargs):
+        return FakeSessionPool(
+            self.db, max=max, latency=self.latency, session_callback=session_callback
+        )
+
+    def fetch_frame(self, conn, sql, parameters, arraysize=None):
+        import pandas as pd
+
+        with conn.in_use():
+            self.db.statements.append(sql)
+            self.db.calls.append("cwms_ts.retrieve_ts_out_tab")
+            self.db.raise_error()
+        rows = self.db.rows(*[parameters[name] for name in WINDOW_PARAMETERS])
+        df = pd.DataFrame(rows, columns=["date_time", "value", "quality_code"])
+        # as Arrow hands back DATE and unconstrained NUMBER columns
+        df["date_time"] = df["date_time"].astype("datetime64[us]")
+        df["quality_code"] = df["quality_code"].astype("float64")
+        return df
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+Queries across several CWMS databases
+
+`Federation` holds one `CWMS` object per database and sends each call to
+the database owning the office it is about.  Calls for many series run
+concurrently on all databases and come back as one DataFrame.
+
+```python
+>>> from cwmspy.federation import Federation
+>>> fed = Federation({"NWDP": "nwdp", "NWDM": "nwdm", "NWW": "nwdp"},
+>>>                  prefixes={"LWG.": "NWW", "BON.": "NWDP"})
+>>> fed.connect()
+>>> df = fed.retrieve_multi_ts(["LWG.Flow-Out.Ave.1Hour.1Hour.CBT-REV",
+>>>                             "BON.Flow-Out.Ave.1Hour.1Hour.CBT-REV"],
+>>>                            "2019/1/1", "2019/1/2")
+```
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .core import CWMS
+from .utils import LazyModule
+
+pd = LazyModule("pandas")
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class Federation:
+    """Route `CWMS` calls to the database of each office.
+
+    Parameters
+    ----------
+    offices : dict
+        Office id to the database holding it, as a profile name (see
+        `cwmspy.config`), a dictionary of `CWMS.connect` arguments or a
+        `CWMS` object.  Offices given the same profile name share one
+        connection.
+    prefixes : dict
+        Time series or location id prefix to office id, used when a call
+        does not name the office (the default is None, `p_office_id` is
+        required).  The longest matching prefix wins.
+    max_workers : int
+        Threads running calls at once (the default is None, 4 per
+        database).
+
+    """
+
+    def __init__(self, offices, prefixes=None, max_workers=None):
+        self.prefixes = dict(prefixes or {})
+        self.offices = {}
+        self._targets = {}
+        shared = {}
+        for office, target in offices.items():
+            if isinstance(target, str):
+                if target not in shared:
+                    shared[target] = CWMS()
+                    self._targets[id(shared[target])] = {"name": target}
+                self.offices[office] = shared[target]
+            elif isinstance(target, dict):
+                cwms = CWMS()
+                self._targets[id(cwms)] = dict(target)
+                self.offices[office] = cwms
+            else:
+                self.offices[office] = target
+        self.databases = list({id(c): c for c in self.offices.values()}.values())
+        self.max_workers = max_workers or 4 * len(self.databases)
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="cwmspy-federation"
+            )
+        return self._executor
+
+    def connect(self, **kwargs):
+        """Connect every database at once, with session pools by default.
+
+        Parameters
+        ----------
+        kwargs
+            Passed to `CWMS.connect` for each database given as a profile
+            or dictionary, `pool` defaults to True.
+
+        Returns
+        -------
+        bool
+            True if every database connected, False otherwise.
+
+        """
+        office_of = {id(c): office for office, c in self.offices.items()}
+
+        def connect(cwms):
+            target = self._targets.get(id(cwms))
+            if target is None:
+                # passed in already connected
+                return True
+            args = dict(kwargs)
+            args.setdefault("pool", True)
+            args.update(target)
+            if "name" not in target:
+                args.setdefault("office", office_of[id(cwms)])
+            return cwms.connect(**args)
+
+        results = list(self._get_executor().map(connect, self.databases))
+        return all(results)
+
+    def office(self, p_office_id=None, ts_id=None):
+        """The office a call is about.
+
+        Parameters
+        ----------
+        p_office_id : str
+            Office named by the caller, used when given.
+        ts_id : str
+            Time series or location id matched against `prefixes`.
+
+        Returns
+        -------
+        str
+            Office id.
+
+        """
+        if p_office_id:
+            if p_office_id not in self.offices:
+                raise ValueError(f"Unknown office {p_office_id}")
+            return p_office_id
+        if ts_id:
+            matches = [p for p in self.prefixes if ts_id.startswith(p)]
+            if matches:
+                return self.prefixes[max(matches, key=len)]
+        raise ValueError(f"No office for {ts_id}, pass p_office_id")
+
+    def route(self, p_office_id=None, ts_id=None):
+        """The `CWMS` object of the database owning the call's office."""
+        return self.offices[self.office(p_office_id, ts_id)]
+
+    def retrieve_ts(
+        self, p_cwms_ts_id, start_time, end_time, p_office_id=None, **kwargs
+    ):
+        """`CWMS.retrieve_ts` on the database owning the series."""
+        office = self.office(p_office_id, p_cwms_ts_id)
+        return self.offices[office].retrieve_ts(
+            p_cwms_ts_id, start_time, end_time, p_office_id=office, **kwargs
+        )
+
+    def retrieve_time_series(self, ts_ids, p_office_id=None, **kwargs):
+        """`CWMS.retrieve_time_series`, one call per office, merged.
+
+        Parameters
+        ----------
+        ts_ids : list
+            Time series identifiers, from any number of offices.
+        p_office_id : str
+            Office of all `ts_ids` (the default is None, see `prefixes`).
+        kwargs
+            Passed to `CWMS.retrieve_time_series`.
+
+        Returns
+        -------
+        pandas df
+            The frames of all offices, or a list of their JSON results when
+            `as_json` is True.
+
+        """
+        groups = {}
+        for ts_id in ts_ids:
+            groups.setdefault(self.office(p_office_id, ts_id), []).append(ts_id)
+        calls = [
+            (office, "retrieve_time_series", (ids,), dict(kwargs, p_office_id=office))
+            for office, ids in groups.items()
+        ]
+        results = self._run(calls)
+        if kwargs.get("as_json"):
+            return results
+        return self._merge(results, [c[0] for c in calls])
+
+    def retrieve_location(self, p_location_id, p_db_office_id=None, **kwargs):
+        """`CWMS.retrieve_location` on the database owning the location."""
+        office = self.office(p_db_office_id, p_location_id)
+        return self.offices[office].retrieve_location(
+            p_location_id, p_db_office_id=office, **kwargs
+        )
+
+    def retrieve_multi_ts(
+        self,
+        p_cwms_ts_id_list,
+        start_time,
+        end_time,
+        pivot=False,
+        timeout=None,
+        **kwargs,
+    ):
+        """`CWMS.retrieve_ts` for series in any office, run concurrently.
+
+        Parameters
+        ----------
+        p_cwms_ts_id_list : list
+            Time series identifiers, routed with `prefixes`.
+        start_time : str
+            The start of the time window.
+        end_time : str
+            The end of the time window.
+        pivot : bool
+            Pivot dataframe so cwms ts id's are columns.
+        timeout : float
+            Seconds allowed for all calls, see `CWMS.deadline` (the default
+            is None, no limit).
+        kwargs
+            Passed to `CWMS.retrieve_ts`, `p_office_id` applies to every
+            series.
+
+        Returns
+        -------
+        pandas df
+            date_time, ts_id, value, quality_code and office of all series.
+
+        """
+        p_office_id = kwargs.pop("p_office_id", None)
+        calls = []
+        for ts_id in p_cwms_ts_id_list:
+            office = self.office(p_office_id, ts_id)
+            args = (ts_id, start_time, end_time)
+            calls.append(
+                (office, "retrieve_ts", args, dict(kwargs, p_office_id=office))
+            )
+        results = self._run(calls, timeout)
+        df = self._merge(results, [c[0] for c in calls])
+        if pivot:
+            df = df.pivot(index="date_time", columns="ts_id", values="value")
+        return df
+
+    def broadcast(self, name, *args, timeout=None, **kwargs):
+        """Call `CWMS.<name>` once on every database.
+
+        Returns
+        -------
+        list
+            Results in the order of `databases`.
+
+        """
+        calls = [(db, name, args, kwargs) for db in self.databases]
+        return self._run(calls, timeout)
+
+    def _run(self, calls, timeout=None):
+        """Run `(office or CWMS, method, args, kwargs)` calls concurrently."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def run(call):
+            target, name, args, kwargs = call
+            cwms = self.offices[target] if isinstance(target, str) else target
+            remaining = None if deadline is None else deadline - time.monotonic()
+            with cwms.deadline(remaining):
+                return getattr(cwms, name)(*args, **kwargs)
+
+        return list(self._get_executor().map(run, calls))
+
+    @staticmethod
+    def _merge(frames, offices):
+        frames = [df.assign(office=office) for df, office in zip(frames, offices)]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def close(self):
+        """Close every database and stop the threads."""
+        for cwms in self.databases:
+            if id(cwms) in self._targets:
+                cwms.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
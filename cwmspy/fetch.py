@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Fetching time series rows into NumPy arrays
+
+Rows of `date_time, value, quality_code` are fetched `arraysize` at a
+time and copied into preallocated arrays, so a long series never exists
+as one list of Python tuples.  `arraysize` is sized from the rows
+expected, so a long series takes few round trips and a short one does
+not allocate large fetch buffers.
+"""
+from .utils import LazyModule
+
+np = LazyModule("numpy")
+
+# Rows fetched per round trip for irregular series
+DEFAULT_ARRAYSIZE = 1000
+# Bounds of the rows fetched per round trip
+MIN_ARRAYSIZE = 100
+MAX_ARRAYSIZE = 20000
+
+
+def fetch_size(rows):
+    """`arraysize` for a query expected to return `rows` rows (None if
+    unknown)."""
+    if rows is None:
+        return DEFAULT_ARRAYSIZE
+    # one more row than expected so the last fetch sees the end
+    return min(max(rows + 1, MIN_ARRAYSIZE), MAX_ARRAYSIZE)
+
+
+def tune_cursor(cursor, rows):
+    """Size `cursor`'s fetch buffers for `rows` expected rows.
+
+    Returns
+    -------
+    int
+        The `arraysize` set.
+
+    """
+    size = fetch_size(rows)
+    cursor.arraysize = size
+    # only honoured by drivers that have not fetched from the cursor yet
+    cursor.prefetchrows = size
+    return size
+
+
+def fetch_arrays(cursor, rows=None):
+    """Fetch every `date_time, value, quality_code` row of `cursor`.
+
+    Parameters
+    ----------
+    cursor : Cursor
+        Open cursor, fetched `cursor.arraysize` rows at a time.
+    rows : int
+        Rows expected, used to preallocate the arrays (the default is None,
+        `cursor.arraysize`).  The arrays grow if more rows come back.
+
+    Returns
+    -------
+    tuple
+        `datetime64[ns]` times, `float64` values (NaN for null) and
+        `int64` quality codes.
+
+    """
+    capacity = max(rows or 0, cursor.arraysize, 1)
+    times = np.empty(capacity, dtype="datetime64[ns]")
+    values = np.empty(capacity, dtype="float64")
+    qualities = np.empty(capacity, dtype="int64")
+    n = 0
+    while True:
+        batch = cursor.fetchmany(cursor.arraysize)
+        if not batch:
+            break
+        end = n + len(batch)
+        if end > capacity:
+            capacity = max(end, 2 * capacity)
+            times = np.resize(times, capacity)
+            values = np.resize(values, capacity)
+            qualities = np.resize(qualities, capacity)
+        t, v, q = zip(*batch)
+        times[n:end] = np.array(t, dtype="datetime64[ns]")
+        values[n:end] = np.array(v, dtype="float64")
+        qualities[n:end] = np.array([0 if x is None else x for x in q], "int64")
+        n = end
+    return times[:n], values[:n], qualities[:n]
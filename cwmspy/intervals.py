@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+CWMS interval names
+
+The fourth part of a time series id names its interval, e.g. `1Hour` in
+`LWG.Flow-Out.Ave.1Hour.1Hour.CBT-REV`.  Irregular series use `0`, or a
+name starting with `~` for pseudo-regular ones.  Local regular intervals
+end in `Local`, e.g. `1DayLocal`.
+
+```python
+>>> from cwmspy.intervals import interval_seconds
+>>> interval_seconds("15Minutes")
+900
+>>> interval_seconds("~1Day") is None
+True
+```
+"""
+
+import re
+
+# Seconds per interval unit, months and longer as their average length
+UNIT_SECONDS = {
+    "Minute": 60,
+    "Hour": 3600,
+    "Day": 86400,
+    "Week": 7 * 86400,
+    "Month": 2629746,
+    "Year": 31556952,
+    "Decade": 315569520,
+}
+
+# Units of equal length in UTC
+FIXED_UNITS = ("Minute", "Hour", "Day", "Week")
+
+_INTERVAL = re.compile(r"^(\d+)([A-Za-z]+?)s?$")
+
+
+def ts_interval(p_cwms_ts_id):
+    """Interval name of a time series id, e.g. `1Hour`."""
+    parts = p_cwms_ts_id.split(".")
+    if len(parts) != 6:
+        raise ValueError(f"{p_cwms_ts_id} is not a time series id")
+    return parts[3]
+
+
+def interval_seconds(interval):
+    """Length of an interval in seconds.
+
+    Local regular intervals count as their length in local time, their
+    values are an hour closer or further apart in UTC across daylight
+    saving time changes.
+
+    Parameters
+    ----------
+    interval : str
+        Interval name, e.g. `1Hour`, `15Minutes` or `1DayLocal`.
+
+    Returns
+    -------
+    int
+        Seconds between values, None for irregular intervals.
+
+    """
+    parts = interval_parts(interval)
+    if parts is None:
+        return None
+    count, unit, _ = parts
+    return count * UNIT_SECONDS[unit]
+
+
+def interval_parts(interval):
+    """Count and unit of an interval, and whether it is local regular.
+
+    Local regular intervals, e.g. `1DayLocal`, fall at the same local
+    times through daylight saving time changes.
+
+    Returns
+    -------
+    tuple
+        e.g. `(15, "Minute", False)` for `15Minutes`, None for irregular
+        and pseudo-regular intervals.
+
+    """
+    if interval == "0" or interval.startswith("~"):
+        return None
+    local = interval.endswith("Local")
+    match = _INTERVAL.match(interval[: -len("Local")] if local else interval)
+    if not match or match.group(2) not in UNIT_SECONDS:
+        raise ValueError(f"Unknown interval {interval}")
+    return int(match.group(1)), match.group(2), local
+
+
+def regular_seconds(p_cwms_ts_id):
+    """Seconds between the UTC times of a regular series, None when its
+    times are not evenly spaced in UTC.
+
+    Intervals of months and longer vary in length, and local regular
+    (`Local`) intervals follow daylight saving time.
+    """
+    try:
+        parts = interval_parts(ts_interval(p_cwms_ts_id))
+    except ValueError:
+        return None
+    if parts is None or parts[2] or parts[1] not in FIXED_UNITS:
+        return None
+    return parts[0] * UNIT_SECONDS[parts[1]]
+
+
+def expected_rows(p_cwms_ts_id, start_time, end_time):
+    """Number of values a regular series has between two datetimes.
+
+    Returns
+    -------
+    int
+        Values in the window, counting both ends, None when the series is
+        irregular or its id can not be parsed.
+
+    """
+    try:
+        seconds = interval_seconds(ts_interval(p_cwms_ts_id))
+    except ValueError:
+        return None
+    if seconds is None:
+        return None
+    return max(int((end_time - start_time).total_seconds() // seconds) + 1, 0)
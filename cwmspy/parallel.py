@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+"""
+Process pool for CPU-heavy retrieval
+
+Turning query results into DataFrames holds the GIL, so threads do not help
+once thousands of series are pulled.  `ProcessPool` runs `CWMS` methods in
+worker processes, each with its own connection opened after the worker
+starts.  DataFrames come back as Arrow IPC streams when `pyarrow` is
+installed, otherwise their columns are copied through shared memory, so the
+parent never unpickles them row by row.  Without either, on Python 3.7,
+they are pickled.
+
+```python
+>>> cwms = CWMS()
+>>> cwms.connect()
+>>> with cwms.process_pool(processes=8) as pp:
+>>>     df = pp.retrieve_multi_ts(ts_ids, "2019/1/1", "2019/9/1")
+```
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import results
+from .cwms_ts import _parts, _stitch, _window
+from .utils import LazyModule
+
+pd = LazyModule("pandas")
+np = LazyModule("numpy")
+
+
+LOGGER = logging.getLogger(__name__)
+
+# The CWMS object of a worker process
+_worker = None
+
+
+def _connect_worker(connect_kwargs):
+    from .core import CWMS
+
+    cwms = CWMS()
+    if not cwms.connect(**connect_kwargs):
+        raise ValueError("Worker failed to connect to the database")
+    return cwms
+
+
+def _init_worker(factory, connect_kwargs):
+    global _worker
+    if factory is not None:
+        _worker = factory()
+    else:
+        _worker = _connect_worker(connect_kwargs)
+
+
+def _run(name, kwargs, deadline):
+    timeout = None
+    if deadline is not None:
+        # wall clock, the monotonic clock is not shared between processes
+        timeout = deadline - time.time()
+    with _worker.deadline(timeout):
+        result = getattr(_worker, name)(**kwargs)
+    if isinstance(result, pd.DataFrame):
+        return encode(result)
+    return result
+
+
+def _arrow():
+    try:
+        import pyarrow
+
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def _shared_memory():
+    try:
+        # Python 3.8 and later
+        from multiprocessing import shared_memory
+
+        return shared_memory
+    except ImportError:
+        return None
+
+
+def _untrack(shm):
+    """Leave unlinking `shm` to the process that decodes it.
+
+    The resource tracker of the process that created a block unlinks it,
+    with a leak warning, when that process exits, even though the parent
+    still has to read it.
+    """
+    if os.name != "posix":
+        return
+    from multiprocessing import resource_tracker
+
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception as e:
+        LOGGER.debug(e)
+
+
+def encode(df):
+    """Pack a DataFrame for the trip back to the parent process.
+
+    Returns
+    -------
+    tuple or pandas.DataFrame
+        An Arrow IPC stream, or the name of a shared memory block holding
+        the numeric columns plus the remaining columns, or `df` itself
+        when neither is available.
+
+    """
+    pa = _arrow()
+    if pa is not None:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return ("arrow", sink.getvalue().to_pybytes())
+
+    shared_memory = _shared_memory()
+    if shared_memory is None:
+        return df
+
+    arrays = {}
+    columns = []
+    for name in df.columns:
+        arr = df[name].to_numpy()
+        if arr.dtype.kind in "biufmM":
+            arrays[name] = np.ascontiguousarray(arr)
+            columns.append((name, "array", (str(arr.dtype), arr.nbytes)))
+        elif len(arr) and (arr == arr[0]).all():
+            # metadata such as ts_id is the same on every row
+            columns.append((name, "constant", arr[0]))
+        else:
+            columns.append((name, "object", arr.tolist()))
+    size = sum(a.nbytes for a in arrays.values())
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    _untrack(shm)
+    offset = 0
+    for name, arr in arrays.items():
+        shm.buf[offset : offset + arr.nbytes] = arr.view("u1").tobytes()
+        offset += arr.nbytes
+    shm.close()
+    return ("shm", shm.name, len(df), columns)
+
+
+def decode(packed):
+    """Unpack a DataFrame returned by `encode`."""
+    if packed[0] == "arrow":
+        pa = _arrow()
+        return pa.ipc.open_stream(packed[1]).read_pandas()
+
+    _, name, n, columns = packed
+    shm = _shared_memory().SharedMemory(name=name)
+    try:
+        data = {}
+        offset = 0
+        for column, kind, value in columns:
+            if kind == "array":
+                dtype, nbytes = value
+                data[column] = np.frombuffer(
+                    shm.buf, dtype=dtype, count=n, offset=offset
+                ).copy()
+                offset += nbytes
+            elif kind == "constant":
+                data[column] = [value] * n
+            else:
+                data[column] = value
+        return pd.DataFrame(data, columns=[c[0] for c in columns])
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _decode_result(result):
+    if isinstance(result, tuple) and result and result[0] in ("arrow", "shm"):
+        return decode(result)
+    return result
+
+
+def _discard(future):
+    """Free the shared memory of a result that will not be decoded."""
+    if future.cancel():
+        return
+    try:
+        result = future.result()
+    except Exception:
+        return
+    if isinstance(result, tuple) and result and result[0] == "shm":
+        try:
+            shm = _shared_memory().SharedMemory(name=result[1])
+            shm.close()
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ProcessPool:
+    """Run `CWMS` methods in worker processes with their own connections.
+
+    Parameters
+    ----------
+    cwms : CWMS
+        Connected object whose connection arguments the workers reuse.
+    processes : int
+        Number of worker processes (the default is None, one per CPU).
+    factory : callable
+        Called without arguments in each worker to create its `CWMS`
+        object, instead of connecting like `cwms` (the default is None).
+        Must be picklable, e.g. a module level function.
+    mp_context : multiprocessing.context.BaseContext
+        Context used to start workers (the default is None, the platform
+        default).  Workers always open their own connection, so `fork` is
+        safe as long as no thread holds a lock in the parent.
+
+    """
+
+    def __init__(self, cwms=None, processes=None, factory=None, mp_context=None):
+        if factory is None and cwms is None:
+            raise ValueError("ProcessPool needs a connected CWMS or a factory")
+        connect_kwargs = None
+        if factory is None:
+            connect_kwargs = cwms._worker_connect_kwargs()
+        self.processes = processes or os.cpu_count()
+        self.closed = False
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(factory, connect_kwargs),
+        )
+
+    def submit(self, name, timeout=None, **kwargs):
+        """Start `CWMS.<name>(**kwargs)` in a worker.
+
+        Parameters
+        ----------
+        name : str
+            Method name, e.g. "retrieve_ts".
+        timeout : float
+            Seconds from now the call must finish in, including time spent
+            waiting for a worker, see `CWMS.deadline` (the default is None,
+            no limit).
+        kwargs
+            Passed to the method.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future of the packed result, see `ProcessPool.result`.
+
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        return self._executor.submit(_run, name, kwargs, deadline)
+
+    @staticmethod
+    def result(future):
+        """The result of a future from `ProcessPool.submit`.
+
+        Results in shared memory are only freed when decoded here, so every
+        future submitted should be passed to `result`.
+        """
+        return _decode_result(future.result())
+
+    def map(self, name, calls, timeout=None):
+        """Run `CWMS.<name>` once for each dictionary of keyword arguments.
+
+        Parameters
+        ----------
+        name : str
+            Method name, e.g. "retrieve_ts".
+        calls : list of dict
+            Keyword arguments of each call.
+        timeout : float
+            Seconds allowed for all calls, including time spent waiting for
+            a worker (the default is None, no limit).
+
+        Returns
+        -------
+        list
+            Results in the order of `calls`.
+
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        futures = [
+            self._executor.submit(_run, name, kwargs, deadline) for kwargs in calls
+        ]
+        results = []
+        try:
+            for future in futures:
+                results.append(self.result(future))
+        finally:
+            # a failed call leaves the results after it undecoded
+            for future in futures[len(results) + 1 :]:
+                _discard(future)
+        return results
+
+    def retrieve_ts(
+        self,
+        p_cwms_ts_id,
+        start_time,
+        end_time,
+        parts=None,
+        p_units=None,
+        p_timezone="UTC",
+        p_trim="F",
+        p_start_inclusive="T",
+        p_end_inclusive="T",
+        p_previous="T",
+        p_next="F",
+        version_date=None,
+        p_max_version="T",
+        p_office_id=None,
+        return_df=True,
+        return_type=None,
+    ):
+        """`CWMS.retrieve_ts` with the time window split across workers.
+
+        The window is split as for `CWMS.retrieve_ts` with `parts`: the
+        sub-windows meet without overlap and are retrieved untrimmed, and
+        the stitched series is trimmed once.
+
+        Parameters
+        ----------
+        p_cwms_ts_id : str
+            The time series identifier to retrieve data for.
+        start_time : str
+            The start time of the time window.
+        end_time : str
+            The end time of the time window.
+        parts : int
+            Number of windows (the default is None, one per worker).
+        kwargs
+            As for `CWMS.retrieve_ts`.
+
+        Returns
+        -------
+        list, pandas df, numpy.ndarray, dict or pyarrow Table
+            Time series data, date_time, value, quality_code.
+
+        """
+        return_type = results.resolve(return_type, return_df)
+        p_start_time, p_end_time = _window(start_time, end_time)
+        windows = _parts(
+            p_start_time,
+            p_end_time,
+            parts or self.processes,
+            p_start_inclusive,
+            p_end_inclusive,
+            p_previous,
+            p_next,
+        )
+        calls = [
+            dict(
+                window,
+                p_cwms_ts_id=p_cwms_ts_id,
+                p_units=p_units,
+                p_timezone=p_timezone,
+                version_date=version_date,
+                p_max_version=p_max_version,
+                p_office_id=p_office_id,
+                return_type="dict",
+            )
+            for window in windows
+        ]
+        blocks = self.map("retrieve_ts_window", calls)
+        times, values, qualities = _stitch(
+            blocks,
+            p_start_time,
+            p_end_time,
+            p_trim,
+            p_start_inclusive,
+            p_end_inclusive,
+        )
+        return results.series(
+            return_type, times, values, qualities, p_cwms_ts_id, p_timezone, p_units
+        )
+
+    def retrieve_multi_ts(self, p_cwms_ts_id_list, start_time, end_time, **kwargs):
+        """`CWMS.retrieve_ts` for each series, one series per task.
+
+        Parameters
+        ----------
+        p_cwms_ts_id_list : list
+            List of time series identifiers.
+        start_time : str
+            The start time of the time window.
+        end_time : str
+            The end time of the time window.
+        kwargs
+            Passed to `CWMS.retrieve_ts`.
+
+        Returns
+        -------
+        list
+            One result per series.
+
+        """
+        calls = [
+            dict(kwargs, p_cwms_ts_id=ts_id, start_time=start_time, end_time=end_time)
+            for ts_id in p_cwms_ts_id_list
+        ]
+        return self.map("retrieve_ts", calls)
+
+    def shutdown(self, wait=True):
+        """Stop the workers and close their connections."""
+        self.closed = True
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Per-connection cache of cursors and Oracle object types
+"""
+import logging
+import threading
+
+LOGGER = logging.getLogger(__name__)
+
+
+class _Entry:
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = None
+        # arraysize and prefetchrows of a new cursor
+        self.defaults = None
+        self.types = {}
+
+
+class ConnectionRegistry:
+    """Cursors and object types kept for the life of each connection.
+
+    `CWMS` methods borrow a connection with `CWMS.acquire` and take their
+    cursor from the registry, so repeated calls reuse one cursor per
+    connection.  Because the PL/SQL call text is the same from call to call,
+    the connection's statement cache (see `stmtcachesize` in `CWMS.connect`)
+    also skips re-parsing it.  Object types such as
+    `CWMS_20.DATE_TABLE_TYPE` are described once per connection instead of
+    costing a round trip on every call.
+
+    A connection is only used by one thread at a time, so its cursor is
+    too.  Entries are dropped with `discard` when a connection goes away and
+    with `clear` when `CWMS.close` is called.  Session pools hand out a new
+    connection object on every acquire, so pooled connections are discarded
+    when released and their cursor and types last for one lease.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, conn):
+        entry = self._entries.get(id(conn))
+        if entry is None or entry.conn is not conn:
+            entry = _Entry(conn)
+            with self._lock:
+                self._entries[id(conn)] = entry
+        return entry
+
+    def cursor(self, conn):
+        """The cursor kept for `conn`, created on first use, with the fetch
+        sizes of a new cursor."""
+        entry = self._entry(conn)
+        if entry.cursor is None:
+            entry.cursor = conn.cursor()
+            entry.defaults = entry.cursor.arraysize, entry.cursor.prefetchrows
+        else:
+            # undo the fetch sizes tuned by the previous call
+            entry.cursor.arraysize, entry.cursor.prefetchrows = entry.defaults
+        return entry.cursor
+
+    def gettype(self, conn, name):
+        """The Oracle object type `name`, described once per connection."""
+        entry = self._entry(conn)
+        if name not in entry.types:
+            entry.types[name] = conn.gettype(name)
+        return entry.types[name]
+
+    def discard(self, conn):
+        """Close and forget everything kept for `conn`."""
+        with self._lock:
+            entry = self._entries.pop(id(conn), None)
+        if entry is None or entry.conn is not conn:
+            return
+        if entry.cursor is not None:
+            try:
+                entry.cursor.close()
+            except Exception as e:
+                # the connection may already be gone
+                LOGGER.debug(e)
+
+    def clear(self):
+        """Close and forget everything kept for all connections."""
+        for entry in list(self._entries.values()):
+            self.discard(entry.conn)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Return types of time series retrieval
+
+Time series come back as arrays of times, values and quality codes plus
+the series' `ts_id`, `time_zone` and `units`.  `return_type` picks the
+container:
+
+- `"df"`: pandas DataFrame, metadata repeated on every row (the default).
+- `"list"`: list of `(date_time, value, quality_code)` tuples.
+- `"numpy"`: NumPy structured array, metadata in `arr.dtype.metadata`.
+- `"dict"`: dictionary of NumPy arrays, metadata as plain values.
+- `"arrow"`: `pyarrow.Table`, metadata in the schema.
+
+Only `"df"` needs pandas and only `"arrow"` needs pyarrow.
+
+```python
+>>> arr = cwms.retrieve_ts(ts_id, "2019/1/1", "2019/9/1", return_type="numpy")
+>>> arr["value"].mean(), arr.dtype.metadata["units"]
+```
+"""
+import json
+
+from .utils import LazyModule
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+pa = LazyModule("pyarrow")
+
+RETURN_TYPES = ("df", "list", "numpy", "dict", "arrow")
+
+
+def resolve(return_type, return_df=True):
+    """`return_type`, defaulting to `"df"` or `"list"` from `return_df`."""
+    if return_type is None:
+        return "df" if return_df else "list"
+    if return_type not in RETURN_TYPES:
+        raise ValueError(f"return_type must be one of {RETURN_TYPES}")
+    return return_type
+
+
+def series(return_type, times, values, qualities, ts_id, time_zone, units=None):
+    """One series as `return_type`.
+
+    Parameters
+    ----------
+    return_type : str
+        One of `RETURN_TYPES`.
+    times, values, qualities : numpy.ndarray
+        `datetime64[ns]` times, `float64` values and `int64` quality codes.
+    ts_id, time_zone, units : str
+        Metadata of the series, `units` left out when None.
+
+    """
+    meta = {"time_zone": time_zone, "ts_id": ts_id}
+    if units:
+        meta["units"] = units
+    if return_type == "df":
+        df = pd.DataFrame(
+            {"date_time": times, "value": values, "quality_code": qualities}
+        )
+        for key, value in meta.items():
+            df[key] = value
+        return df
+    if return_type == "list":
+        times = times.astype("datetime64[us]").tolist()
+        values = [None if v != v else v for v in values.tolist()]
+        return list(zip(times, values, qualities.tolist()))
+    if return_type == "numpy":
+        dtype = np.dtype(
+            [
+                ("date_time", "datetime64[ns]"),
+                ("value", "float64"),
+                ("quality_code", "int64"),
+            ],
+            metadata=meta,
+        )
+        arr = np.empty(len(times), dtype=dtype)
+        arr["date_time"] = times
+        arr["value"] = values
+        arr["quality_code"] = qualities
+        return arr
+    if return_type == "dict":
+        return dict(date_time=times, value=values, quality_code=qualities, **meta)
+    return pa.table(
+        {
+            "date_time": pa.array(times),
+            "value": pa.array(values, from_pandas=True),
+            "quality_code": pa.array(qualities),
+        },
+        metadata={key: str(value) for key, value in meta.items()},
+    )
+
+
+def combine(return_type, results, ts_ids):
+    """Results of several series as one value.
+
+    `"df"` frames and `"list"` lists are returned as they are, `"numpy"`
+    and `"dict"` results as a dictionary by `ts_id` and `"arrow"` tables
+    as one table with a dictionary encoded `ts_id` column, so each id is
+    stored once.
+    """
+    if return_type in ("df", "list"):
+        return results
+    if return_type in ("numpy", "dict"):
+        return dict(zip(ts_ids, results))
+    if not results:
+        return pa.table({"date_time": [], "ts_id": [], "value": [], "quality_code": []})
+    indices = np.repeat(
+        np.arange(len(results), dtype="int32"), [t.num_rows for t in results]
+    )
+    tables = [t.replace_schema_metadata() for t in results]
+    table = pa.concat_tables(tables)
+    ts_id = pa.DictionaryArray.from_arrays(pa.array(indices), pa.array(list(ts_ids)))
+    table = table.add_column(1, "ts_id", ts_id)
+    units = {
+        ts: t.schema.metadata.get(b"units", b"").decode()
+        for ts, t in zip(ts_ids, results)
+    }
+    time_zone = results[0].schema.metadata[b"time_zone"].decode()
+    return table.replace_schema_metadata(
+        {"time_zone": time_zone, "units": json.dumps(units)}
+    )
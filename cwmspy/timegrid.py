@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Times of regular time series, computed locally
+
+A regular series has a value at every interval, shifted by its interval
+offset, so the times it has in a window follow from its interval,
+offset and, for local regular intervals, its time zone.  `time_grid`
+computes them as a NumPy array, the answer of
+`cwms_ts.get_times_for_time_window` without the round trip, and
+`time_grids` does so for many series at once, computing each distinct
+grid once.
+
+Intervals of minutes, hours and days count from midnight UTC, weeks from
+midnight UTC on Sunday, months, years and decades from their first day.
+Local regular intervals count the same way in local time, skipping times
+that do not exist when clocks go forward.  Where the database counts
+intervals of 2 to 6 days from has not been checked, so `time_grid`
+raises a ValueError for them and `CWMS.get_time_grids` asks the database,
+see `computed`.
+
+```python
+>>> import datetime
+>>> from cwmspy.timegrid import time_grid
+>>> start, end = datetime.datetime(2019, 3, 9, 12), datetime.datetime(2019, 3, 11)
+>>> time_grid(start, end, "1DayLocal", offset=7 * 60, local_time_zone="US/Pacific")
+array(['2019-03-09T15:00:00.000000000', '2019-03-10T14:00:00.000000000'],
+      dtype='datetime64[ns]')
+```
+"""
+
+from .intervals import interval_parts
+from .timezones import local_to_utc, to_utc, utc_to_local
+from .utils import LazyModule
+
+np = LazyModule("numpy")
+
+# Interval offsets CWMS stores for series without a defined offset
+UNDEFINED_OFFSETS = (-2147483648, 2147483647)
+
+# Midnight on a Sunday, where weeks start
+WEEK_ORIGIN = "2000-01-02"
+
+_UNITS = {"Minute": "m", "Hour": "h", "Day": "D", "Week": "W"}
+
+
+def computed(interval):
+    """Whether `time_grid` computes the times of an interval rather than
+    leave them to the database, all but intervals of 2 to 6 days."""
+    parts = interval_parts(interval)
+    return parts is None or not (parts[1] == "Day" and 1 < parts[0] < 7)
+
+
+def _fixed(start, end, count, unit, offset):
+    """Times `count` units apart, shifted by `offset`, from `start` to
+    `end`."""
+    step = np.timedelta64(count, _UNITS[unit]).astype("timedelta64[ns]")
+    origin = np.datetime64(WEEK_ORIGIN if unit == "Week" else "2000-01-01", "ns")
+    origin = origin + offset
+    first = -((origin - start) // step)
+    last = (end - origin) // step
+    return origin + step * np.arange(first, last + 1)
+
+
+def _calendar(start, end, count, unit, offset):
+    """Times `count` months, years or decades apart, shifted by `offset`,
+    from `start` to `end`."""
+    months = {"Month": 1, "Year": 12, "Decade": 120}[unit] * count
+    # one interval either side, the offset may move times across the window
+    first = (start - offset).astype("datetime64[M]").astype("int64") - months
+    last = (end - offset).astype("datetime64[M]").astype("int64") + months
+    # months since 1970-01, on multiples of the interval counted from year 0
+    first -= (first + 1970 * 12) % months
+    starts = np.arange(first, last + 1, months).astype("datetime64[M]")
+    times = starts.astype("datetime64[ns]") + offset
+    return times[(times >= start) & (times <= end)]
+
+
+def time_grid(
+    start_time, end_time, interval, offset=0, time_zone="UTC", local_time_zone=None
+):
+    """Times of a regular series in a time window.
+
+    Parameters
+    ----------
+    start_time, end_time : datetime
+        The time window, both ends included, in `time_zone`.
+    interval : str
+        Interval name, e.g. `1Hour`, `1Month` or `1DayLocal`.
+    offset : int
+        Interval offset in minutes, into the interval in UTC or, for local
+        regular intervals, in local time.
+    time_zone : str
+        Time zone of the window and the times returned.
+    local_time_zone : str
+        Time zone of a local regular interval (the default is None,
+        `time_zone`).
+
+    Returns
+    -------
+    numpy.ndarray
+        `datetime64[ns]` times in `time_zone`.
+
+    """
+    parts = interval_parts(interval)
+    if parts is None:
+        raise ValueError(f"{interval} is not a regular interval")
+    if not computed(interval):
+        raise ValueError(f"{interval} times are only known to the database")
+    count, unit, local = parts
+    if offset is None or offset in UNDEFINED_OFFSETS:
+        offset = 0
+    offset = np.timedelta64(int(offset), "m").astype("timedelta64[ns]")
+
+    window = np.array(
+        [to_utc(start_time, time_zone), to_utc(end_time, time_zone)],
+        dtype="datetime64[ns]",
+    )
+    zone = (local_time_zone or time_zone) if local else "UTC"
+    if zone.upper() != "UTC":
+        window = utc_to_local(window, zone)
+
+    grid = _fixed if unit in _UNITS else _calendar
+    times = grid(window[0], window[1], count, unit, offset)
+    if zone.upper() != "UTC":
+        times = local_to_utc(times, zone)
+        times = times[~np.isnat(times)]
+    if time_zone.upper() != "UTC":
+        times = utc_to_local(times, time_zone)
+    return times
+
+
+def time_grids(series, start_time, end_time, time_zone="UTC"):
+    """Times of many regular series in a time window.
+
+    Parameters
+    ----------
+    series : dict
+        Metadata by time series id, with `interval_id`,
+        `interval_utc_offset` and `time_zone_id` as from
+        `CWMS.get_ts_metadata`.
+    start_time, end_time : datetime
+        The time window, both ends included, in `time_zone`.
+    time_zone : str
+        Time zone of the window and the times returned.
+
+    Returns
+    -------
+    dict
+        `datetime64[ns]` times by time series id.  Series sharing an
+        interval, offset and local time zone share one array.
+
+    """
+    grids = {}
+    times = {}
+    for ts_id, meta in series.items():
+        key = (
+            meta["interval_id"],
+            meta["interval_utc_offset"],
+            meta.get("time_zone_id"),
+        )
+        if key not in grids:
+            grids[key] = time_grid(
+                start_time,
+                end_time,
+                key[0],
+                key[1],
+                time_zone=time_zone,
+                local_time_zone=key[2],
+            )
+        times[ts_id] = grids[key]
+    return times
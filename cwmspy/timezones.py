@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Time zone conversion of NumPy time arrays
+
+Time series are retrieved in UTC and converted to local time on the
+client, so one request serves series from many time zones.  Each zone's
+UTC offsets and the UTC times they start at are read once from pytz and
+cached; converting an array is then one `searchsorted` and one addition.
+
+```python
+>>> from cwmspy.timezones import utc_to_local
+>>> utc_to_local(df["date_time"].to_numpy(), "US/Pacific")
+```
+"""
+import datetime
+import functools
+
+from .utils import LazyModule
+
+np = LazyModule("numpy")
+pytz = LazyModule("pytz")
+
+
+@functools.lru_cache(maxsize=None)
+def transitions(zone):
+    """UTC times a zone's offsets start at, and the offsets.
+
+    Returns
+    -------
+    tuple
+        `datetime64[ns]` start of every offset but the first, and the
+        `timedelta64[ns]` offsets, one more than the starts.
+
+    """
+    tz = pytz.timezone(zone)
+    if not hasattr(tz, "_utc_transition_times"):
+        # fixed offset zones, UTC among them
+        offset = tz.utcoffset(datetime.datetime(2000, 1, 1))
+        return (
+            np.empty(0, dtype="datetime64[ns]"),
+            np.array([offset], dtype="timedelta64[ns]"),
+        )
+    # the first transition is at datetime.min, before any datetime64[ns]
+    starts = np.array(tz._utc_transition_times[1:], dtype="datetime64[ns]")
+    offsets = np.array(
+        [offset for offset, _, _ in tz._transition_info], dtype="timedelta64[ns]"
+    )
+    return starts, offsets
+
+
+def utc_to_local(times, zone):
+    """Naive UTC times as naive local times of `zone`.
+
+    Parameters
+    ----------
+    times : numpy.ndarray
+        `datetime64` times in UTC.
+    zone : str
+        Time zone name, e.g. `US/Pacific`.
+
+    Returns
+    -------
+    numpy.ndarray
+        `datetime64[ns]` local times.
+
+    """
+    times = np.asarray(times, dtype="datetime64[ns]")
+    starts, offsets = transitions(zone)
+    return times + offsets[np.searchsorted(starts, times, "right")]
+
+
+def local_to_utc(times, zone):
+    """Naive local times of `zone` as naive UTC times.
+
+    Times skipped when clocks go forward come back as NaT, times repeated
+    when they go back as one of their two UTC times.
+    """
+    times = np.asarray(times, dtype="datetime64[ns]")
+    starts, offsets = transitions(zone)
+    utc = times - offsets[np.searchsorted(starts, times, "right")]
+    # the offset at the UTC time, not at the local time read as UTC
+    for _ in range(2):
+        utc = times - offsets[np.searchsorted(starts, utc, "right")]
+    valid = utc + offsets[np.searchsorted(starts, utc, "right")] == times
+    return np.where(valid, utc, np.datetime64("NaT"))
+
+
+def to_utc(dt, zone):
+    """A naive local datetime of `zone` as a naive UTC datetime, the
+    standard time of ambiguous or missing times."""
+    if zone.upper() == "UTC":
+        return dt
+    local = pytz.timezone(zone).localize(dt, is_dst=False)
+    return local.astimezone(pytz.utc).replace(tzinfo=None)
@@ -1,6 +1,111 @@
 import functools
+import importlib
 from functools import wraps
 
+# Oracle errors raised when a session, or the network under it, is gone
+DISCONNECT_ERRORS = (
+    "ORA-00028",  # your session has been killed
+    "ORA-01012",  # not logged on
+    "ORA-02396",  # exceeded maximum idle time
+    "ORA-03113",  # end-of-file on communication channel
+    "ORA-03114",  # not connected to ORACLE
+    "ORA-03135",  # connection lost contact
+    "ORA-12537",  # TNS:connection closed
+    "ORA-12570",  # TNS:packet reader failure
+    "DPI-1010",  # not connected
+    "DPI-1080",  # connection was closed by ORA-%d
+    "DPY-1001",  # not connected to database
+    "DPY-4011",  # the database or network closed the connection
+)
+
+
+# Errors worth reconnecting and retrying a call for
+RECOVERABLE_ERRORS = DISCONNECT_ERRORS + (
+    "ORA-01033",  # initialization or shutdown in progress
+    "ORA-01034",  # ORACLE not available
+    "ORA-01089",  # immediate shutdown in progress
+    "ORA-12505",  # TNS:listener does not currently know of SID
+    "ORA-12514",  # TNS:listener does not currently know of service
+    "ORA-12528",  # TNS:all appropriate instances are blocking new connections
+    "ORA-12541",  # TNS:no listener
+    "ORA-12543",  # TNS:destination host unreachable
+    "DPY-6005",  # cannot connect to database
+)
+
+
+def is_disconnect(error):
+    """Whether `error` means the connection to the database was lost."""
+    message = str(error)
+    return any(code in message for code in DISCONNECT_ERRORS)
+
+
+def is_recoverable(error):
+    """Whether a call that failed with `error` can be retried after reconnecting."""
+    message = str(error)
+    return any(code in message for code in RECOVERABLE_ERRORS)
+
+
+def db_call(function=None, idempotent=True):
+    """Run a method that talks to the database through `CWMS._execute`.
+
+    A write that can not be repeated, e.g. creating or renaming a series,
+    is marked with `idempotent=False`.  A lost connection may have cut it
+    off after it committed, so it is only retried after errors raised
+    before it was sent, such as an unreachable listener.
+
+    Examples
+    -------
+    ```python
+    >>> @db_call(idempotent=False)
+    >>> def create_ts(self, p_cwms_ts_id): ...
+    ```
+    """
+    if function is None:
+        return functools.partial(db_call, idempotent=idempotent)
+    function.idempotent = idempotent
+
+    @wraps(function)
+    def wrapper(self, *args, **kwargs):
+        return self._execute(function, self, *args, **kwargs)
+
+    return wrapper
+
+
+def read_call(function):
+    """`db_call` for a method that only reads, which may run on a standby."""
+    function.readonly = True
+    return db_call(function)
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+
+    Keeps `import cwmspy` from paying for pandas, numpy and cx_Oracle
+    until a method actually needs them.
+
+    Examples
+    -------
+    ```python
+    >>> pd = LazyModule("pandas")  # nothing imported yet
+    >>> pd.DataFrame  # pandas is imported here
+    ```
+    """
+
+    def __init__(self, name):
+        self.__name = name
+        self.__module = None
+
+    def __getattr__(self, attr):
+        if self.__module is None:
+            self.__module = importlib.import_module(self.__name)
+        value = getattr(self.__module, attr)
+        # later lookups are plain attribute access
+        setattr(self, attr, value)
+        return value
+
+    def __repr__(self):
+        return f"<lazy module '{self.__name}'>"
+
 
 def log_decorator(logger):
     def real_decorator(function):
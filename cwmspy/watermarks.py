@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+High-water marks of incremental time series pulls
+
+`CWMS.retrieve_ts_changes` returns the values stored since the last pull
+of each series.  The last pull is remembered as a high-water mark per
+time series id: the latest store time (`data_entry_date`) seen and the
+latest value time, used for values stored without a store time, along
+with the values pulled just before the store time mark, which the next
+pull reads again in case others committed late.  Marks are kept in
+memory, or in a JSON file when given a path, so a polling
+job carries on where it stopped:
+
+```python
+>>> from cwmspy import CWMS
+>>> from cwmspy.watermarks import HighWaterMarks
+>>> marks = HighWaterMarks("~/.cache/cwmspy/poll.json")
+>>> df = cwms.retrieve_ts_changes(ts_ids, marks)  # only new values next time
+```
+"""
+
+import datetime
+import json
+import logging
+import os
+import tempfile
+import threading
+
+LOGGER = logging.getLogger(__name__)
+
+
+class HighWaterMarks:
+    """Latest store and value time pulled per time series id.
+
+    Parameters
+    ----------
+    path : str
+        JSON file the marks are read from and saved to (the default is
+        None, keep them in memory only).
+
+    """
+
+    def __init__(self, path=None):
+        self.path = os.path.expanduser(path) if path else None
+        self._lock = threading.Lock()
+        self._marks = {}
+        if self.path is not None:
+            try:
+                with open(self.path) as f:
+                    self._marks = json.load(f)
+            except FileNotFoundError:
+                pass
+
+    def get(self, p_cwms_ts_id):
+        """`(data_entry_date, date_time)` marks of a series, None if it was
+        never pulled."""
+        with self._lock:
+            mark = self._marks.get(p_cwms_ts_id)
+        if mark is None:
+            return None
+        return tuple(
+            None if t is None else datetime.datetime.fromisoformat(t)
+            for t in (mark.get("data_entry_date"), mark.get("date_time"))
+        )
+
+    def update(self, p_cwms_ts_id, data_entry_date, date_time):
+        """Move the marks of a series forward, never back."""
+        current = self.get(p_cwms_ts_id) or (None, None)
+        marks = [
+            new if old is None or (new is not None and new > old) else old
+            for new, old in zip((data_entry_date, date_time), current)
+        ]
+        with self._lock:
+            self._marks.setdefault(p_cwms_ts_id, {}).update(
+                data_entry_date=marks[0] and marks[0].isoformat(),
+                date_time=marks[1] and marks[1].isoformat(),
+            )
+
+    def seen(self, p_cwms_ts_id):
+        """`(date_time, data_entry_date)` of the values of a series pulled
+        shortly before its store time mark."""
+        with self._lock:
+            mark = self._marks.get(p_cwms_ts_id) or {}
+            seen = mark.get("seen", [])
+        return {tuple(datetime.datetime.fromisoformat(t) for t in key) for key in seen}
+
+    def remember(self, p_cwms_ts_id, seen):
+        """Keep the `(date_time, data_entry_date)` of the values of a series
+        pulled shortly before its store time mark, see `seen`."""
+        with self._lock:
+            self._marks.setdefault(p_cwms_ts_id, {})["seen"] = sorted(
+                [t.isoformat() for t in key] for key in seen
+            )
+
+    def forget(self, p_cwms_ts_id):
+        """Pull a series as if for the first time next time."""
+        with self._lock:
+            self._marks.pop(p_cwms_ts_id, None)
+
+    def __contains__(self, p_cwms_ts_id):
+        with self._lock:
+            return p_cwms_ts_id in self._marks
+
+    def __len__(self):
+        with self._lock:
+            return len(self._marks)
+
+    def save(self):
+        """Write the marks to `path`, replacing the file in one step."""
+        if self.path is None:
+            return
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._marks, f)
+            os.replace(tmp, self.path)
+        LOGGER.info(f"Saved {len(self)} high-water marks to {self.path}")
@@ -23,7 +23,12 @@ REQUIRED = ["cx_oracle", "pandas", "python-dotenv", "pyyaml"]
 
 
 # What packages are optional?
-EXTRAS = {"Auto documentation with pdoc": ["pdoc"], "Tests": ["pytest"]}
+EXTRAS = {
+    "Auto documentation with pdoc": ["pdoc"],
+    "Tests": ["pytest"],
+    "Arrow results from worker processes": ["pyarrow"],
+    "python-oracledb thin mode and Arrow fetch": ["oracledb>=3", "pyarrow"],
+}
 
 # The rest you shouldn't have to touch too much :)
 # ------------------------------------------------
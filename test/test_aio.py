@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+import pytest
+
+from cwmspy import CWMS, AsyncCWMS
+from cwmspy.drivers.fake import FakeDatabase, FakeSessionPool
+
+TS_ID = "CWMSPY.Flow.Inst.1Hour.0.REV"
+
+
+@pytest.fixture()
+def db():
+    return FakeDatabase()
+
+
+def test_gather_fan_out(db):
+    """
+    AsyncCWMS: Concurrent coroutines share a bounded pool of sessions
+    """
+    pool = FakeSessionPool(db, max=4, latency=0.01)
+    cwms = AsyncCWMS(CWMS(pool=pool))
+
+    async def main():
+        return await asyncio.gather(
+            *[
+                cwms.retrieve_ts(f"{TS_ID}-{i}", "2019/1/1", "2019/1/2")
+                for i in range(100)
+            ]
+        )
+
+    results = asyncio.run(main())
+
+    assert len(results) == 100
+    assert db.collisions == 0
+    assert pool.max_busy <= 4
+
+
+def test_cancel_interrupts_call(db):
+    """
+    AsyncCWMS: Cancelling a coroutine cancels the database call
+    """
+    pool = FakeSessionPool(db, max=1, latency=5)
+    cwms = AsyncCWMS(CWMS(pool=pool))
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2"), 0.2)
+
+    start = time.monotonic()
+    asyncio.run(main())
+    cwms._executor.shutdown(wait=True)
+
+    assert db.cancels == 1
+    assert time.monotonic() - start < 2
+    assert pool.busy == 0
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+import datetime
+import os
+import shutil
+import stat
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cwmspy import CWMS
+from cwmspy import broker as broker_module
+from cwmspy.broker import Broker, BrokerClient
+from cwmspy.drivers.fake import FakeDatabase, FakeSessionPool
+from cwmspy.watermarks import HighWaterMarks
+
+TS_ID = "CWMSPY.Flow.Inst.1Hour.0.REV"
+
+
+@pytest.fixture()
+def broker():
+    db = FakeDatabase()
+    pool = FakeSessionPool(db, max=2)
+    # socket paths are limited to about 100 characters
+    tmp = tempfile.mkdtemp(prefix="cwmspy")
+    path = os.path.join(tmp, "broker.sock")
+    server = Broker(CWMS(pool=pool), path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, pool
+    server.shutdown()
+    server.server_close()
+    shutil.rmtree(tmp)
+
+
+def test_calls_forwarded(broker):
+    """
+    broker: Calls run in the broker without a local connection
+    """
+    server, pool = broker
+    cwms = CWMS()
+    assert cwms.connect(broker=server.server_address)
+    assert cwms.conn is None and cwms.pool is None
+    assert cwms.is_open(ttl=0)
+
+    times = [datetime.datetime(2019, 1, 1)]
+    cwms.store_ts(TS_ID, "cms", times, [1.0], "UTC")
+    df = cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/2/1")
+    assert list(df["value"]) == [1.0]
+
+    cwms.close()
+    assert cwms.is_closed()
+
+
+def test_many_clients_share_pool(broker):
+    """
+    broker: Many clients and threads use the broker's few sessions
+    """
+    server, pool = broker
+    clients = [CWMS() for _ in range(4)]
+    for cwms in clients:
+        assert cwms.connect(broker=server.server_address)
+
+    def call(i):
+        cwms = clients[i % len(clients)]
+        return len(cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/2/1"))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(call, range(40))) == [0] * 40
+    assert pool.max_busy <= 2
+    assert pool.opened <= 2
+
+    for cwms in clients:
+        cwms.close()
+
+
+def test_errors_forwarded(broker):
+    """
+    broker: Errors come back as ValueError and private names are refused
+    """
+    server, pool = broker
+    cwms = CWMS()
+    cwms.connect(broker=server.server_address)
+    with pytest.raises(ValueError, match="not implemented"):
+        cwms.get_ts_code(TS_ID, p_db_office_code=1)
+    with pytest.raises(ValueError):
+        cwms.broker.call("_execute")
+    cwms.close()
+
+
+def test_socket_private(broker):
+    """
+    broker: Only the owner can use the socket
+    """
+    server, pool = broker
+    mode = stat.S_IMODE(os.stat(server.server_address).st_mode)
+    assert mode & 0o077 == 0
+
+
+def test_client_checks_socket(broker):
+    """
+    broker: Clients refuse a socket other users can write to
+    """
+    server, pool = broker
+    assert BrokerClient(server.server_address).ping()
+
+    os.chmod(server.server_address, 0o666)
+    client = BrokerClient(server.server_address)
+    with pytest.raises(ValueError, match="accessible to other users"):
+        client.call("ping")
+    assert not client.ping()
+
+
+def test_default_path_private(tmp_path, monkeypatch):
+    """
+    broker: The default socket is in a directory only the user can use
+    """
+    monkeypatch.delenv("CWMSPY_BROKER", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    path = broker_module.default_path()
+    directory = os.path.dirname(path)
+    assert directory.startswith(str(tmp_path))
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+
+    os.chmod(directory, 0o777)
+    with pytest.raises(PermissionError):
+        broker_module.default_path()
+
+
+def test_fallback_without_broker(tmp_path, monkeypatch):
+    """
+    broker: A missing broker falls back to a direct connection
+    """
+    monkeypatch.delenv("CWMSPY_HOST", raising=False)
+    cwms = CWMS()
+    with pytest.raises(ValueError, match="Missing host"):
+        cwms.connect(broker=str(tmp_path / "missing.sock"))
+    assert cwms.broker is None
+
+
+def test_changes_through_broker(broker):
+    """
+    broker: retrieve_ts_changes keeps its high-water marks in the client
+    """
+    server, pool = broker
+    cwms = CWMS()
+    cwms.connect(broker=server.server_address)
+    marks = HighWaterMarks()
+    since = datetime.datetime(2018, 1, 1)
+
+    cwms.store_ts(TS_ID, "cms", [datetime.datetime(2019, 1, 1)], [1.0], "UTC")
+    assert len(cwms.retrieve_ts_changes([TS_ID], marks, since)) == 1
+    assert marks.get(TS_ID)[0] is not None
+    assert len(cwms.retrieve_ts_changes([TS_ID], marks, since)) == 0
+    cwms.close()
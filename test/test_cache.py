@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.cache import DiskCache, MemoryCache
+from cwmspy.drivers.fake import FakeConnection, FakeDatabase
+from cwmspy.timezones import utc_to_local
+
+TS_ID = "CWMSPY.Flow.Inst.1Hour.0.REV"
+START = datetime.datetime(2018, 12, 30)
+
+
+def hours(first, last):
+    return {
+        START + datetime.timedelta(hours=h): (float(h), 0) for h in range(first, last)
+    }
+
+
+@pytest.fixture()
+def db():
+    db = FakeDatabase()
+    db.data[TS_ID] = hours(0, 24 * 4)
+    return db
+
+
+def reads(db):
+    return [c for c in db.calls if c == "cwms_ts.retrieve_ts"]
+
+
+def test_served_from_disk(db, tmp_path):
+    """
+    cache: A repeated read does not fetch the series again
+    """
+    plain = CWMS(conn=FakeConnection(db))
+    cwms = CWMS(conn=FakeConnection(db), cache=str(tmp_path))
+    window = (TS_ID, "2018/12/31", "2019/1/1")
+
+    first = cwms.retrieve_ts(*window, p_next="T")
+    second = cwms.retrieve_ts(*window, p_next="T")
+
+    pd.testing.assert_frame_equal(first, plain.retrieve_ts(*window, p_next="T"))
+    pd.testing.assert_frame_equal(second, first)
+    assert len(reads(db)) == 2
+    # another object on the same directory reads the files
+    other = CWMS(conn=FakeConnection(db), cache=DiskCache(str(tmp_path)))
+    pd.testing.assert_frame_equal(other.get_por(TS_ID), plain.get_por(TS_ID))
+    assert len(reads(db)) == 3
+
+
+def test_incremental_refresh(db, tmp_path):
+    """
+    cache: Only values after the high-water mark are fetched
+    """
+    cwms = CWMS(conn=FakeConnection(db), cache=DiskCache(str(tmp_path), max_age=0))
+    cwms.get_por(TS_ID)
+    db.data[TS_ID].update(hours(24 * 4, 24 * 5))
+
+    df = cwms.get_por(TS_ID)
+
+    assert len(df) == 24 * 5
+    assert df["date_time"].is_unique
+    # the second fetch started after the cached values
+    assert db.calls[-1] == "cwms_ts.retrieve_ts"
+    assert len(reads(db)) == 2
+
+
+def test_store_invalidates(db, tmp_path):
+    """
+    cache: Storing a series drops its cached copy
+    """
+    cwms = CWMS(conn=FakeConnection(db), cache=str(tmp_path))
+    cwms.retrieve_ts(TS_ID, "2018/12/31", "2018/12/31")
+    cwms.store_ts(TS_ID, "cms", [START], [-1.0], "UTC")
+
+    df = cwms.get_por(TS_ID)
+    with cwms.primary():
+        cwms.retrieve_ts(TS_ID, "2018/12/31", "2018/12/31")
+
+    assert df["value"].iloc[0] == -1.0
+    assert len(reads(db)) == 3
+
+
+def test_shared_cache_consistent(db, tmp_path):
+    """
+    cache: Refreshes of one series by several processes keep one copy of each
+    value, and ids are invalidated whatever their case
+    """
+    cwms = CWMS(conn=FakeConnection(db), cache=DiskCache(str(tmp_path)))
+    cwms.get_por(TS_ID)
+    cache = cwms.cache
+    directory = cache._directory(TS_ID, [None, "UTC", "1111/11/11", "T", None])
+    block = {
+        "date_time": pd.to_datetime(list(hours(24 * 3, 24 * 4))).to_numpy(),
+        "value": np.ones(24),
+        "quality_code": np.zeros(24, dtype="int64"),
+    }
+    # a second process appending the block the first one already did
+    cache._append(directory, block)
+    df = cwms.get_por(TS_ID)
+    assert len(df) == 24 * 4 and df["date_time"].is_unique
+    assert (df["value"].iloc[-24:] == 1.0).all()
+
+    cache.invalidate(TS_ID.lower())
+    cwms.get_por(TS_ID)
+    assert len(reads(db)) == 2
+
+
+def test_memory_cache_fetches_gaps(db):
+    """
+    cache: Overlapping windows only fetch what is not in memory
+    """
+    plain = CWMS(conn=FakeConnection(db))
+    cwms = CWMS(conn=FakeConnection(db), cache=MemoryCache())
+    day = datetime.timedelta(days=1)
+    first = (START + day, START + 2 * day)
+    second = (START + day * 1.5, START + 3 * day)
+
+    expected = plain.retrieve_ts_window(TS_ID, *second)
+    around = plain.retrieve_ts_window(TS_ID, *first, p_next="T")
+    cwms.cache.retrieve(cwms, TS_ID, *first)
+    fetched = len(reads(db))
+    df = cwms.cache.retrieve(cwms, TS_ID, *second)
+
+    pd.testing.assert_frame_equal(df, expected)
+    # only the hours after the first window
+    assert len(reads(db)) == fetched + 1
+    df = cwms.cache.retrieve(cwms, TS_ID, *first, p_next="T")
+    pd.testing.assert_frame_equal(df, around)
+    assert len(reads(db)) == fetched + 1
+    assert cwms.cache.stats()["hits"] == 1
+
+
+def test_memory_cache_windows(db):
+    """
+    cache: MemoryCache reads match the database
+    """
+    plain = CWMS(conn=FakeConnection(db))
+    cwms = CWMS(conn=FakeConnection(db), cache=MemoryCache())
+    windows = [
+        ("2018/12/31", "2019/1/1", {}),
+        ("2018/12/30 12:00", "2019/1/2", {"p_next": "T"}),
+        ("2018/12/31", "2019/1/1", {"p_start_inclusive": "F", "p_previous": "F"}),
+        ("2019/1/1", "2019/1/5", {"p_next": "T", "p_end_inclusive": "F"}),
+    ]
+    for start, end, kwargs in windows:
+        pd.testing.assert_frame_equal(
+            cwms.retrieve_ts(TS_ID, start, end, **kwargs),
+            plain.retrieve_ts(TS_ID, start, end, **kwargs),
+        )
+    pd.testing.assert_frame_equal(cwms.get_por(TS_ID), plain.get_por(TS_ID))
+    stats = cwms.cache.stats()
+    assert stats["hits"] >= 1 and stats["series"] == 1
+
+    cwms.store_ts(TS_ID, "cms", [START], [-1.0], "UTC")
+    assert cwms.cache.stats()["series"] == 0
+
+
+def test_memory_cache_eviction(db):
+    """
+    cache: Series least recently used are dropped over the byte budget
+    """
+    other = "CWMSPY.Stage.Inst.1Hour.0.REV"
+    db.data[other] = hours(0, 24)
+    cwms = CWMS(conn=FakeConnection(db), cache=MemoryCache(max_bytes=2000))
+
+    cwms.retrieve_ts(TS_ID, "2018/12/30", "2019/1/2")
+    cwms.retrieve_ts(other, "2018/12/30", "2018/12/31")
+
+    stats = cwms.cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["series"] == 1 and stats["bytes"] <= 2000
+
+
+def test_memory_cache_local_time(db):
+    """
+    cache: MemoryCache keeps UTC and converts each request, keeping both
+    hours repeated when clocks go back
+    """
+    # clocks go back at 2018-11-04 09:00 UTC in US/Pacific
+    db.data[TS_ID] = {
+        datetime.datetime(2018, 11, 4) + datetime.timedelta(hours=h): (float(h), 0)
+        for h in range(24)
+    }
+    day = (datetime.datetime(2018, 11, 4), datetime.datetime(2018, 11, 4, 23))
+    plain = CWMS(conn=FakeConnection(db))
+    cwms = CWMS(conn=FakeConnection(db), cache=MemoryCache())
+    expected = plain.retrieve_ts_window(TS_ID, *day)
+    expected["date_time"] = utc_to_local(expected["date_time"], "US/Pacific")
+    expected["time_zone"] = "US/Pacific"
+
+    cwms.cache.retrieve(cwms, TS_ID, *day)
+    fetched = len(reads(db))
+    df = cwms.cache.retrieve(
+        cwms,
+        TS_ID,
+        datetime.datetime(2018, 11, 3, 17),
+        datetime.datetime(2018, 11, 4, 15),
+        p_timezone="US/Pacific",
+    )
+
+    pd.testing.assert_frame_equal(df, expected)
+    assert (df["date_time"].dt.hour == 1).sum() == 2
+    # the same values, in another time zone
+    assert len(reads(db)) == fetched
+
+
+def test_memory_cache_nothing_around(db):
+    """
+    cache: A window without values before or after it is only looked up once
+    """
+    cache = MemoryCache()
+    cwms = CWMS(conn=FakeConnection(db), cache=cache)
+    end = START + datetime.timedelta(hours=24 * 4 - 1)
+
+    for _ in range(2):
+        df = cache.retrieve(cwms, TS_ID, START, START + datetime.timedelta(hours=2))
+        assert len(df) == 3
+        df = cache.retrieve(cwms, TS_ID, end, end, p_previous="F", p_next="T")
+        assert len(df) == 1
+
+    assert cwms.cache.stats()["misses"] == 2
+    assert cwms.cache.stats()["hits"] == 2
+    assert len(reads(db)) == 4
+
+    cwms.cache.invalidate(TS_ID.lower())
+    assert cwms.cache.stats()["series"] == 0
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.catalog import TsCatalog
+from cwmspy.drivers.fake import FakeConnection, FakeDatabase
+
+FLOW = "CWMSPY.Flow.Inst.1Hour.0.REV"
+STAGE = "CWMSPY.Stage.Inst.15Minutes.0.REV"
+MISSING = "CWMSPY.Elev.Inst.1Hour.0.REV"
+
+
+@pytest.fixture()
+def db():
+    db = FakeDatabase()
+    db.data[FLOW] = {}
+    db.data[STAGE] = {}
+    return db
+
+
+def lookups(db):
+    return [s for s in db.statements if "from cwms_v_ts_id" in s]
+
+
+def test_bulk_lookup(db):
+    """
+    catalog: Many ids take one query and are remembered, found or not
+    """
+    cwms = CWMS(conn=FakeConnection(db))
+
+    meta = cwms.get_ts_metadata([FLOW, STAGE.upper(), MISSING])
+    assert meta[MISSING] is None
+    assert meta[FLOW]["ts_code"] == 1 and meta[FLOW]["interval_id"] == "1Hour"
+    assert meta[STAGE.upper()]["cwms_ts_id"] == STAGE
+    assert len(lookups(db)) == 1
+
+    assert cwms.get_ts_code(STAGE) == "2"
+    with pytest.raises(ValueError, match="TS_ID_NOT_FOUND"):
+        cwms.get_ts_code(MISSING)
+    assert len(lookups(db)) == 1
+    assert "cwms_ts.get_ts_code" not in db.calls
+
+    cwms.get_ts_metadata([FLOW], refresh=True)
+    assert len(lookups(db)) == 2
+
+
+def test_expiry_and_invalidation(db):
+    """
+    catalog: Entries expire and are dropped when a series is created
+    """
+    cwms = CWMS(conn=FakeConnection(db), catalog=TsCatalog(ttl=60, negative_ttl=0))
+
+    cwms.get_ts_metadata([FLOW, MISSING])
+    cwms.get_ts_metadata([FLOW, MISSING])
+    # only the unknown id is looked up again
+    assert len(lookups(db)) == 2
+    assert len(cwms.catalog) == 2
+
+    cwms.catalog.negative_ttl = 300
+    cwms.store_ts(MISSING, "ft", [0], [1.0], "UTC")
+    assert cwms.get_ts_metadata([MISSING])[MISSING]["ts_code"] == 1
+
+
+def test_without_catalog(db):
+    """
+    catalog: catalog=False looks every id up
+    """
+    cwms = CWMS(conn=FakeConnection(db), catalog=False)
+    cwms.get_ts_metadata([FLOW])
+    cwms.get_ts_metadata([FLOW])
+    assert len(lookups(db)) == 2
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from cwmspy import config
+
+LIST_CONFIG = """
+- name: prod
+  host: prod-host
+  service_name: PROD
+  user: user
+  password: password
+"""
+
+MAPPING_CONFIG = """
+prod:
+  host: prod-host
+  service_name: PROD
+  office: NWDP
+  pool: true
+  pool_max: 8
+  call_timeout: 30000
+test:
+  dsn: TEST
+  office: NWDM
+"""
+
+
+@pytest.fixture()
+def env_file(tmp_path):
+    config.clear_cache()
+    path = tmp_path / ".env"
+    yield path
+    config.clear_cache()
+
+
+def test_list_profiles(env_file):
+    """
+    config: The original list of named profiles is still read
+    """
+    env_file.write_text(LIST_CONFIG)
+    profile = config.get_profile("prod", str(env_file))
+    assert profile["host"] == "prod-host"
+    assert "name" not in profile
+
+
+def test_mapping_profiles(env_file):
+    """
+    config: Several databases and offices in one file
+    """
+    env_file.write_text(MAPPING_CONFIG)
+    profiles = config.load_profiles(str(env_file))
+    assert sorted(profiles) == ["prod", "test"]
+    assert profiles["prod"]["pool_max"] == 8
+    assert profiles["test"]["office"] == "NWDM"
+
+
+def test_profiles_cached(env_file, monkeypatch):
+    """
+    config: The file is parsed once until it changes
+    """
+    env_file.write_text(MAPPING_CONFIG)
+    parsed = []
+    parse = config._parse
+    monkeypatch.setattr(config, "_parse", lambda p: parsed.append(p) or parse(p))
+    monkeypatch.setattr(config, "CHECK_INTERVAL", 0)
+
+    for _ in range(50):
+        config.get_profile("prod", str(env_file))
+    assert len(parsed) == 1
+
+    env_file.write_text(MAPPING_CONFIG.replace("pool_max: 8", "pool_max: 16"))
+    stat = os.stat(env_file)
+    os.utime(env_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert config.get_profile("prod", str(env_file))["pool_max"] == 16
+    assert len(parsed) == 2
+
+
+def test_profile_copy(env_file):
+    """
+    config: Changing a returned profile does not change the cache
+    """
+    env_file.write_text(MAPPING_CONFIG)
+    config.get_profile("prod", str(env_file))["host"] = "other"
+    assert config.get_profile("prod", str(env_file))["host"] == "prod-host"
+
+
+def test_missing_profile(env_file):
+    """
+    config: Unknown profile names raise ValueError
+    """
+    env_file.write_text(MAPPING_CONFIG)
+    with pytest.raises(ValueError):
+        config.get_profile("missing", str(env_file))
@@ -57,6 +57,37 @@ class TestClass(object):
 
         assert c == True
 
+    def test_connect_pool(self):
+        """
+        connect: Testing session pool with session settings applied
+        """
+
+        cwms = CWMS()
+        c = cwms.connect(
+            host=self.host,
+            service_name=self.service_name,
+            port=1521,
+            user=self.user,
+            password=self.password,
+            pool=True,
+            pool_min=1,
+            pool_max=2,
+        )
+        assert c == True
+        assert cwms.conn is None
+
+        with cwms.acquire() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """select value from nls_session_parameters
+                   where parameter = 'NLS_DATE_FORMAT'"""
+            )
+            nls_date_format = cur.fetchone()[0]
+            cur.close()
+        assert nls_date_format == "YYYY-MM-DD HH24:MI:SS"
+
+        assert cwms.close() == True
+
     def test_final(self):
         """
         close: Testing good close from db
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import datetime
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.drivers.fake import FakeConnection, FakeDatabase, FakeError, FakeSessionPool
+
+TS_ID = "CWMSPY.Flow.Inst.1Hour.0.REV"
+
+
+@pytest.fixture()
+def db():
+    return FakeDatabase()
+
+
+def test_deadline_sets_call_timeout(db):
+    """
+    deadline: A slow call is interrupted when the deadline passes
+    """
+    conn = FakeConnection(db, latency=5)
+    cwms = CWMS(conn=conn)
+
+    start = time.monotonic()
+    with pytest.raises(ValueError, match="DPI-1067"):
+        with cwms.deadline(0.2):
+            cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+    assert time.monotonic() - start < 1
+    # the timeout only applied while the deadline was set
+    assert conn.callTimeout == 0
+
+
+def test_deadline_param(db):
+    """
+    get_por: The deadline argument bounds the whole method
+    """
+    cwms = CWMS(conn=FakeConnection(db, latency=5))
+
+    start = time.monotonic()
+    with pytest.raises(ValueError):
+        cwms.get_por(TS_ID, deadline=0.2)
+    assert time.monotonic() - start < 1
+
+
+def test_store_by_df_stops_at_deadline(db):
+    """
+    store_by_df: Skipped errors do not hide a passed deadline
+    """
+    cwms = CWMS(conn=FakeConnection(db, latency=0.1))
+    df = pd.DataFrame(
+        {
+            "ts_id": [f"{TS_ID}-{i}" for i in range(20)],
+            "units": "cms",
+            "time_zone": "UTC",
+            "date_time": datetime.datetime(2019, 1, 1),
+            "value": 1.0,
+        }
+    )
+
+    start = time.monotonic()
+    with pytest.raises(ValueError, match="Deadline exceeded"):
+        cwms.store_by_df(df, only_add_different=False, deadline=0.35)
+    assert time.monotonic() - start < 1
+    assert 0 < len(db.data) < 20
+
+
+def test_deadline_stops_retries(db):
+    """
+    deadline: Retries give up when the backoff would pass the deadline
+    """
+    cwms = CWMS(pool=FakeSessionPool(db), retry_backoff=1)
+    db.errors.append(FakeError("ORA-03113: end-of-file on communication channel"))
+
+    start = time.monotonic()
+    with pytest.raises(ValueError, match="ORA-03113"):
+        with cwms.deadline(0.5):
+            cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+    assert time.monotonic() - start < 0.5
+
+
+def test_nested_deadline_keeps_shorter(db):
+    """
+    deadline: An inner deadline can not extend the outer one
+    """
+    cwms = CWMS(conn=FakeConnection(db))
+    with cwms.deadline(0.1):
+        with cwms.deadline(60):
+            assert cwms._remaining() <= 0.1
+        assert cwms._remaining() <= 0.1
+    assert cwms._remaining() is None
+
+
+def test_cancel_from_other_thread(db):
+    """
+    cancel: Another thread can interrupt a running call
+    """
+    cwms = CWMS(pool=FakeSessionPool(db, latency=5))
+    errors = []
+
+    def call():
+        try:
+            cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+        except ValueError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=call)
+    thread.start()
+    while not cwms._leases:
+        time.sleep(0.01)
+    assert cwms.cancel(thread.ident) == 1
+    thread.join(1)
+
+    assert not thread.is_alive()
+    assert "ORA-01013" in str(errors[0])
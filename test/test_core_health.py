@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import time
+
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.drivers.fake import FakeConnection, FakeDatabase, FakeError
+
+TS_ID = "CWMSPY.Flow.Inst.1Hour.0.REV"
+
+
+@pytest.fixture()
+def db():
+    return FakeDatabase()
+
+
+def test_is_open_uses_cached_health(db):
+    """
+    is_open: Only the first check pings, successful calls refresh the state
+    """
+    cwms = CWMS(conn=FakeConnection(db), health_ttl=60)
+
+    assert cwms.is_open()
+    assert db.pings == 1
+
+    cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+    assert cwms.is_open()
+    assert not cwms.is_closed()
+    assert db.pings == 1
+
+    assert cwms.is_open(ttl=0)
+    assert db.pings == 2
+
+
+def test_disconnect_marks_unhealthy(db):
+    """
+    is_open: A lost connection during a call is remembered without a ping
+    """
+    cwms = CWMS(conn=FakeConnection(db), health_ttl=60)
+    db.errors.append(FakeError("ORA-03113: end-of-file on communication channel"))
+
+    with pytest.raises(ValueError):
+        cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+
+    assert cwms.is_closed()
+    assert db.pings == 0
+
+
+def test_other_errors_keep_health(db):
+    """
+    is_open: Application errors do not mark the connection as lost
+    """
+    cwms = CWMS(conn=FakeConnection(db), health_ttl=60)
+    db.errors.append(FakeError("ORA-20001: TS_ID_NOT_FOUND"))
+
+    with pytest.raises(ValueError):
+        cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+
+    assert cwms.is_open()
+    assert db.pings == 0
+
+
+def test_keepalive_pings_idle_connection(db):
+    """
+    start_keepalive: Idle connections are pinged in the background
+    """
+    cwms = CWMS(conn=FakeConnection(db), health_ttl=60)
+    cwms.start_keepalive(interval=0.01)
+    time.sleep(0.2)
+    cwms.stop_keepalive()
+
+    assert db.pings > 0
+    assert cwms.is_open()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import pandas as pd
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.drivers.fake import FakeConnection, FakeDatabase, FakeError, FakeSessionPool
+
+TS_ID = "CWMSPY.Flow.Inst.1Hour.0.REV"
+LOST = "ORA-03113: end-of-file on communication channel"
+
+
+@pytest.fixture()
+def db():
+    return FakeDatabase()
+
+
+def store_calls(db):
+    return [c for c in db.calls if c == "cwms_ts.store_ts"]
+
+
+def test_retry_after_lost_session(db):
+    """
+    _execute: A dropped session is replaced and only the failed call retried
+    """
+    pool = FakeSessionPool(db, max=2)
+    cwms = CWMS(pool=pool, retry_backoff=0)
+    db.errors.append(FakeError(LOST))
+
+    df = cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+
+    assert df.empty
+    assert db.calls == ["cwms_ts.retrieve_ts", "cwms_ts.retrieve_ts"]
+    assert pool.busy == 0
+    assert pool.opened == 1
+
+
+def test_store_by_df_resumes(db):
+    """
+    store_by_df: Groups stored before the failure are not stored again
+    """
+    cwms = CWMS(pool=FakeSessionPool(db, max=2), retry_backoff=0)
+    times = pd.date_range(datetime.datetime(2019, 1, 1), periods=24, freq="H")
+    df = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "ts_id": f"{TS_ID}-{i}",
+                    "units": "cms",
+                    "time_zone": "UTC",
+                    "date_time": times,
+                    "value": float(i),
+                }
+            )
+            for i in range(3)
+        ]
+    )
+    db.errors.extend([None, FakeError(LOST)])
+
+    cwms.store_by_df(df, only_add_different=False)
+
+    assert len(store_calls(db)) == 4
+    assert sorted(db.data) == [f"{TS_ID}-{i}" for i in range(3)]
+
+
+def test_no_retry_for_application_errors(db):
+    """
+    _execute: Errors that are not recoverable are raised right away
+    """
+    cwms = CWMS(pool=FakeSessionPool(db, max=2), retry_backoff=0)
+    db.errors.append(FakeError("ORA-20001: TS_ID_NOT_FOUND"))
+
+    with pytest.raises(ValueError):
+        cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+    assert db.calls == ["cwms_ts.retrieve_ts"]
+
+
+def test_gives_up_after_retries(db):
+    """
+    _execute: Recoverable errors are raised once retries are exhausted
+    """
+    cwms = CWMS(conn=FakeConnection(db), retries=2, retry_backoff=0)
+    db.errors.extend([FakeError(LOST)] * 3)
+
+    with pytest.raises(ValueError):
+        cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+    # a connection passed to CWMS cannot be replaced, so no retries
+    assert len(db.calls) == 1
+
+
+def test_no_retry_for_writes_cut_off(db):
+    """
+    _execute: Writes that can not be repeated are not retried after a lost
+    connection, only after errors raised before they were sent
+    """
+    cwms = CWMS(pool=FakeSessionPool(db, max=2), retry_backoff=0)
+    db.errors.append(FakeError(LOST))
+    with pytest.raises(ValueError, match="ORA-03113"):
+        cwms.delete_ts(TS_ID)
+    assert db.calls == ["cwms_ts.delete_ts"]
+
+    db.errors.append(FakeError("ORA-12541: TNS:no listener"))
+    cwms.delete_ts(TS_ID)
+    assert db.calls == ["cwms_ts.delete_ts"] * 3
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import datetime
+import time
+
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.drivers.fake import FakeDatabase, FakeError, FakeSessionPool
+
+TS_ID = "CWMSPY.Flow.Inst.1Hour.0.REV"
+TIMES = [datetime.datetime(2019, 1, 1)]
+
+
+@pytest.fixture()
+def dbs():
+    return FakeDatabase(), FakeDatabase()
+
+
+def test_reads_go_to_standby(dbs):
+    """
+    standby: Reads run on the standby, writes on the primary
+    """
+    primary, standby = dbs
+    cwms = CWMS(pool=FakeSessionPool(primary), standby=[FakeSessionPool(standby)])
+
+    cwms.store_ts(TS_ID, "cms", TIMES, [1.0], "UTC")
+    cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+
+    assert primary.calls == ["cwms_ts.store_ts"]
+    assert standby.calls == ["cwms_ts.retrieve_ts"]
+
+
+def test_primary_context(dbs):
+    """
+    primary: Reads in the block see the primary
+    """
+    primary, standby = dbs
+    cwms = CWMS(pool=FakeSessionPool(primary), standby=[FakeSessionPool(standby)])
+
+    cwms.store_ts(TS_ID, "cms", TIMES, [1.0], "UTC")
+    with cwms.primary():
+        df = cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+
+    assert list(df["value"]) == [1.0]
+    assert standby.calls == []
+
+
+def test_unavailable_standby_falls_back(dbs):
+    """
+    standby: Reads go to the primary while the standby is down
+    """
+    primary, standby = dbs
+    standby_pool = FakeSessionPool(standby)
+    cwms = CWMS(pool=FakeSessionPool(primary), standby=[standby_pool], health_ttl=60)
+
+    standby_pool.down = True
+    cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+    standby_pool.down = False
+    cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+
+    # skipped until health_ttl passes
+    assert primary.calls == ["cwms_ts.retrieve_ts"] * 2
+    assert standby.calls == []
+
+
+def test_lost_standby_session_retries_on_primary(dbs):
+    """
+    standby: A read that loses its standby session is retried on the primary
+    """
+    primary, standby = dbs
+    standby_pool = FakeSessionPool(standby)
+    cwms = CWMS(pool=FakeSessionPool(primary), standby=[standby_pool], retry_backoff=5)
+    standby.errors.append(FakeError("ORA-03113: end-of-file on communication channel"))
+
+    start = time.monotonic()
+    cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+
+    assert time.monotonic() - start < 1
+    assert primary.calls == ["cwms_ts.retrieve_ts"]
+    assert standby_pool.opened == 0
+    assert cwms.is_open()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.drivers.fake import FakeConnection, FakeDatabase, FakeSessionPool
+
+TS_ID = "CWMSPY.Flow.Inst.1Hour.0.REV"
+
+
+def store_and_retrieve(cwms, i):
+    ts_id = f"{TS_ID}-{i % 10}"
+    times = [datetime.datetime(2019, 1, 1) + datetime.timedelta(hours=i)]
+    cwms.store_ts(ts_id, "cms", times, [float(i)], "UTC")
+    df = cwms.retrieve_ts(ts_id, "2019/1/1", "2019/2/1")
+    return float(i) in list(df["value"])
+
+
+@pytest.fixture()
+def db():
+    return FakeDatabase()
+
+
+def test_shared_pool_stress(db):
+    """
+    acquire: Hundreds of calls from a thread pool share one CWMS object
+    """
+    pool = FakeSessionPool(db, max=4)
+    cwms = CWMS(pool=pool)
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        results = list(executor.map(lambda i: store_and_retrieve(cwms, i), range(400)))
+
+    assert all(results)
+    assert db.collisions == 0
+    assert pool.max_busy <= 4
+    assert pool.busy == 0
+
+
+def test_shared_connection_stress(db):
+    """
+    acquire: A single connection is leased to one thread at a time
+    """
+    cwms = CWMS(conn=FakeConnection(db))
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(lambda i: store_and_retrieve(cwms, i), range(200)))
+
+    assert all(results)
+    assert db.collisions == 0
+
+
+def test_nested_acquire_reuses_lease(db):
+    """
+    acquire: Nested acquire on one thread does not take a second session
+    """
+    pool = FakeSessionPool(db, max=1)
+    cwms = CWMS(pool=pool)
+
+    with cwms.acquire() as outer:
+        with cwms.acquire() as inner:
+            assert inner is outer
+    assert pool.busy == 0
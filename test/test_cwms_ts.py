@@ -19,11 +19,6 @@ def cwms_data(request):
     units, tz = ["cms", "UTC"]
     units, tz = request.param
 
-    alter_session_sql = "ALTER SESSION SET NLS_DATE_FORMAT = 'YYYY-MM-DD HH24:MI:SS'"
-    cur = cwms.conn.cursor()
-    cur.execute(alter_session_sql)
-    cur.close()
-
     try:
         cwms.delete_location("CWMSPY", "DELETE TS DATA")
         cwms.delete_location("CWMSPY", "DELETE TS ID")
@@ -77,10 +72,6 @@ def cwms():
         cwms.delete_location("CWMSPY")
     except:
         pass
-    alter_session_sql = "ALTER SESSION SET NLS_DATE_FORMAT = 'YYYY-MM-DD HH24:MI:SS'"
-    cur = cwms.conn.cursor()
-    cur.execute(alter_session_sql)
-    cur.close()
     cwms.store_location("CWMSPY")
     yield cwms
     # test
@@ -273,3 +264,26 @@ class TestClass(object):
         )
         assert dropped_df[["value"]].equals(retrieved_df[["value"]])
 
+    @pytest.mark.parametrize("tz", ["UTC", "US/Pacific"])
+    def test_times_for_time_window_local(self, cwms, tz):
+        """
+        get_times_for_time_window: Local times match the database function
+        """
+        cwms.store_location("CWMSPY", p_time_zone_id="US/Pacific")
+        offsets = {
+            "CWMSPY.Flow.Inst.15Minutes.0.REV": 5,
+            "CWMSPY.Flow.Ave.1Hour.1Hour.REV": 0,
+            "CWMSPY.Flow.Ave.1Day.1Day.REV": 7 * 60,
+            "CWMSPY.Flow.Ave.1Week.1Week.REV": 0,
+            "CWMSPY.Flow.Ave.1Month.1Month.REV": 0,
+            "CWMSPY.Flow.Ave.1DayLocal.1Day.REV": 0,
+        }
+        for ts_id, offset in offsets.items():
+            cwms.create_ts(ts_id, p_utc_offset=offset)
+
+        grids = cwms.get_time_grids(list(offsets), "2019/3/1", "2019/4/15", tz)
+        for ts_id in offsets:
+            server = cwms.get_times_for_time_window(
+                "2019/3/1", "2019/4/15", ts_id, tz, local=False
+            ).aslist()
+            assert grids[ts_id].astype("datetime64[us]").tolist() == server
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.drivers import CxOracleDriver, OracledbDriver, driver_for, get_driver
+from cwmspy.drivers.fake import FakeDatabase, FakeDriver, FakeSessionPool
+
+TS_ID = "CWMSPY.Flow.Inst.1Hour.0.REV"
+TIMES = [datetime.datetime(2019, 1, 1), datetime.datetime(2019, 1, 2)]
+
+
+def test_get_driver(monkeypatch):
+    """
+    drivers: Drivers are chosen by name or from CWMSPY_DRIVER
+    """
+    assert isinstance(get_driver("cx_Oracle"), CxOracleDriver)
+    assert get_driver("oracledb-thick").thick
+    driver = FakeDriver()
+    assert get_driver(driver) is driver
+
+    monkeypatch.setenv("CWMSPY_DRIVER", "oracledb")
+    assert isinstance(get_driver(), OracledbDriver)
+    with pytest.raises(ValueError):
+        get_driver("sqlite")
+
+
+def test_driver_of_passed_pool():
+    """
+    drivers: A pool passed to CWMS brings its driver
+    """
+    db = FakeDatabase()
+    cwms = CWMS(pool=FakeSessionPool(db))
+    assert isinstance(cwms.driver, FakeDriver)
+    assert cwms.driver.db is db
+    assert driver_for(object()) is None
+
+
+def test_connect_with_driver():
+    """
+    drivers: connect opens the pool through the driver
+    """
+    driver = FakeDriver()
+    cwms = CWMS(driver=driver)
+    assert cwms.connect(host="fake", service_name="CWMS", pool=True, office="NWDP")
+    cwms.store_ts(TS_ID, "cms", TIMES, [1.0, 2.0], "UTC")
+
+    df = cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2")
+
+    assert list(df["value"]) == [1.0, 2.0]
+    assert cwms.host == "fake"
+    # new sessions get the session settings
+    assert len(driver.db.statements) == 2
+    cwms.close()
+
+
+def test_arrow_fetch():
+    """
+    retrieve_ts: Drivers supporting Arrow fetch the series with one query
+    """
+    driver = FakeDriver(arrow=True)
+    cwms = CWMS(driver=driver)
+    cwms.connect(host="fake", service_name="CWMS")
+    cwms.store_ts(TS_ID, "cms", TIMES, [1.0, 2.0], "UTC")
+
+    df = cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2", p_units="cms")
+    rows = cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/2", return_df=False)
+
+    assert list(df.columns) == [
+        "date_time",
+        "value",
+        "quality_code",
+        "time_zone",
+        "ts_id",
+        "units",
+    ]
+    assert list(df["value"]) == [1.0, 2.0]
+    assert [str(df[c].dtype) for c in ("date_time", "value", "quality_code")] == [
+        "datetime64[ns]",
+        "float64",
+        "int64",
+    ]
+    assert [r[1] for r in rows] == [1.0, 2.0]
+    assert driver.db.calls[1:] == [
+        "cwms_ts.retrieve_ts_out_tab",
+        "cwms_ts.retrieve_ts",
+    ]
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import datetime
+import time
+
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.federation import Federation
+from cwmspy.drivers.fake import FakeDatabase, FakeSessionPool
+
+START = datetime.datetime(2019, 1, 1)
+
+
+def seeded(ts_ids, latency):
+    db = FakeDatabase()
+    for i, ts_id in enumerate(ts_ids):
+        db.data[ts_id] = {START: (float(i), 0)}
+    return CWMS(pool=FakeSessionPool(db, max=4, latency=latency)), db
+
+
+@pytest.fixture()
+def fed():
+    nww = [f"LWG.Flow.Inst.1Hour.0.REV-{i}" for i in range(4)]
+    nwp = [f"BON.Flow.Inst.1Hour.0.REV-{i}" for i in range(4)]
+    nww_cwms, nww_db = seeded(nww, 0.1)
+    nwp_cwms, nwp_db = seeded(nwp, 0.1)
+    fed = Federation(
+        {"NWW": nww_cwms, "NWP": nwp_cwms}, prefixes={"LWG.": "NWW", "BON.": "NWP"}
+    )
+    yield fed, nww + nwp, nww_db, nwp_db
+    fed.close()
+
+
+def test_routing(fed):
+    """
+    Federation: Calls go to the database of the series' office
+    """
+    fed, ts_ids, nww_db, nwp_db = fed
+    df = fed.retrieve_ts(ts_ids[0], "2019/1/1", "2019/1/2")
+    assert list(df["value"]) == [0.0]
+    assert nww_db.calls == ["cwms_ts.retrieve_ts"]
+    assert nwp_db.calls == []
+
+    assert fed.office(ts_id="LWG.Stage") == "NWW"
+    assert fed.office("NWP", ts_id="LWG.Stage") == "NWP"
+    with pytest.raises(ValueError):
+        fed.office(ts_id="IHR.Stage")
+    with pytest.raises(ValueError):
+        fed.office("SPK")
+
+
+def test_fan_out_merged(fed):
+    """
+    Federation: Series from all databases come back in one frame, concurrently
+    """
+    fed, ts_ids, nww_db, nwp_db = fed
+
+    start = time.monotonic()
+    df = fed.retrieve_multi_ts(ts_ids, "2019/1/1", "2019/1/2")
+    elapsed = time.monotonic() - start
+
+    # eight calls of 0.1s each on two databases of four sessions
+    assert elapsed < 0.5
+    assert list(df["ts_id"]) == ts_ids
+    assert list(df["office"]) == ["NWW"] * 4 + ["NWP"] * 4
+    assert len(nww_db.calls) == len(nwp_db.calls) == 4
+
+
+def test_timeout(fed):
+    """
+    Federation: The timeout bounds the whole fan-out
+    """
+    fed, ts_ids, nww_db, nwp_db = fed
+    with pytest.raises(ValueError):
+        fed.retrieve_multi_ts(ts_ids, "2019/1/1", "2019/1/2", timeout=0.05)
+
+
+def test_shared_profile():
+    """
+    Federation: Offices on the same profile share one connection
+    """
+    fed = Federation({"NWW": "district", "NWP": "district", "NWDM": "other"})
+    assert len(fed.databases) == 2
+    assert fed.offices["NWW"] is fed.offices["NWP"]
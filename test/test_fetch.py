@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.fetch import fetch_arrays, fetch_size
+from cwmspy.intervals import expected_rows, interval_seconds, regular_seconds
+from cwmspy.timezones import to_utc, utc_to_local
+from cwmspy.drivers.fake import FakeConnection, FakeCursor, FakeDatabase
+
+TS_ID = "CWMSPY.Flow.Inst.1Hour.0.REV"
+
+
+def test_interval_seconds():
+    """
+    intervals: Interval names parse to seconds, irregular ones to None
+    """
+    assert interval_seconds("1Hour") == 3600
+    assert interval_seconds("15Minutes") == 900
+    assert regular_seconds("A.Flow.Inst.1Day.0.REV") == 86400
+    assert regular_seconds("A.Flow.Ave.1Month.1Month.REV") is None
+    assert regular_seconds("A.Flow.Ave.~1Day.1Day.REV") is None
+    assert regular_seconds("A.Flow.Ave.1DayLocal.1Day.REV") is None
+    assert interval_seconds("1DayLocal") == 86400
+    assert interval_seconds("1Day") == 86400
+    assert interval_seconds("0") is None
+    assert interval_seconds("~1Day") is None
+    with pytest.raises(ValueError):
+        interval_seconds("1Fortnight")
+
+    start = datetime.datetime(2019, 1, 1)
+    assert expected_rows(TS_ID, start, start + datetime.timedelta(days=1)) == 25
+    assert expected_rows("CWMSPY.Flow.Inst.0.0.REV", start, start) is None
+
+
+def test_fetch_arrays_grows():
+    """
+    fetch_arrays: Rows beyond the hint are kept, nulls become NaN
+    """
+    cur = FakeCursor(FakeConnection(FakeDatabase()))
+    start = datetime.datetime(2019, 1, 1)
+    cur.rows = [(start + datetime.timedelta(hours=i), float(i), 0) for i in range(250)]
+    cur.rows[3] = (cur.rows[3][0], None, None)
+
+    times, values, qualities = fetch_arrays(cur, rows=10)
+
+    assert len(times) == 250
+    assert times.dtype == np.dtype("datetime64[ns]")
+    assert np.isnan(values[3])
+    assert values[249] == 249.0
+    assert qualities[3] == 0
+
+
+def test_retrieve_ts_round_trips():
+    """
+    retrieve_ts: A regular series comes back in one round trip
+    """
+    db = FakeDatabase()
+    cwms = CWMS(conn=FakeConnection(db))
+    start = datetime.datetime(2019, 1, 1)
+    times = [start + datetime.timedelta(hours=i) for i in range(24 * 365)]
+    cwms.store_ts(TS_ID, "cms", times, [1.0] * len(times), "UTC")
+
+    df = cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/12/31")
+
+    assert len(df) == len(times)
+    assert df["date_time"].iloc[-1] == times[-1]
+    # the rows, then the empty fetch ending the cursor
+    assert db.fetches == 2
+    assert fetch_size(len(times)) > len(times)
+
+
+def test_values_only():
+    """
+    retrieve_ts: values_only computes the times of regular series
+    """
+    db = FakeDatabase()
+    start = datetime.datetime(2019, 3, 9)
+    db.data[TS_ID] = {
+        start + datetime.timedelta(hours=h): (float(h), 0) for h in range(72)
+    }
+    cwms = CWMS(conn=FakeConnection(db))
+
+    for kwargs in ({}, {"p_previous": "F"}):
+        plain = cwms.retrieve_ts(TS_ID, "2019/3/10", "2019/3/10", **kwargs)
+        df = cwms.retrieve_ts(
+            TS_ID, "2019/3/10", "2019/3/10", values_only=True, **kwargs
+        )
+        pd.testing.assert_frame_equal(df, plain)
+
+    # over the change to daylight saving time
+    window = (datetime.datetime(2019, 3, 10), datetime.datetime(2019, 3, 11))
+    utc = cwms.retrieve_ts_window(TS_ID, *[to_utc(t, "US/Pacific") for t in window])
+    df = cwms.retrieve_ts_window(
+        TS_ID, *window, p_timezone="US/Pacific", values_only=True
+    )
+    expected = utc_to_local(utc.date_time.to_numpy(), "US/Pacific")
+    np.testing.assert_array_equal(df.date_time.to_numpy(), expected)
+    # a 23 hour day, both ends and the previous value
+    assert len(df) == 25
+    assert len([s for s in db.statements if "count(*) over ()" in s]) == 3
+
+    # a previous value off the grid keeps its time
+    del db.data[TS_ID][start + datetime.timedelta(hours=23)]
+    plain = cwms.retrieve_ts(TS_ID, "2019/3/10", "2019/3/10")
+    reads = db.calls.count("cwms_ts.retrieve_ts")
+    df = cwms.retrieve_ts(TS_ID, "2019/3/10", "2019/3/10", values_only=True)
+    pd.testing.assert_frame_equal(df, plain)
+    assert db.calls.count("cwms_ts.retrieve_ts") == reads
+
+    # a gap in the window is retrieved again with its times
+    del db.data[TS_ID][start + datetime.timedelta(hours=30)]
+    plain = cwms.retrieve_ts(TS_ID, "2019/3/10", "2019/3/10")
+    df = cwms.retrieve_ts(TS_ID, "2019/3/10", "2019/3/10", values_only=True)
+    pd.testing.assert_frame_equal(df, plain)
+    assert db.calls.count("cwms_ts.retrieve_ts") == reads + 2
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
+
+# cumulative `import cwmspy` time allowed, in milliseconds
+IMPORT_BUDGET_MS = float(os.getenv("CWMSPY_IMPORT_BUDGET_MS", 150))
+HEAVY_MODULES = [
+    "pandas",
+    "numpy",
+    "cx_Oracle",
+    "oracledb",
+    "pyarrow",
+    "yaml",
+    "pytz",
+    "dateutil",
+]
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+def run(*args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def import_time_us(module):
+    """Best of three cumulative `python -X importtime` readings for `module`."""
+    readings = []
+    for _ in range(3):
+        stderr = run("-X", "importtime", "-c", f"import {module}").stderr
+        for line in stderr.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            _, cumulative, name = line[len("import time:") :].split("|")
+            if name.strip() == module:
+                readings.append(int(cumulative))
+    return min(readings)
+
+
+def test_heavy_dependencies_load_lazily():
+    """
+    import: cwmspy does not import its heavy dependencies up front
+    """
+    code = "import sys, cwmspy; print(' '.join(sorted(sys.modules)))"
+    loaded = run("-c", code).stdout.split()
+
+    assert [m for m in HEAVY_MODULES if m in loaded] == []
+
+
+def test_import_time_budget():
+    """
+    import: `import cwmspy` stays within IMPORT_BUDGET_MS
+    """
+    elapsed_ms = import_time_us("cwmspy") / 1000
+
+    assert elapsed_ms < IMPORT_BUDGET_MS
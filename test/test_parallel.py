@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import datetime
+import os
+
+import pandas as pd
+import pytest
+
+from cwmspy import CWMS, parallel
+from cwmspy.parallel import ProcessPool, decode, encode
+from cwmspy.drivers.fake import FakeConnection, FakeDatabase
+
+TS_IDS = [f"CWMSPY.Flow.Inst.1Hour.0.REV-{i}" for i in range(6)]
+GAPS = "CWMSPY.Flow.Inst.1Hour.0.GAPS"
+START = datetime.datetime(2019, 1, 1)
+
+
+def make_cwms():
+    # runs in each worker, every worker sees the same hourly data
+    db = FakeDatabase()
+    for i, ts_id in enumerate(TS_IDS):
+        db.data[ts_id] = {
+            START + datetime.timedelta(hours=h): (float(i * 1000 + h), 0)
+            for h in range(24 * 30)
+        }
+    # missing values around every midnight
+    db.data[GAPS] = {
+        START + datetime.timedelta(hours=h): (None if h % 24 in (23, 0, 1) else h, 0)
+        for h in range(-24, 24 * 30)
+    }
+    return CWMS(conn=FakeConnection(db, latency=0))
+
+
+def test_encode_roundtrip():
+    """
+    parallel: DataFrames survive the trip between processes
+    """
+    df = pd.DataFrame(
+        {
+            "date_time": pd.date_range("2019-01-01", periods=5, freq="h"),
+            "value": [1.0, 2.0, None, 4.0, 5.0],
+            "quality_code": [0, 0, 5, 0, 0],
+            "ts_id": ["Some.Ts.Id"] * 5,
+        }
+    )
+    pd.testing.assert_frame_equal(decode(encode(df)), df)
+
+
+def test_retrieve_multi_ts_processes():
+    """
+    retrieve_multi_ts: Series are retrieved in worker processes
+    """
+    cwms = make_cwms()
+    expected = cwms.retrieve_multi_ts(TS_IDS, "2019/1/1", "2019/1/10")
+
+    cwms.process_pool(2, factory=make_cwms)
+    df = cwms.retrieve_multi_ts(TS_IDS, "2019/1/1", "2019/1/10", processes=2)
+    cwms.close()
+
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_retrieve_ts_split():
+    """
+    ProcessPool: A time window split across workers matches a single call
+    """
+    cwms = make_cwms()
+    expected = cwms.retrieve_ts(TS_IDS[0], "2019/1/1", "2019/1/20")
+
+    with ProcessPool(processes=3, factory=make_cwms) as pp:
+        df = pp.retrieve_ts(TS_IDS[0], "2019/1/1", "2019/1/20")
+
+    pd.testing.assert_frame_equal(df, expected)
+
+
+@pytest.mark.parametrize("p_trim", ["F", "T"])
+@pytest.mark.parametrize("return_type", ["df", "list", "numpy"])
+def test_retrieve_ts_split_trimmed(p_trim, return_type):
+    """
+    ProcessPool: Windows split across workers are trimmed once, as one call
+    """
+    kwargs = dict(p_trim=p_trim, p_next="T", return_type=return_type)
+    expected = make_cwms().retrieve_ts(GAPS, "2019/1/2", "2019/1/12", **kwargs)
+
+    with ProcessPool(processes=3, factory=make_cwms) as pp:
+        got = pp.retrieve_ts(GAPS, "2019/1/2", "2019/1/12", parts=4, **kwargs)
+
+    if return_type == "df":
+        pd.testing.assert_frame_equal(got, expected)
+    elif return_type == "numpy":
+        pd.testing.assert_frame_equal(pd.DataFrame(got), pd.DataFrame(expected))
+    else:
+        assert got == expected
+
+
+def _segments():
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+def test_failed_map_frees_shared_memory():
+    """
+    ProcessPool: Results left undecoded by a failed call are unlinked
+    """
+    before = _segments()
+    calls = [dict(p_cwms_ts_id=TS_IDS[0], start_time="bad", end_time="2019/1/2")]
+    calls += [
+        dict(p_cwms_ts_id=ts_id, start_time="2019/1/1", end_time="2019/1/2")
+        for ts_id in TS_IDS
+    ]
+    with ProcessPool(processes=2, factory=make_cwms) as pp:
+        with pytest.raises(Exception):
+            pp.map("retrieve_ts", calls)
+
+    assert _segments() <= before
+
+
+def test_encode_without_shared_memory(monkeypatch):
+    """
+    parallel: DataFrames are sent as they are without shared memory
+    """
+    monkeypatch.setattr(parallel, "_shared_memory", lambda: None)
+    df = pd.DataFrame({"value": [1.0, 2.0]})
+    assert encode(df) is df
+    assert parallel._decode_result(encode(df)) is df
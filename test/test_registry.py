@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.drivers.fake import FakeConnection, FakeDatabase, FakeSessionPool
+
+TS_ID = "CWMSPY.Flow.Inst.1Hour.0.REV"
+
+
+@pytest.fixture()
+def db():
+    return FakeDatabase()
+
+
+def test_cursor_reused(db):
+    """
+    registry: Repeated calls on one connection share a cursor
+    """
+    cwms = CWMS(conn=FakeConnection(db))
+    times = [datetime.datetime(2019, 1, 1)]
+    cwms.store_ts(TS_ID, "cms", times, [1.0], "UTC")
+    for _ in range(20):
+        cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/2/1")
+
+    assert db.cursors == 1
+
+
+def test_gettype_once_per_lease(db):
+    """
+    registry: Object types are described once per leased connection
+    """
+    pool = FakeSessionPool(db, max=1)
+    cwms = CWMS(pool=pool)
+    with cwms.acquire():
+        for _ in range(10):
+            cwms.delete_ts_values(TS_ID, date_times=["2019-01-01 00:00:00"])
+
+    assert db.gettypes == 1
+    assert db.cursors == 1
+
+
+def test_pooled_connections_released(db):
+    """
+    registry: Pooled connections are forgotten when released
+    """
+    cwms = CWMS(pool=FakeSessionPool(db, max=2))
+    for _ in range(50):
+        cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/2/1")
+
+    assert len(cwms.registry) == 0
+    assert db.cursors == 50
+
+
+def test_fetch_sizes_reset(db):
+    """
+    registry: A reused cursor comes back with its default fetch sizes
+    """
+    conn = FakeConnection(db)
+    cwms = CWMS(conn=conn)
+    cur = cwms.registry.cursor(conn)
+    cur.arraysize, cur.prefetchrows = 5000, 5000
+
+    assert cwms.registry.cursor(conn) is cur
+    assert (cur.arraysize, cur.prefetchrows) == (100, 2)
+
+
+def test_close_clears_registry(db):
+    """
+    registry: close forgets cached cursors
+    """
+    cwms = CWMS(conn=FakeConnection(db))
+    cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/2/1")
+    assert len(cwms.registry) == 1
+
+    cwms.close()
+    assert len(cwms.registry) == 0
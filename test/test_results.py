@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import numpy as np
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.drivers.fake import FakeConnection, FakeDatabase
+
+TS_IDS = ["CWMSPY.Flow.Inst.1Hour.0.REV", "CWMSPY.Stage.Inst.1Hour.0.REV"]
+START = datetime.datetime(2019, 1, 1)
+
+
+@pytest.fixture()
+def cwms():
+    db = FakeDatabase()
+    for i, ts_id in enumerate(TS_IDS):
+        db.data[ts_id] = {
+            START + datetime.timedelta(hours=h): (float(h * (i + 1)), 0)
+            for h in range(24)
+        }
+    db.data[TS_IDS[0]][START] = (None, 5)
+    return CWMS(conn=FakeConnection(db))
+
+
+def test_numpy_and_dict(cwms):
+    """
+    retrieve_ts: Structured arrays and dicts hold metadata once
+    """
+    arr = cwms.retrieve_ts(TS_IDS[0], "2019/1/1", "2019/1/1", return_type="numpy")
+    d = cwms.retrieve_ts(TS_IDS[0], "2019/1/1", "2019/1/1", return_type="dict")
+    df = cwms.retrieve_ts(TS_IDS[0], "2019/1/1", "2019/1/1")
+
+    assert arr.dtype.names == ("date_time", "value", "quality_code")
+    assert arr.dtype.metadata["ts_id"] == TS_IDS[0]
+    assert np.isnan(arr["value"][0]) and arr["quality_code"][0] == 5
+    np.testing.assert_array_equal(arr["date_time"], df["date_time"].to_numpy())
+    assert d["ts_id"] == TS_IDS[0] and d["time_zone"] == "UTC"
+    np.testing.assert_array_equal(d["value"], df["value"].to_numpy())
+    with pytest.raises(ValueError):
+        cwms.retrieve_ts(TS_IDS[0], "2019/1/1", "2019/1/1", return_type="xml")
+
+
+def test_multi_ts(cwms):
+    """
+    retrieve_multi_ts: Non-DataFrame results come back by ts id
+    """
+    out = cwms.retrieve_multi_ts(TS_IDS, "2019/1/1", "2019/1/1", return_type="dict")
+    rows = cwms.retrieve_multi_ts(TS_IDS, "2019/1/1", "2019/1/1", return_df=False)
+
+    assert list(out) == TS_IDS
+    assert out[TS_IDS[1]]["value"][3] == 6.0
+    assert [len(r) for r in rows] == [24, 24]
+
+
+def test_arrow(cwms):
+    """
+    retrieve_multi_ts: One Arrow table with a dictionary encoded ts_id
+    """
+    pa = pytest.importorskip("pyarrow")
+    table = cwms.retrieve_multi_ts(TS_IDS, "2019/1/1", "2019/1/1", return_type="arrow")
+
+    assert table.num_rows == 48
+    assert table.column_names == ["date_time", "ts_id", "value", "quality_code"]
+    assert pa.types.is_dictionary(table.schema.field("ts_id").type)
+    assert table.schema.metadata[b"time_zone"] == b"UTC"
+    assert table.column("value").null_count == 1
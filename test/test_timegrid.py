@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.drivers.fake import FakeConnection, FakeDatabase
+from cwmspy.timegrid import time_grid
+
+START = datetime.datetime(2019, 3, 9)
+END = datetime.datetime(2019, 3, 12)
+
+
+def local(times, zone):
+    return pd.DatetimeIndex(times).tz_convert(zone).tz_localize(None).to_numpy()
+
+
+def test_regular_intervals():
+    """
+    timegrid: UTC intervals and offsets match pandas date ranges
+    """
+    expected = pd.date_range("2019-03-09 00:05", END, freq="15min").to_numpy()
+    np.testing.assert_array_equal(time_grid(START, END, "15Minutes", 5), expected)
+
+    utc = pd.date_range("2019-03-09 08:00", "2019-03-12 07:00", freq="h", tz="UTC")
+    np.testing.assert_array_equal(
+        time_grid(START, END, "1Hour", time_zone="US/Pacific"),
+        local(utc, "US/Pacific"),
+    )
+
+    expected = pd.date_range("2019-02-01", "2020-03-01", freq="MS")
+    expected = (expected + pd.Timedelta(hours=6)).to_numpy()
+    grid = time_grid(datetime.datetime(2019, 1, 15), END.replace(2020), "1Month", 360)
+    np.testing.assert_array_equal(grid, expected)
+    assert list(time_grid(START, START + datetime.timedelta(weeks=1), "1Week")) == [
+        np.datetime64("2019-03-10")
+    ]
+
+
+def test_local_regular_intervals():
+    """
+    timegrid: Local regular intervals keep their local times through DST
+    """
+    grid = time_grid(START, END, "1DayLocal", 7 * 60, local_time_zone="US/Pacific")
+    expected = pd.DatetimeIndex(
+        ["2019-03-09 07:00", "2019-03-10 07:00", "2019-03-11 07:00"],
+        tz="US/Pacific",
+    ).tz_convert("UTC")
+    np.testing.assert_array_equal(grid, expected.tz_localize(None).to_numpy())
+
+    # 02:00 does not exist on the day clocks go forward
+    grid = time_grid(START, END, "1HourLocal", time_zone="US/Pacific")
+    assert len(grid) == 72
+    with pytest.raises(ValueError):
+        time_grid(START, END, "~1Day")
+
+
+def test_many_series_one_query():
+    """
+    get_time_grids: Many series take one metadata query and no time calls
+    """
+    db = FakeDatabase()
+    ts_ids = [f"CWMSPY.Flow-{i}.Inst.1Hour.0.REV" for i in range(20)]
+    for ts_id in ts_ids:
+        db.data[ts_id] = {}
+    db.data["CWMSPY.Flow.Inst.1DayLocal.0.REV"] = {}
+    db.time_zones["CWMSPY.Flow.Inst.1DayLocal.0.REV"] = "US/Pacific"
+    cwms = CWMS(conn=FakeConnection(db))
+
+    grids = cwms.get_time_grids(
+        ts_ids + ["CWMSPY.Flow.Inst.1DayLocal.0.REV"], "2019/3/9", "2019/3/12"
+    )
+    assert len([s for s in db.statements if "from cwms_v_ts_id" in s]) == 1
+    assert "cwms_ts.get_times_for_time_window" not in db.calls
+    assert all(len(grids[ts_id]) == 73 for ts_id in ts_ids)
+    assert len(grids["CWMSPY.Flow.Inst.1DayLocal.0.REV"]) == 3
+
+    times = cwms.get_times_for_time_window(
+        "2019/3/9", "2019/3/10", ts_ids[0], "UTC", local=True
+    )
+    assert len(times) == 25
+    assert "cwms_ts.get_times_for_time_window" not in db.calls
+    with pytest.raises(ValueError, match="TS_ID_NOT_FOUND"):
+        cwms.get_times_for_time_window(
+            "2019/3/9", "2019/3/10", "CWMSPY.Elev.Inst.1Hour.0.REV", "UTC", local=True
+        )
+
+
+def test_server_by_default():
+    """
+    get_times_for_time_window: Times come from the database unless local
+    """
+    db = FakeDatabase()
+    db.data["CWMSPY.Flow.Inst.1Hour.0.REV"] = {}
+    cwms = CWMS(conn=FakeConnection(db))
+    with pytest.raises(ValueError, match="not implemented"):
+        cwms.get_times_for_time_window(
+            "2019/3/9", "2019/3/10", "CWMSPY.Flow.Inst.1Hour.0.REV", "UTC"
+        )
+    assert db.calls == ["cwms_ts.get_times_for_time_window"]
+
+
+def test_days_from_the_database():
+    """
+    get_time_grids: Times of 2 to 6 day intervals come from the database
+    """
+    db = FakeDatabase()
+    hourly, daily = "CWMSPY.Flow.Inst.1Hour.0.REV", "CWMSPY.Flow.Inst.3Day.0.REV"
+    db.data[hourly], db.data[daily] = {}, {}
+    db.times[daily] = [
+        START - datetime.timedelta(days=1),
+        START + datetime.timedelta(days=2),
+    ]
+    cwms = CWMS(conn=FakeConnection(db))
+
+    grids = cwms.get_time_grids([hourly, daily], "2019/3/9", "2019/3/12")
+    assert len(grids[hourly]) == 73
+    np.testing.assert_array_equal(
+        grids[daily], np.array(["2019-03-11"], dtype="datetime64[ns]")
+    )
+    assert db.calls == ["cwms_ts.get_times_for_time_window"]
+    with pytest.raises(ValueError, match="only known to the database"):
+        time_grid(START, END, "3Day")
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from cwmspy import CWMS
+from cwmspy.drivers.fake import FakeConnection, FakeDatabase
+from cwmspy.timezones import to_utc, utc_to_local
+
+FLOW = "CWMSPY.Flow.Inst.1Hour.0.REV"
+STAGE = "CWMSPY.Stage.Inst.1Hour.0.REV"
+
+
+def test_matches_pandas():
+    """
+    timezones: utc_to_local agrees with pandas across DST changes
+    """
+    times = pd.date_range("1990-01-01", "2030-01-01", freq="47min").to_numpy()
+    for zone in ["US/Pacific", "America/Chicago", "Asia/Kolkata", "UTC"]:
+        expected = pd.DatetimeIndex(times).tz_localize("UTC").tz_convert(zone)
+        expected = expected.tz_localize(None).to_numpy()
+        np.testing.assert_array_equal(utc_to_local(times, zone), expected)
+    local = datetime.datetime(2019, 7, 1, 12)
+    assert to_utc(local, "US/Pacific") == datetime.datetime(2019, 7, 1, 19)
+
+
+def test_multi_ts_local_zones():
+    """
+    retrieve_multi_ts: local_tz=True converts each series to its own zone
+    """
+    db = FakeDatabase()
+    start = datetime.datetime(2019, 7, 1)
+    for ts_id in (FLOW, STAGE):
+        db.data[ts_id] = {
+            start + datetime.timedelta(hours=h): (float(h), 0) for h in range(48)
+        }
+    db.time_zones[FLOW] = "US/Pacific"
+    db.time_zones[STAGE] = "US/Eastern"
+    cwms = CWMS(conn=FakeConnection(db))
+
+    df = cwms.retrieve_multi_ts(
+        [FLOW, STAGE], "2019/7/1", "2019/7/1", p_previous="F", local_tz=True
+    )
+    flow = df[df.ts_id == FLOW]
+    stage = df[df.ts_id == STAGE]
+    assert flow.date_time.iloc[0] == pd.Timestamp("2019-06-30 17:00")
+    assert stage.date_time.iloc[0] == pd.Timestamp("2019-06-30 20:00")
+    assert list(flow.time_zone.unique()) == ["US/Pacific"]
+    assert len(flow) == 25
+
+    out = cwms.retrieve_multi_ts(
+        [FLOW], "2019/7/1", "2019/7/1", local_tz="Asia/Kolkata", return_type="dict"
+    )
+    assert out[FLOW]["time_zone"] == "Asia/Kolkata"
+    assert out[FLOW]["date_time"][0] == np.datetime64("2019-07-01T05:30")
+
+
+def test_multi_ts_local_day():
+    """
+    retrieve_multi_ts: With local_tz, the window ends at 24:00 of its end
+    day in p_timezone, on days clocks change too
+    """
+    db = FakeDatabase()
+    start = datetime.datetime(2019, 3, 9)
+    db.data[FLOW] = {
+        start + datetime.timedelta(hours=h): (float(h), 0) for h in range(96)
+    }
+    cwms = CWMS(conn=FakeConnection(db))
+
+    df = cwms.retrieve_multi_ts(
+        [FLOW],
+        "2019/3/10",
+        "2019/3/10",
+        p_timezone="US/Pacific",
+        p_previous="F",
+        local_tz="US/Pacific",
+    )
+    # 23 hours, and 24:00
+    assert len(df) == 24
+    assert df.date_time.iloc[0] == pd.Timestamp("2019-03-10 00:00")
+    assert df.date_time.iloc[-1] == pd.Timestamp("2019-03-11 00:00")
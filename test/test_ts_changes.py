@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+from cwmspy import CWMS
+from cwmspy.drivers.fake import FakeConnection, FakeDatabase
+from cwmspy.watermarks import HighWaterMarks
+
+FLOW = "CWMSPY.Flow.Inst.1Hour.0.REV"
+STAGE = "CWMSPY.Stage.Inst.1Hour.0.REV"
+START = datetime.datetime(2019, 1, 1)
+
+
+def hours(first, last):
+    return {
+        START + datetime.timedelta(hours=h): (float(h), 0) for h in range(first, last)
+    }
+
+
+def queries(db):
+    return [s for s in db.statements if "cwms_v_tsv_dqu" in s]
+
+
+def test_only_new_values(tmp_path):
+    """
+    retrieve_ts_changes: Only values stored since the last pull come back
+    """
+    db = FakeDatabase()
+    db.data[FLOW] = hours(0, 24)
+    db.data[STAGE] = hours(0, 12)
+    cwms = CWMS(conn=FakeConnection(db))
+    path = str(tmp_path / "marks.json")
+    since = START + datetime.timedelta(hours=5, minutes=30)
+
+    df = cwms.retrieve_ts_changes([FLOW, STAGE], HighWaterMarks(path), since)
+    assert list(df.columns) == ["date_time", "ts_id", "value", "quality_code"]
+    assert (df.ts_id == FLOW).sum() == 18 and (df.ts_id == STAGE).sum() == 6
+    assert len(queries(db)) == 1
+
+    # a new value and a changed one, pulled with marks read back from disk
+    marks = HighWaterMarks(path)
+    cwms.store_ts(FLOW, "cms", [START + datetime.timedelta(hours=30)], [1.0], "UTC")
+    cwms.store_ts(STAGE, "m", [START], [-1.0], "UTC")
+    df = cwms.retrieve_ts_changes([FLOW, STAGE], marks, since)
+    assert list(zip(df.ts_id, df.value)) == [(FLOW, 1.0), (STAGE, -1.0)]
+
+    df = cwms.retrieve_ts_changes([FLOW, STAGE], marks, since)
+    assert df.empty
+
+
+def test_batches_and_return_types():
+    """
+    retrieve_ts_changes: Series are queried `batch` at a time
+    """
+    db = FakeDatabase()
+    db.data[FLOW] = hours(0, 24)
+    db.data[STAGE] = hours(0, 12)
+    cwms = CWMS(conn=FakeConnection(db))
+    marks = HighWaterMarks()
+
+    out = cwms.retrieve_ts_changes(
+        [FLOW, STAGE], marks, START, batch=1, return_type="dict"
+    )
+    assert len(queries(db)) == 2
+    assert len(out[FLOW]["value"]) == 23 and len(out[STAGE]["value"]) == 11
+    assert out[FLOW]["time_zone"] == "UTC"
+    assert marks.get(FLOW) == (None, START + datetime.timedelta(hours=23))
+
+    # series without new values keep their marks
+    out = cwms.retrieve_ts_changes([FLOW], marks, START, return_type="numpy")
+    assert len(out[FLOW]) == 0
+    assert marks.get(FLOW) == (None, START + datetime.timedelta(hours=23))
+
+
+def test_lookback_and_case():
+    """
+    retrieve_ts_changes: Values are read from `lookback` before the marks,
+    whatever the case of the ids
+    """
+    db = FakeDatabase()
+    db.data[FLOW] = hours(0, 24 * 10)
+    # all stored after the first pull starts
+    since = START + datetime.timedelta(days=5)
+    db.entered[FLOW] = {t: since + datetime.timedelta(days=6) for t in db.data[FLOW]}
+    cwms = CWMS(conn=FakeConnection(db))
+    lookback = datetime.timedelta(days=2)
+
+    df = cwms.retrieve_ts_changes([FLOW.lower()], HighWaterMarks(), since, lookback)
+    assert df.date_time.min() == since - lookback
+    assert (df.ts_id == FLOW.lower()).all()
+    assert ":since0" in queries(db)[0]
+
+    df = cwms.retrieve_ts_changes([FLOW], HighWaterMarks(), since, None)
+    assert df.date_time.min() == START
+
+
+def test_late_commits():
+    """
+    retrieve_ts_changes: Values committed after a pull with an earlier store
+    time come back once, and those pulled are not repeated
+    """
+    db = FakeDatabase()
+    db.data[FLOW] = hours(0, 24)
+    mark = START + datetime.timedelta(days=2)
+    db.entered[FLOW] = {t: mark for t in db.data[FLOW]}
+    cwms = CWMS(conn=FakeConnection(db))
+    marks = HighWaterMarks()
+
+    df = cwms.retrieve_ts_changes([FLOW], marks, START)
+    assert len(df) == 24
+    # stored a minute before the mark, committed after the pull
+    late = START + datetime.timedelta(hours=30)
+    db.data[FLOW][late] = (1.0, 0)
+    db.entered[FLOW][late] = mark - datetime.timedelta(minutes=1)
+
+    df = cwms.retrieve_ts_changes([FLOW], marks, START)
+    assert list(df.date_time) == [late]
+    df = cwms.retrieve_ts_changes([FLOW], marks, START)
+    assert df.empty
+    assert marks.get(FLOW) == (mark, late)
+
+
+def test_codes_and_units():
+    """
+    retrieve_ts_changes: Series are read by ts_code in their storage units,
+    unless others are asked for
+    """
+    db = FakeDatabase()
+    db.data[FLOW] = hours(0, 24)
+    db.data[STAGE] = hours(0, 12)
+    db.units[FLOW], db.units[STAGE] = "cms", "m"
+    cwms = CWMS(conn=FakeConnection(db))
+
+    df = cwms.retrieve_ts_changes(
+        [FLOW, STAGE, "CWMSPY.Missing"], HighWaterMarks(), START
+    )
+    assert (df.ts_id == FLOW).sum() == 23 and (df.ts_id == STAGE).sum() == 11
+    assert ":ts_code1" in queries(db)[0] and "upper(" not in queries(db)[0]
+
+    df = cwms.retrieve_ts_changes(
+        [FLOW, STAGE], HighWaterMarks(), START, p_units_list=["cfs", None]
+    )
+    assert (df.ts_id == FLOW).sum() == 0 and (df.ts_id == STAGE).sum() == 11
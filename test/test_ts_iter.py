@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import pandas as pd
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.drivers.fake import FakeConnection, FakeDatabase
+
+TS_ID = "CWMSPY.Flow.Inst.1Hour.0.REV"
+START = datetime.datetime(2019, 1, 1)
+
+
+@pytest.fixture()
+def cwms():
+    db = FakeDatabase()
+    # a day before and after the window, with gaps around chunk boundaries
+    hours = range(-24, 24 * 7)
+    db.data[TS_ID] = {
+        START + datetime.timedelta(hours=h): (None if h % 24 in (23, 0, 1) else h, 0)
+        for h in hours
+    }
+    return CWMS(conn=FakeConnection(db))
+
+
+@pytest.mark.parametrize("p_trim", ["F", "T"])
+@pytest.mark.parametrize("p_next", ["F", "T"])
+@pytest.mark.parametrize("p_start_inclusive", ["F", "T"])
+@pytest.mark.parametrize("p_end_inclusive", ["F", "T"])
+def test_chunks_match_single_call(
+    cwms, p_trim, p_next, p_start_inclusive, p_end_inclusive
+):
+    """
+    retrieve_ts_iter: Chunks hold the rows of one retrieve_ts, once each
+    """
+    # the missing values at midnight sit on the exclusive bounds
+    kwargs = dict(
+        p_trim=p_trim,
+        p_next=p_next,
+        p_start_inclusive=p_start_inclusive,
+        p_end_inclusive=p_end_inclusive,
+    )
+    whole = cwms.retrieve_ts(TS_ID, "2019/1/2", "2019/1/4", **kwargs)
+    blocks = list(
+        cwms.retrieve_ts_iter(TS_ID, "2019/1/2", "2019/1/4", chunk="1D", **kwargs)
+    )
+
+    assert len(blocks) == 3
+    pd.testing.assert_frame_equal(pd.concat(blocks, ignore_index=True), whole)
+
+
+def test_rows_and_lists(cwms):
+    """
+    retrieve_ts_iter: Chunks sized by rows, returned as lists
+    """
+    whole = cwms.retrieve_ts(TS_ID, "2019/1/2", "2019/1/4", return_df=False)
+    blocks = list(
+        cwms.retrieve_ts_iter(
+            TS_ID, "2019/1/2", "2019/1/4", chunk_rows=10, return_df=False
+        )
+    )
+
+    assert len(blocks) == 8
+    assert [r for block in blocks for r in block] == whole
+
+
+@pytest.mark.parametrize("ts_id", ["CWMSPY.Flow.Inst.1Fortnight.0.REV", "CWMSPY.Flow"])
+def test_unparsed_interval(ts_id):
+    """
+    retrieve_ts_iter: Ids whose interval is not parsed get yearly chunks
+    """
+    db = FakeDatabase()
+    db.data[ts_id] = {START: (1.0, 0)}
+    cwms = CWMS(conn=FakeConnection(db))
+    blocks = list(cwms.retrieve_ts_iter(ts_id, "2019/1/1", "2019/1/4"))
+
+    assert [list(df["value"]) for df in blocks] == [[1.0]]
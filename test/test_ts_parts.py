@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import pandas as pd
+import pytest
+
+from cwmspy import CWMS
+from cwmspy.drivers.fake import FakeDatabase, FakeSessionPool
+
+TS_ID = "CWMSPY.Flow.Inst.1Hour.0.REV"
+START = datetime.datetime(2019, 1, 1)
+
+
+@pytest.fixture()
+def db():
+    db = FakeDatabase()
+    db.data[TS_ID] = {
+        START + datetime.timedelta(hours=h): (None if h % 24 < 2 else h, 0)
+        for h in range(-24, 24 * 9)
+    }
+    return db
+
+
+@pytest.mark.parametrize("p_trim", ["F", "T"])
+@pytest.mark.parametrize("inclusive", ["T", "F"])
+def test_parts_match_single_call(db, p_trim, inclusive):
+    """
+    retrieve_ts: Sub-windows stitch into the rows of one call
+    """
+    cwms = CWMS(pool=FakeSessionPool(db, max=4))
+    # with exclusive bounds the missing previous and next values sit on them
+    kwargs = dict(
+        p_trim=p_trim,
+        p_next="T",
+        p_start_inclusive=inclusive,
+        p_end_inclusive=inclusive,
+    )
+    whole = cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/7", **kwargs)
+    split = cwms.retrieve_ts(TS_ID, "2019/1/1", "2019/1/7", parts=4, **kwargs)
+    rows = cwms.retrieve_ts(
+        TS_ID, "2019/1/1", "2019/1/7", parts=3, return_df=False, **kwargs
+    )
+
+    pd.testing.assert_frame_equal(split, whole)
+    assert rows == cwms.retrieve_ts(
+        TS_ID, "2019/1/1", "2019/1/7", return_df=False, **kwargs
+    )
+
+
+def test_parts_run_concurrently(db):
+    """
+    retrieve_ts: Sub-windows are retrieved on several sessions at once
+    """
+    pool = FakeSessionPool(db, max=4, latency=0.2)
+    cwms = CWMS(pool=pool)
+
+    df = cwms.get_por(TS_ID, parts=4)
+
+    assert pool.max_busy == 4
+    assert df["date_time"].is_monotonic_increasing
+    assert not df["date_time"].duplicated().any()